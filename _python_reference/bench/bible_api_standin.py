@@ -0,0 +1,125 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- LOCAL BIBLE API STAND-IN ---
+#
+# Serves '/api/{translation}/{BOOK_ID}/{chapter}.json' in the same shape as
+# bible.helloao.org, with generated, deterministic verse text. Supports ETag /
+# If-None-Match, a configurable delay per request, and counts what it served.
+
+WORDS = ("and the LORD said to his servants go up into the land which I have given you "
+         "for an inheritance and they went up with joy and all the people gave thanks").split()
+
+CHAPTER_PATH = re.compile(r"^/api/([^/]+)/([0-9A-Z]{3})/(\d+)\.json$")
+
+
+def verse_text(book_id, chapter, verse, words_per_verse):
+    """Deterministic text for a verse, so every run and every test sees the same chapter."""
+    start = int(hashlib.md5(f"{book_id}{chapter}:{verse}".encode()).hexdigest(), 16)
+    return " ".join(WORDS[(start + i) % len(WORDS)] for i in range(words_per_verse)).capitalize() + "."
+
+
+def chapter_json(book_id, chapter, verses_per_chapter, words_per_verse):
+    content = [{"type": "heading", "content": [f"{book_id} {chapter}"]}]
+    for verse in range(1, verses_per_chapter + 1):
+        content.append({"type": "verse", "number": verse,
+                        "content": [verse_text(book_id, chapter, verse, words_per_verse)]})
+    return {"translation": {"id": "BSB"}, "book": {"id": book_id},
+            "chapter": {"number": chapter, "content": content}}
+
+
+class BibleApiStandIn:
+    """Runs the Bible API stand-in on a local port; base_url is what API_BASE_URL should point at."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, verses_per_chapter=50, words_per_verse=24,
+                 translation='BSB'):
+        self.latency = latency
+        self.verses_per_chapter = verses_per_chapter
+        self.words_per_verse = words_per_verse
+        self.translation = translation
+        self.stats = {'requests': 0, 'not_modified': 0, 'bytes_out': 0}
+        self.lock = threading.Lock()
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standin.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/{self.translation}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    def handle(self, request):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.stats['requests'] += 1
+        match = CHAPTER_PATH.match(request.path)
+        if not match or match.group(1) != self.translation:
+            request.send_error(404)
+            return
+
+        book_id, chapter = match.group(2), int(match.group(3))
+        body = json.dumps(chapter_json(book_id, chapter, self.verses_per_chapter, self.words_per_verse)).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if request.headers.get('If-None-Match') == etag:
+            with self.lock:
+                self.stats['not_modified'] += 1
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(body)))
+        request.send_header('ETag', etag)
+        request.end_headers()
+        request.wfile.write(body)
+        with self.lock:
+            self.stats['bytes_out'] += len(body)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Bible chapter API.")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds before each response.")
+    parser.add_argument('--verses-per-chapter', type=int, default=50)
+    args = parser.parse_args()
+
+    with BibleApiStandIn(port=args.port, latency=args.latency, verses_per_chapter=args.verses_per_chapter) as standin:
+        print(f"Bible API stand-in serving {standin.base_url} (set BIBLE_API_BASE_URL to use it)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,53 @@
+import hashlib
+import struct
+import threading
+import time
+import zlib
+
+# --- LOCAL IMAGE GENERATOR STAND-IN ---
+#
+# Answers image generation calls with a small solid-colour PNG derived from the prompt,
+# after a configurable delay, like a slow remote generator would. Counts calls and the
+# most calls it was serving at once, so tests can check caching and the worker bound.
+
+
+def solid_png(width, height, rgb):
+    """Encodes a solid-colour RGB PNG with the standard library only."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    row = b'\x00' + bytes(rgb) * width
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * height))
+            + chunk(b'IEND', b''))
+
+
+class ImageBackendStandIn:
+    """Image backend for tests and benchmarks; see image_stage for the backend interface."""
+
+    name = 'standin'
+    extension = 'png'
+
+    def __init__(self, latency=0.0, size=(16, 9)):
+        self.latency = latency
+        self.size = size
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def generate(self, prompt, width, height):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            # The requested size only changes the colour: the stand-in keeps its images tiny.
+            digest = hashlib.sha256(f"{prompt}\n{width}x{height}".encode('utf-8')).digest()
+            return solid_png(*self.size, digest[:3])
+        finally:
+            with self.lock:
+                self.in_flight -= 1
@@ -0,0 +1,474 @@
+import base64
+import copy
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+# --- LOCAL OBS-WEBSOCKET V5 STAND-IN ---
+#
+# A small obs-websocket v5 server with an in-memory scene graph, for tests and benchmarks
+# that cannot use a live OBS. It speaks just enough of RFC 6455 for websocket-client and
+# implements the requests this project sends. Every reply is delayed by a configurable
+# latency; a RequestBatch costs one latency, like one network round trip to a remote OBS.
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# obs-websocket request status codes
+SUCCESS = 100
+MISSING_REQUEST_FIELD = 300
+UNKNOWN_REQUEST_TYPE = 204
+RESOURCE_NOT_FOUND = 600
+RESOURCE_ALREADY_EXISTS = 601
+INVALID_RESOURCE_STATE = 604
+NOT_READY = 207
+
+DEFAULT_TRANSFORM = {
+    'alignment': 5, 'boundsAlignment': 0, 'boundsHeight': 900.0, 'boundsType': 'OBS_BOUNDS_SCALE_INNER',
+    'boundsWidth': 1000.0, 'cropBottom': 0, 'cropLeft': 0, 'cropRight': 0, 'cropTop': 0,
+    'positionX': 40.0, 'positionY': 500.0, 'rotation': 0.0, 'scaleX': 1.0, 'scaleY': 1.0,
+    'sourceHeight': 0.0, 'sourceWidth': 0.0, 'width': 0.0, 'height': 0.0,
+}
+
+
+class RequestFailed(Exception):
+    def __init__(self, code, comment):
+        super().__init__(comment)
+        self.code = code
+        self.comment = comment
+
+
+class ObsState:
+    """In-memory scene graph: scenes with ordered items, and inputs with kind and settings."""
+
+    def __init__(self, collection_name='Stand-in', with_template=True):
+        self.collection_name = collection_name
+        self.scenes = {}
+        self.inputs = {}
+        self.next_item_id = {}
+        self.program_scene = None  # None: the first scene is on program
+        if with_template:
+            self.add_template()
+
+    def add_template(self, scene_name='Scripture-Template', text_source='sTextScrolling'):
+        self.create_scene(scene_name)
+        self.create_input(scene_name, 'Base Layer', 'color_source_v3', {'color': 4278190080})
+        self.create_input(scene_name, text_source, 'text_ft2_source_v2',
+                          {'text': 'Template text', 'font': {'face': 'Arial', 'size': 72, 'style': 'Regular'}})
+        item = self.find_item(scene_name, text_source)
+        item['sceneItemTransform'] = copy.deepcopy(DEFAULT_TRANSFORM)
+
+    def create_scene(self, name):
+        if name in self.scenes or name in self.inputs:
+            raise RequestFailed(RESOURCE_ALREADY_EXISTS, f"A source already exists by that scene name: {name}")
+        self.scenes[name] = []
+        self.next_item_id[name] = 1
+
+    def add_item(self, scene_name, source_name, transform=None, enabled=True):
+        items = self.scene_items(scene_name)
+        item_id = self.next_item_id[scene_name]
+        self.next_item_id[scene_name] += 1
+        items.append({
+            'sceneItemId': item_id,
+            'sourceName': source_name,
+            'sceneItemEnabled': enabled,
+            'sceneItemTransform': copy.deepcopy(transform or DEFAULT_TRANSFORM),
+            'inputKind': self.inputs.get(source_name, {}).get('inputKind'),
+            'isGroup': False,
+            'sourceType': 'OBS_SOURCE_TYPE_SCENE' if source_name in self.scenes else 'OBS_SOURCE_TYPE_INPUT',
+        })
+        return item_id
+
+    def create_input(self, scene_name, input_name, kind, settings, enabled=True):
+        if input_name in self.inputs or input_name in self.scenes:
+            raise RequestFailed(RESOURCE_ALREADY_EXISTS, f"A source already exists by that input name: {input_name}")
+        self.scene_items(scene_name)
+        self.inputs[input_name] = {'inputKind': kind, 'inputSettings': copy.deepcopy(settings or {})}
+        return self.add_item(scene_name, input_name, enabled=enabled)
+
+    def scene_items(self, scene_name):
+        if scene_name not in self.scenes:
+            raise RequestFailed(RESOURCE_NOT_FOUND, f"No source was found by the name of `{scene_name}`.")
+        return self.scenes[scene_name]
+
+    def find_item(self, scene_name, source_name=None, item_id=None):
+        for item in self.scene_items(scene_name):
+            if item['sceneItemId'] == item_id or (item_id is None and item['sourceName'] == source_name):
+                return item
+        raise RequestFailed(RESOURCE_NOT_FOUND, f"No scene items were found in scene `{scene_name}`.")
+
+    def input(self, name):
+        if name not in self.inputs:
+            raise RequestFailed(RESOURCE_NOT_FOUND, f"No source was found by the name of `{name}`.")
+        return self.inputs[name]
+
+    def remove_source_items(self, source_name):
+        for name in self.scenes:
+            self.scenes[name] = [item for item in self.scenes[name] if item['sourceName'] != source_name]
+
+    def item_count(self):
+        return sum(len(items) for items in self.scenes.values())
+
+    def to_dict(self):
+        return {'scenes': self.scenes, 'inputs': self.inputs}
+
+
+def require(data, *fields):
+    for field in fields:
+        if field not in data:
+            raise RequestFailed(MISSING_REQUEST_FIELD, f"Your request is missing the `{field}` field.")
+    return [data[field] for field in fields]
+
+
+class ObsStandIn:
+    """
+    Runs an obs-websocket v5 stand-in on a local port.
+
+    latency is the delay, in seconds, before each reply. Single requests are answered
+    independently (so pipelined clients overlap their waits), a RequestBatch is answered
+    once after all of its requests ran. stats counts round trips and bytes.
+
+    For failure tests, ready=False answers every request with NotReady, as OBS does while
+    it starts up, and drop_after_requests closes the connection at the first request or
+    RequestBatch received after that many single requests.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, password='', latency=0.0, state=None):
+        self.password = password
+        self.latency = latency
+        self.state = state or ObsState()
+        self.ready = True
+        self.drop_after_requests = None
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+        standin = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                # Replies are small and often back to back; do not let Nagle hold them.
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                WebSocketSession(standin, self.request).run()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def host(self):
+        return self.server.server_address[0]
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    def reset(self, state=None):
+        """Replaces the scene graph with a fresh one and clears the stats."""
+        with self.lock:
+            self.state = state or ObsState()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {'requests': 0, 'batches': 0, 'batched_requests': 0, 'bytes_in': 0, 'bytes_out': 0,
+                      'by_type': {}}
+
+    @property
+    def round_trips(self):
+        return self.stats['requests'] + self.stats['batches']
+
+    def count(self, request_type):
+        by_type = self.stats['by_type']
+        by_type[request_type] = by_type.get(request_type, 0) + 1
+
+    def execute(self, request):
+        """Runs one request against the scene graph and returns its RequestResponse payload."""
+        request_type = request.get('requestType')
+        response = {'requestType': request_type, 'requestId': request.get('requestId')}
+        handler = getattr(self, f"req_{request_type}", None)
+        with self.lock:
+            self.count(request_type)
+            try:
+                if not self.ready:
+                    raise RequestFailed(NOT_READY, "OBS is not ready to perform the request.")
+                if handler is None:
+                    raise RequestFailed(UNKNOWN_REQUEST_TYPE, f"Your request type is not valid: {request_type}")
+                data = handler(request.get('requestData') or {})
+                response['requestStatus'] = {'result': True, 'code': SUCCESS}
+                if data is not None:
+                    response['responseData'] = data
+            except RequestFailed as e:
+                response['requestStatus'] = {'result': False, 'code': e.code, 'comment': e.comment}
+        return response
+
+    # --- Requests ---
+
+    def req_GetVersion(self, data):
+        return {'obsVersion': '30.0.0', 'obsWebSocketVersion': '5.5.0', 'rpcVersion': 1,
+                'availableRequests': sorted(name[4:] for name in dir(self) if name.startswith('req_'))}
+
+    def req_GetSceneCollectionList(self, data):
+        return {'currentSceneCollectionName': self.state.collection_name,
+                'sceneCollections': [self.state.collection_name]}
+
+    def req_GetSceneList(self, data):
+        names = list(self.state.scenes)
+        program = self.state.program_scene or (names[0] if names else None)
+        return {'currentProgramSceneName': program, 'currentPreviewSceneName': None,
+                'scenes': [{'sceneName': name, 'sceneIndex': index} for index, name in enumerate(names)]}
+
+    def req_CreateScene(self, data):
+        name, = require(data, 'sceneName')
+        self.state.create_scene(name)
+        return {'sceneUuid': hashlib.md5(name.encode('utf-8')).hexdigest()}
+
+    def req_RemoveScene(self, data):
+        name, = require(data, 'sceneName')
+        self.state.scene_items(name)
+        del self.state.scenes[name]
+        self.state.remove_source_items(name)
+
+    def req_GetSceneItemList(self, data):
+        name, = require(data, 'sceneName')
+        items = self.state.scene_items(name)
+        return {'sceneItems': [{**copy.deepcopy(item), 'sceneItemIndex': index} for index, item in enumerate(items)]}
+
+    def req_GetInputList(self, data):
+        kind = data.get('inputKind')
+        return {'inputs': [{'inputName': name, 'inputKind': value['inputKind'], 'unversionedInputKind': value['inputKind']}
+                           for name, value in self.state.inputs.items() if kind in (None, value['inputKind'])]}
+
+    def req_CreateInput(self, data):
+        scene_name, input_name, kind = require(data, 'sceneName', 'inputName', 'inputKind')
+        item_id = self.state.create_input(scene_name, input_name, kind, data.get('inputSettings'),
+                                          data.get('sceneItemEnabled', True))
+        return {'inputUuid': hashlib.md5(input_name.encode('utf-8')).hexdigest(), 'sceneItemId': item_id}
+
+    def req_RemoveInput(self, data):
+        name, = require(data, 'inputName')
+        self.state.input(name)
+        del self.state.inputs[name]
+        self.state.remove_source_items(name)
+
+    def req_GetInputSettings(self, data):
+        name, = require(data, 'inputName')
+        value = self.state.input(name)
+        return {'inputSettings': copy.deepcopy(value['inputSettings']), 'inputKind': value['inputKind']}
+
+    def req_SetInputSettings(self, data):
+        name, settings = require(data, 'inputName', 'inputSettings')
+        value = self.state.input(name)
+        if data.get('overlay', True):
+            value['inputSettings'].update(copy.deepcopy(settings))
+        else:
+            value['inputSettings'] = copy.deepcopy(settings)
+
+    def req_GetSceneItemId(self, data):
+        scene_name, source_name = require(data, 'sceneName', 'sourceName')
+        return {'sceneItemId': self.state.find_item(scene_name, source_name=source_name)['sceneItemId']}
+
+    def req_GetSceneItemTransform(self, data):
+        scene_name, item_id = require(data, 'sceneName', 'sceneItemId')
+        return {'sceneItemTransform': copy.deepcopy(self.state.find_item(scene_name, item_id=item_id)['sceneItemTransform'])}
+
+    def req_SetSceneItemTransform(self, data):
+        scene_name, item_id, transform = require(data, 'sceneName', 'sceneItemId', 'sceneItemTransform')
+        item = self.state.find_item(scene_name, item_id=item_id)
+        if transform.get('boundsWidth', 1.0) < 1.0 or transform.get('boundsHeight', 1.0) < 1.0:
+            raise RequestFailed(INVALID_RESOURCE_STATE, "Bounds must be at least 1.0.")
+        item['sceneItemTransform'].update(copy.deepcopy(transform))
+
+    def req_DuplicateSceneItem(self, data):
+        scene_name, item_id = require(data, 'sceneName', 'sceneItemId')
+        item = self.state.find_item(scene_name, item_id=item_id)
+        destination = data.get('destinationSceneName') or scene_name
+        return {'sceneItemId': self.state.add_item(destination, item['sourceName'], item['sceneItemTransform'],
+                                                   item['sceneItemEnabled'])}
+
+    def req_CreateSceneItem(self, data):
+        scene_name, source_name = require(data, 'sceneName', 'sourceName')
+        if source_name not in self.state.inputs and source_name not in self.state.scenes:
+            raise RequestFailed(RESOURCE_NOT_FOUND, f"No source was found by the name of `{source_name}`.")
+        return {'sceneItemId': self.state.add_item(scene_name, source_name, enabled=data.get('sceneItemEnabled', True))}
+
+    def req_SetSceneItemIndex(self, data):
+        scene_name, item_id, index = require(data, 'sceneName', 'sceneItemId', 'sceneItemIndex')
+        item = self.state.find_item(scene_name, item_id=item_id)
+        items = self.state.scenes[scene_name]
+        items.remove(item)
+        items.insert(index, item)
+
+    def req_RemoveSceneItem(self, data):
+        scene_name, item_id = require(data, 'sceneName', 'sceneItemId')
+        item = self.state.find_item(scene_name, item_id=item_id)
+        self.state.scenes[scene_name].remove(item)
+
+
+class WebSocketSession:
+    """One client connection: the opening handshake, Identify, then requests until close."""
+
+    def __init__(self, standin, sock):
+        self.standin = standin
+        self.sock = sock
+        self.send_lock = threading.Lock()
+        self.salt = base64.b64encode(os.urandom(16)).decode()
+        self.challenge = base64.b64encode(os.urandom(16)).decode()
+        self.buffer = b''
+
+    def read_exact(self, size):
+        while len(self.buffer) < size:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("client disconnected")
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def handshake(self):
+        while b'\r\n\r\n' not in self.buffer:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("client disconnected")
+            self.buffer += chunk
+        head, self.buffer = self.buffer.split(b'\r\n\r\n', 1)
+        headers = {}
+        for line in head.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1((headers['sec-websocket-key'] + WEBSOCKET_GUID).encode()).digest())
+        self.sock.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+    def read_frame(self):
+        first, second = self.read_exact(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack('>H', self.read_exact(2))
+        elif length == 127:
+            length, = struct.unpack('>Q', self.read_exact(8))
+        mask = self.read_exact(4) if second & 0x80 else b'\0\0\0\0'
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self.read_exact(length)))
+        return opcode, payload
+
+    def send_frame(self, payload, opcode=0x1):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        with self.send_lock:
+            self.sock.sendall(header + payload)
+
+    def send_message(self, op, data):
+        payload = json.dumps({'op': op, 'd': data}).encode('utf-8')
+        self.standin.stats['bytes_out'] += len(payload)
+        self.send_frame(payload)
+
+    def hello(self):
+        data = {'obsWebSocketVersion': '5.5.0', 'rpcVersion': 1}
+        if self.standin.password:
+            data['authentication'] = {'challenge': self.challenge, 'salt': self.salt}
+        self.send_message(0, data)
+
+    def expected_auth(self):
+        secret = base64.b64encode(hashlib.sha256((self.standin.password + self.salt).encode()).digest())
+        return base64.b64encode(hashlib.sha256(secret + self.challenge.encode()).digest()).decode()
+
+    def reply_later(self, op, build):
+        """Sends a reply after the configured latency without blocking the next request."""
+        def send():
+            try:
+                self.send_message(op, build())
+            except OSError:
+                pass
+        if self.standin.latency:
+            threading.Timer(self.standin.latency, send).start()
+        else:
+            send()
+
+    def dropping(self):
+        """Returns True once drop_after_requests single requests have been received."""
+        drop_after = self.standin.drop_after_requests
+        return drop_after is not None and self.standin.stats['requests'] >= drop_after
+
+    def on_message(self, message):
+        op, data = message.get('op'), message.get('d', {})
+        if op == 1:
+            if self.standin.password and data.get('authentication') != self.expected_auth():
+                self.send_frame(struct.pack('>H', 4009) + b'Authentication failed.', opcode=0x8)
+                raise ConnectionError("authentication failed")
+            self.send_message(2, {'negotiatedRpcVersion': 1})
+        elif op in (6, 8) and self.dropping():
+            raise ConnectionError("dropped by drop_after_requests")
+        elif op == 6:
+            self.standin.stats['requests'] += 1
+            self.reply_later(7, lambda: self.standin.execute(data))
+        elif op == 8:
+            self.standin.stats['batches'] += 1
+            self.standin.stats['batched_requests'] += len(data.get('requests', []))
+            # Batches run immediately, in order, so later requests see earlier results.
+            results = []
+            for request in data.get('requests', []):
+                result = self.standin.execute(request)
+                results.append(result)
+                if data.get('haltOnFailure') and not result['requestStatus']['result']:
+                    break
+            self.reply_later(9, lambda: {'requestId': data.get('requestId'), 'results': results})
+
+    def run(self):
+        try:
+            self.handshake()
+            self.hello()
+            while True:
+                opcode, payload = self.read_frame()
+                if opcode == 0x8:
+                    self.send_frame(payload[:2], opcode=0x8)
+                    return
+                if opcode == 0x9:
+                    self.send_frame(payload, opcode=0xA)
+                    continue
+                if opcode == 0x1:
+                    self.standin.stats['bytes_in'] += len(payload)
+                    self.on_message(json.loads(payload.decode('utf-8')))
+        except (ConnectionError, OSError, ValueError):
+            pass
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local obs-websocket v5 stand-in with an in-memory scene graph.")
+    parser.add_argument('--port', type=int, default=4455)
+    parser.add_argument('--password', type=str, default='')
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds before each reply.")
+    args = parser.parse_args()
+
+    with ObsStandIn(port=args.port, password=args.password, latency=args.latency) as standin:
+        print(f"OBS stand-in listening on ws://{standin.host}:{standin.port} (latency {args.latency}s)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
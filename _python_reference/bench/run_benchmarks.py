@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import time
+
+# Run from _python_reference/ as 'python -m bench.run_benchmarks'.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.bible_api_standin import BibleApiStandIn
+from bench.obs_standin import ObsStandIn
+
+# --- BENCHMARK SUITE ---
+#
+# Runs scene generation against the local stand-ins for passages of 1, 40 and 500 verses
+# and reports round trips per verse, scenes per second (over the median run) and p50/p99
+# OBS request latencies, taken from the profiler's per-request spans. Results are compared
+# with a stored baseline: any extra round trip per verse counts as a regression, and so
+# does a throughput drop, but only when it is beyond the tolerance and also slows the run
+# by more than a fixed floor, so millisecond-long runs do not flag scheduler noise.
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+VERSES_PER_CHAPTER = 50
+PASSAGE_SIZES = (1, 40, 500)
+OBS_PASSWORD = 'benchmark'
+
+
+def passage_references(size):
+    """References covering exactly `size` verses, VERSES_PER_CHAPTER per chapter of Genesis."""
+    references = []
+    chapter = 1
+    while size > 0:
+        count = min(size, VERSES_PER_CHAPTER)
+        references.append(f"Genesis {chapter}:1" + (f"-{count}" if count > 1 else ""))
+        size -= count
+        chapter += 1
+    return references
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_automator(mode, verses, obs):
+    """Runs one generation mode directly against the stand-in with prefetched verses."""
+    from obsws_python import ReqClient
+    from instrumentation import instrument_obs_client
+    from obs_automator import automate_scene_generation, automate_scene_generation_batched
+    from obs_async import automate_scene_generation_async
+
+    with ReqClient(host=obs.host, port=obs.port, password=OBS_PASSWORD, timeout=30) as client:
+        instrument_obs_client(client)
+        if mode == 'classic':
+            automate_scene_generation(client, verses)
+        elif mode == 'batch':
+            automate_scene_generation_batched(client, verses)
+        elif mode == 'pipeline':
+            asyncio.run(automate_scene_generation_async(client, verses))
+
+
+def run_main(mode, references, obs):
+    """Runs the full obs_scene_generator.main flow, fetch included, against both stand-ins."""
+    import obs_scene_generator
+
+    argv = ['obs_scene_generator.py', '--no-cache', '--ref', *references]
+    if mode != 'classic':
+        argv.append(f'--{mode}')
+    os.environ.update({'OBS_HOST': obs.host, 'OBS_PORT': str(obs.port), 'OBS_PASSWORD': OBS_PASSWORD})
+    saved_argv = sys.argv
+    sys.argv = argv
+    try:
+        obs_scene_generator.main()
+    finally:
+        sys.argv = saved_argv
+
+
+def measure(target, mode, size, obs, repeats):
+    """Runs one scenario `repeats` times on a fresh scene graph and returns its metrics."""
+    from bible_utils import get_verses_for_references
+    from instrumentation import profiler
+
+    references = passage_references(size)
+    durations = []
+    request_seconds = []
+    round_trips = 0
+    for _ in range(repeats):
+        obs.reset()
+        profiler.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            if target == 'automator':
+                verses = get_verses_for_references(references)
+                started = time.perf_counter()
+                run_automator(mode, verses, obs)
+            else:
+                run_main(mode, references, obs)
+            durations.append(time.perf_counter() - started)
+        request_seconds += [seconds for name, values in profiler.spans.items() if name.startswith('obs.')
+                            for seconds in values]
+        round_trips = obs.round_trips
+        created = sum(1 for name in obs.state.scenes if name.startswith('Scripture-') and name != 'Scripture-Template')
+        if created != size:
+            raise RuntimeError(f"{target}/{mode}/{size}: expected {size} scenes, found {created}")
+
+    run_seconds = percentile(durations, 0.5)
+    return {
+        'round_trips_per_verse': round(round_trips / size, 3),
+        'scenes_per_second': round(size / run_seconds, 1),
+        'run_seconds': round(run_seconds, 4),
+        'request_p50_ms': round(percentile(request_seconds, 0.5) * 1000, 3),
+        'request_p99_ms': round(percentile(request_seconds, 0.99) * 1000, 3),
+    }
+
+
+def compare(results, baseline, tolerance, min_slowdown):
+    """
+    Returns a list of human-readable regressions against the baseline. Throughput only
+    counts when it dropped by more than `tolerance` and the median run also took more than
+    `min_slowdown` seconds longer.
+    """
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        if result['round_trips_per_verse'] > expected['round_trips_per_verse'] + 1e-9:
+            regressions.append(f"{key}: round trips per verse {expected['round_trips_per_verse']} -> "
+                               f"{result['round_trips_per_verse']}")
+        slowdown = result['run_seconds'] - expected.get('run_seconds', 0.0)
+        if result['scenes_per_second'] < expected['scenes_per_second'] * (1 - tolerance) and slowdown > min_slowdown:
+            regressions.append(f"{key}: scenes per second {expected['scenes_per_second']} -> "
+                               f"{result['scenes_per_second']} (+{slowdown:.3f} s per run)")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'scenario':<28} {'rt/verse':>9} {'scenes/s':>10} {'run s':>9} {'req p50 ms':>11} {'req p99 ms':>11}")
+    for key, result in results.items():
+        print(f"{key:<28} {result['round_trips_per_verse']:>9} {result['scenes_per_second']:>10} "
+              f"{result['run_seconds']:>9} {result['request_p50_ms']:>11} {result['request_p99_ms']:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scene generation against local OBS and Bible API stand-ins.")
+    parser.add_argument('--obs-latency', type=float, default=0.002, help="Seconds per OBS reply (default: 0.002).")
+    parser.add_argument('--api-latency', type=float, default=0.02, help="Seconds per chapter fetch (default: 0.02).")
+    parser.add_argument('--repeats', type=int, default=5, help="Runs per scenario (default: 5).")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(PASSAGE_SIZES), help="Passage sizes in verses.")
+    parser.add_argument('--modes', nargs='+', default=['classic', 'batch', 'pipeline'])
+    parser.add_argument('--targets', nargs='+', default=['automator', 'main'])
+    parser.add_argument('--baseline', type=str, default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline.")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed drop in scenes per second before it counts as a regression (default: 0.25).")
+    parser.add_argument('--min-slowdown', type=float, default=0.05,
+                        help="Seconds a median run must also slow down by for a throughput drop to count (default: 0.05).")
+    args = parser.parse_args()
+
+    from instrumentation import profiler
+    # Request latencies come from the profiler's per-request spans.
+    profiler.enable()
+    with BibleApiStandIn(latency=args.api_latency, verses_per_chapter=VERSES_PER_CHAPTER) as api, \
+            ObsStandIn(password=OBS_PASSWORD, latency=args.obs_latency) as obs:
+        # Modules read the API URL from the environment when they are first imported.
+        os.environ['BIBLE_API_BASE_URL'] = api.base_url
+        results = {}
+        for target in args.targets:
+            for mode in args.modes:
+                for size in args.sizes:
+                    key = f"{target}/{mode}/{size}"
+                    results[key] = measure(target, mode, size, obs, args.repeats)
+                    print(f"  {key} done", file=sys.stderr)
+
+    print_table(results)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except OSError:
+        print("\nNo baseline found; run with --update-baseline to store one.")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_slowdown)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+
+from config import BIBLE_BOOK_IDS, BIBLE_INDEX_PATH
+from bible_utils import extract_chapter_verses, get_translation
+
+# --- OFFLINE BIBLE INDEX ---
+#
+# File layout (all integers little-endian):
+#   header        magic, translation, max chapter, book count, record count, text blob start
+#   chapter table one (first record, first verse, verse count) slot per book x chapter
+#   records       one (text offset, text length) pair per verse, contiguous within a chapter
+#   text blob     UTF-8 verse text
+#
+# A lookup is two fixed-size slot reads and a slice of the blob, so it costs the same
+# no matter how large the translation is, and opening the index is a single mmap.
+
+INDEX_MAGIC = b'BIBLIDX1'
+HEADER = struct.Struct('<8s16sHHII')
+CHAPTER_SLOT = struct.Struct('<IHH')
+VERSE_RECORD = struct.Struct('<II')
+
+BOOK_ORDER = list(BIBLE_BOOK_IDS.values())
+BOOK_NUMBERS = {book_id: number for number, book_id in enumerate(BOOK_ORDER)}
+
+
+def read_dump(source_dir):
+    """Yields (book_id, chapter, verses) for every '{BOOK_ID}/{chapter}.json' file in a translation dump."""
+    for book_id in BOOK_ORDER:
+        book_dir = os.path.join(source_dir, book_id)
+        if not os.path.isdir(book_dir):
+            continue
+        for name in os.listdir(book_dir):
+            stem, ext = os.path.splitext(name)
+            if ext != '.json' or not stem.isdigit():
+                continue
+            with open(os.path.join(book_dir, name), encoding='utf-8') as f:
+                yield book_id, int(stem), extract_chapter_verses(json.load(f))
+
+
+def build_index(source_dir, index_path, translation=None):
+    """Builds a binary verse index from a downloaded translation dump and returns the verse count."""
+    chapters = {}
+    for book_id, chapter, verses in read_dump(source_dir):
+        numbered = {number: text for number, text in verses if isinstance(number, int) and number > 0}
+        if numbered:
+            chapters[(BOOK_NUMBERS[book_id], chapter)] = numbered
+
+    if not chapters:
+        raise ValueError(f"No chapter JSON files found under '{source_dir}'.")
+
+    max_chapter = max(chapter for _, chapter in chapters)
+    slots = bytearray(CHAPTER_SLOT.size * len(BOOK_ORDER) * (max_chapter + 1))
+    records = bytearray()
+    blob = bytearray()
+    record_count = 0
+
+    for (book_number, chapter), numbered in sorted(chapters.items()):
+        first_verse, last_verse = min(numbered), max(numbered)
+        CHAPTER_SLOT.pack_into(slots, CHAPTER_SLOT.size * (book_number * (max_chapter + 1) + chapter),
+                               record_count, first_verse, last_verse - first_verse + 1)
+        for number in range(first_verse, last_verse + 1):
+            # Verses a translation omits keep their slot with an empty text.
+            text = numbered.get(number, '').encode('utf-8')
+            records += VERSE_RECORD.pack(len(blob), len(text))
+            blob += text
+            record_count += 1
+
+    translation = translation or get_translation()
+    text_start = HEADER.size + len(slots) + len(records)
+    header = HEADER.pack(INDEX_MAGIC, translation.encode('ascii'), max_chapter, len(BOOK_ORDER), record_count, text_start)
+
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(slots)
+        f.write(records)
+        f.write(blob)
+    os.replace(tmp_path, index_path)
+    return sum(len(numbered) for numbered in chapters.values())
+
+
+class BibleIndex:
+    """
+    Read-only, memory-mapped view of an index written by build_index. Raises ValueError if
+    the index holds another translation than the one expected (by default the API's).
+    """
+
+    def __init__(self, index_path=BIBLE_INDEX_PATH, translation=None):
+        self.index_path = index_path
+        with open(index_path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, indexed_translation, self.max_chapter, self.book_count, self.record_count, self.text_start = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != INDEX_MAGIC:
+            self.data.close()
+            raise ValueError(f"'{index_path}' is not a Bible index file.")
+        self.translation = indexed_translation.rstrip(b'\0').decode('ascii')
+        expected = translation or get_translation()
+        if self.translation != expected:
+            self.data.close()
+            raise ValueError(f"'{index_path}' holds the {self.translation} translation, not {expected}.")
+        self.records_start = HEADER.size + CHAPTER_SLOT.size * self.book_count * (self.max_chapter + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def chapter_slot(self, book_id, chapter):
+        """Returns (first record, first verse, verse count) for a chapter, or None if it is not indexed."""
+        book_number = BOOK_NUMBERS.get(book_id)
+        if book_number is None or not 0 < chapter <= self.max_chapter:
+            return None
+        slot = CHAPTER_SLOT.unpack_from(
+            self.data, HEADER.size + CHAPTER_SLOT.size * (book_number * (self.max_chapter + 1) + chapter)
+        )
+        return slot if slot[2] else None
+
+    def has_chapter(self, book_id, chapter):
+        return self.chapter_slot(book_id, chapter) is not None
+
+    def verse_text(self, record):
+        offset, length = VERSE_RECORD.unpack_from(self.data, self.records_start + VERSE_RECORD.size * record)
+        start = self.text_start + offset
+        return self.data[start:start + length].decode('utf-8')
+
+    def verse_range(self, book_id, chapter, start_verse, end_verse):
+        """Returns [verse number, raw text] pairs for a verse range, in the same shape as fetch_chapter_verses."""
+        slot = self.chapter_slot(book_id, chapter)
+        if slot is None:
+            return []
+        first_record, first_verse, verse_count = slot
+        verses = []
+        for number in range(max(start_verse, first_verse), min(end_verse, first_verse + verse_count - 1) + 1):
+            text = self.verse_text(first_record + number - first_verse)
+            if text:
+                verses.append([number, text])
+        return verses
+
+    def verse(self, book_id, chapter, verse):
+        """Returns the raw text of a single verse, or None if it is not indexed."""
+        found = self.verse_range(book_id, chapter, verse, verse)
+        return found[0][1] if found else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a memory-mapped offline Bible index from a downloaded translation dump.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        'source_dir',
+        type=str,
+        help="Directory of chapter JSON files laid out like the API: '{BOOK_ID}/{chapter}.json'."
+    )
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=BIBLE_INDEX_PATH,
+        help=f"Where to write the index (default: {BIBLE_INDEX_PATH})."
+    )
+    parser.add_argument(
+        '--translation',
+        type=str,
+        help="Translation code stored in the index (default: taken from API_BASE_URL)."
+    )
+    args = parser.parse_args()
+
+    try:
+        verse_count = build_index(args.source_dir, args.output, translation=args.translation)
+    except (OSError, ValueError) as e:
+        print(f"\nIndex Error: {e}")
+        return
+    print(f"Indexed {verse_count} verses into '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
 import requests
 import re
-from config import API_BASE_URL, BIBLE_BOOK_IDS, BOOK_ABBREVIATIONS, MAX_CHARS_PER_LINE
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from config import (
+    API_BASE_URL, BIBLE_BOOK_IDS, BIBLE_CHAPTER_COUNTS, BOOK_ABBREVIATIONS, MAX_CHARS_PER_LINE, FETCH_MAX_WORKERS, REFERENCE_CACHE_SIZE,
+)
+from instrumentation import profiler
+
+_session = None
+_session_lock = threading.Lock()
 
 
 # --- BIBLE API AND PARSING FUNCTIONS ---
@@ -12,100 +22,237 @@ def to_title_case(s):
         for word in s.split(' ')
     )
 
-def parse_reference(reference):
-    """Parses a scripture reference string into a structured object."""
-    normalized_ref = reference.lower().replace('.', '')
-    normalized_ref = reference.lower().strip().replace('.', '')
+# Upper verse bound for "to the end of the chapter"; no chapter comes close to it.
+CHAPTER_END_VERSE = 999
+
+# Book part (optional leading 1-3, then letters, spaces and dots) followed by the numeric part
+_REFERENCE_RE = re.compile(r"^((?:[1-3]\s*)?[a-z][a-z.\s]*?)\s*(\d[\d\s:,;\-\u2013]*)$")
+# A bare book name, meaning the whole book
+_BOOK_RE = re.compile(r"^(?:[1-3]\s*)?[a-z][a-z.\s]*$")
+# One comma-separated item: [C:]V[-[C:]V]
+_ITEM_RE = re.compile(r"^(?:(\d+):)?(\d+)(?:-(?:(\d+):)?(\d+))?$")
+
+def normalize_book_name(name):
+    """Lowercases a book name and drops dots and spaces, so '1 Sam.' and '1sam' look alike."""
+    return ''.join(name.lower().replace('.', '').split())
+
+@lru_cache(maxsize=None)
+def book_name_index():
+    """
+    Maps every normalized book name, abbreviation, book ID and prefix of those to the
+    canonical book names it could mean. Built once, on first use. Exact names and
+    abbreviations always map to a single book, even when they are also a prefix of
+    another book (e.g. 'jon' is Jonah's ID, not a prefix of John).
+    """
+    exact = {}
+    for name, book_id in BIBLE_BOOK_IDS.items():
+        exact[normalize_book_name(name)] = name
+        exact.setdefault(book_id.lower(), name)
+    for abbreviation, name in BOOK_ABBREVIATIONS.items():
+        exact.setdefault(normalize_book_name(abbreviation), name)
 
-    # Regex to capture Book (with optional number), Chapter, Start Verse, and optional End Verse
-    match = re.match(r"^(\d?\s*[a-z]+)\s*(\d+):(\d+)(?:-(\d+))?$", normalized_ref)
+    prefixes = {}
+    for key, name in exact.items():
+        for end in range(2, len(key)):
+            prefixes.setdefault(key[:end], set()).add(name)
 
+    index = {prefix: tuple(sorted(names)) for prefix, names in prefixes.items()}
+    index.update({key: (name,) for key, name in exact.items()})
+    return index
+
+def lookup_book(name):
+    """Returns the canonical book name for a name, abbreviation or unambiguous prefix."""
+    matches = book_name_index().get(normalize_book_name(name))
+    if not matches:
+        raise ValueError(f"Unknown book: '{name.strip()}'.")
+    if len(matches) > 1:
+        raise ValueError(f"Ambiguous book: '{name.strip()}' could be {', '.join(matches)}.")
+    return matches[0]
+
+def expand_range(chapter, start_verse, end_chapter, end_verse):
+    """Splits a (possibly cross-chapter) verse range into per-chapter (chapter, start, end) segments."""
+    if chapter == end_chapter:
+        return [(chapter, start_verse, end_verse)]
+    return ([(chapter, start_verse, CHAPTER_END_VERSE)]
+            + [(middle, 1, CHAPTER_END_VERSE) for middle in range(chapter + 1, end_chapter)]
+            + [(end_chapter, 1, end_verse)])
+
+@lru_cache(maxsize=REFERENCE_CACHE_SIZE)
+def _parse_segments(reference, whole_books=False):
+    if _BOOK_RE.match(reference.lower().strip()):
+        book = lookup_book(reference)
+        chapters = BIBLE_CHAPTER_COUNTS[BIBLE_BOOK_IDS[book]]
+        if not whole_books:
+            # A bare name is more often a slip than a request for hundreds of scenes.
+            raise ValueError(f"'{reference.strip()}' is the whole book of {book} ({chapters} chapters); "
+                             "give chapters and verses, or use bulk mode for whole books.")
+        return book, tuple((c, 1, CHAPTER_END_VERSE) for c in range(1, chapters + 1))
+    match = _REFERENCE_RE.match(reference.lower().strip())
     if not match:
         raise ValueError(f"Could not parse reference: '{reference}'")
+    book_part, numbers = match.groups()
+    book = lookup_book(book_part)
 
-    book_part, chapter_str, start_verse_str, end_verse_str = match.groups()
+    segments = []
+    chapter = None  # Set once an item names a chapter; later bare numbers are then verses
+    for item in re.split(r"[,;]", numbers.replace('\u2013', '-').replace(' ', '')):
+        item_match = _ITEM_RE.match(item)
+        if not item_match:
+            raise ValueError(f"Could not parse reference: '{reference}'")
+        first_chapter, first, last_chapter, last = (int(g) if g else None for g in item_match.groups())
+        if 0 in (first_chapter, first, last_chapter, last):
+            raise ValueError(f"Chapters and verses start at 1: '{reference}'")
 
-    book = to_title_case(book_part.strip())
-    # Look up the abbreviation. If not found, assume it's already the full name.
-    book_key = book_part.strip()
-    canonical_book_name = BOOK_ABBREVIATIONS.get(book_key)
-    
-    book = to_title_case(canonical_book_name or book_key)
-    chapter = int(chapter_str)
-    start_verse = int(start_verse_str)
-    end_verse = int(end_verse_str) if end_verse_str else start_verse
+        if first_chapter is None and chapter is None:
+            # Whole chapters: 'John 3' or 'John 3-4'
+            if last_chapter is not None:
+                raise ValueError(f"Could not parse reference: '{reference}'")
+            end = last or first
+            if end < first:
+                raise ValueError(f"Range ends before it starts: '{reference}'")
+            segments += [(c, 1, CHAPTER_END_VERSE) for c in range(first, end + 1)]
+            continue
 
-    return { 'book': book, 'chapter': chapter, 'start_verse': start_verse, 'end_verse': end_verse }
+        chapter = first_chapter or chapter
+        if last is None:
+            segments.append((chapter, first, first))
+            continue
+        end_chapter = last_chapter or chapter
+        if (end_chapter, last) < (chapter, first):
+            raise ValueError(f"Range ends before it starts: '{reference}'")
+        segments += expand_range(chapter, first, end_chapter, last)
+        chapter = end_chapter
 
-def format_text_for_obs(text):
+    return book, tuple(segments)
+
+def parse_reference_segments(reference, whole_books=False):
     """
-    Wraps text to a specified width, preserving the first line's indentation.
+    Parses a reference into a list of single-chapter passages, each a dict with 'book',
+    'chapter', 'start_verse' and 'end_verse'. Besides 'Book C:V' and 'Book C:V-V' this
+    accepts cross-chapter ranges ('John 3:16-4:3'), comma lists ('John 3:16, 18-20, 4:1')
+    and whole chapters ('Psalm 23', 'Ruth 1-2'), which run to CHAPTER_END_VERSE. Whole
+    books ('Psalms') are only accepted with whole_books=True, as bulk mode passes.
+    Results are memoized, so repeated references cost a dictionary lookup.
     """
-    lines = []
-    # Split the first line to handle the prepended verse number correctly
-    first_line_words = text.split('\n')[0].split()
-    remaining_text = " ".join(text.split('\n')[0].split()[1:])
-
-    # Handle the first line with its initial content (e.g., "[12] So David...")
-    current_line = first_line_words[0] # Start with "[12]"
-    for word in remaining_text.split():
-        if len(current_line) + len(word) + 1 > MAX_CHARS_PER_LINE:
-            lines.append(current_line)
-            current_line = word
-        else:
-            current_line += " " + word
-    lines.append(current_line)
+    book, segments = _parse_segments(reference, whole_books)
+    return [{'book': book, 'chapter': chapter, 'start_verse': start_verse, 'end_verse': end_verse}
+            for chapter, start_verse, end_verse in segments]
 
-    # For subsequent lines, we can just wrap normally.
-    # This logic is simplified as we process the whole text at once now.
-    # The logic above handles the whole text string. Let's refine it.
+def parse_references(references, whole_books=False):
+    """Parses many references into one flat list of single-chapter passages, in order."""
+    return [segment for reference in references for segment in parse_reference_segments(reference, whole_books)]
 
-    words = text.split()
+def parse_reference(reference):
+    """Parses a scripture reference string into a structured object."""
+    segments = parse_reference_segments(reference)
+    if len(segments) != 1:
+        raise ValueError(f"'{reference}' covers several passages; use parse_references() for it.")
+    return segments[0]
+
+def format_text_for_obs(text):
+    """
+    Wraps text to MAX_CHARS_PER_LINE characters in a single pass.
+    See text_layout.TextLayout for wrapping on the template font's real glyph widths.
+    """
     lines = []
-    current_line = ""
-    for word in words:
-        if len(current_line) + len(word) + 1 > MAX_CHARS_PER_LINE and current_line:
-            lines.append(current_line)
-            current_line = word
+    current_line = []
+    current_length = 0
+    for word in text.split():
+        if current_line and current_length + len(word) + 1 > MAX_CHARS_PER_LINE:
+            lines.append(" ".join(current_line))
+            current_line = [word]
+            current_length = len(word)
         else:
-            current_line = (current_line + " " + word) if current_line else word
-    lines.append(current_line)
+            current_length += len(word) + (1 if current_line else 0)
+            current_line.append(word)
+    lines.append(" ".join(current_line))
     return "\n".join(lines)
 
-def get_verses_from_api(reference):
-    """Fetches verses from the API and formats them for OBS."""
-    parsed_ref = parse_reference(reference)
-    book_id = BIBLE_BOOK_IDS.get(parsed_ref['book'])
+def get_session():
+    """Returns the shared keep-alive HTTP session, sized for concurrent chapter fetches."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=FETCH_MAX_WORKERS, pool_maxsize=FETCH_MAX_WORKERS)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def get_translation():
+    """Returns the translation code served by API_BASE_URL (e.g. 'BSB')."""
+    return API_BASE_URL.rstrip('/').rsplit('/', 1)[-1]
+
+def extract_chapter_verses(chapter_data):
+    """Extracts [verse number, raw text] pairs from the API's chapter JSON."""
+    verses = []
+    for item in chapter_data.get('chapter', {}).get('content', []):
+        if item.get('type') == 'verse':
+            verse_text_parts = []
+            for part in item.get('content', []):
+                if isinstance(part, str):
+                    verse_text_parts.append(part)
+                elif isinstance(part, dict) and part.get('text'):
+                    verse_text_parts.append(part['text'])
+            verses.append([item.get('number'), " ".join(verse_text_parts).strip()])
+    return verses
+
+def fetch_chapter_verses(book_id, chapter, cache=None, offline=False):
+    """
+    Returns the [verse number, raw text] pairs of a chapter.
+
+    With a cache, a fresh cached chapter costs no network at all, a stale one is
+    revalidated with its ETag, and offline mode serves whatever is cached (stale or not)
+    without ever touching the network.
+    """
+    translation = get_translation()
+    entry = cache.get(translation, book_id, chapter) if cache else None
 
-    if not book_id:
-        raise ValueError(f"Unknown book: '{parsed_ref['book']}' in BIBLE_BOOK_IDS.")
+    if entry and (offline or cache.is_fresh(entry)):
+        profiler.count('bible.cache_hits')
+        return entry['verses']
+    if offline:
+        raise ValueError(f"{book_id} {chapter} is not in the local chapter cache (offline mode).")
 
-    api_url = f"{API_BASE_URL}/{book_id}/{parsed_ref['chapter']}.json"
+    api_url = f"{API_BASE_URL}/{book_id}/{chapter}.json"
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
 
     print(f"Fetching data from: {api_url}")
 
-    response = requests.get(api_url)
+    with profiler.span('bible.http'):
+        response = get_session().get(api_url, headers=headers)
+    profiler.count('bible.requests')
+    profiler.count('bible.bytes_received', len(response.content))
+    if entry and response.status_code == 304:
+        profiler.count('bible.not_modified')
+        cache.touch(translation, book_id, chapter, entry)
+        return entry['verses']
     response.raise_for_status()
-    chapter_data = response.json()
 
-    all_verses = chapter_data.get('chapter', {}).get('content', [])
+    with profiler.span('bible.parse'):
+        verses = extract_chapter_verses(response.json())
+    if cache:
+        cache.put(translation, book_id, chapter, verses, etag=response.headers.get('ETag'))
+    return verses
 
-    verses_to_process = []
+def resolve_reference(reference):
+    """Parses a single-passage reference and returns (parsed_ref, book_id)."""
+    parsed_ref = parse_reference(reference)
+    return parsed_ref, BIBLE_BOOK_IDS[parsed_ref['book']]
 
-    for item in all_verses:
-        if item.get('type') == 'verse':
-            verse_number = item.get('number')
+def resolve_references(references, whole_books=False):
+    """Parses references into a flat list of (parsed_ref, book_id) pairs, one per chapter passage."""
+    return [(parsed_ref, BIBLE_BOOK_IDS[parsed_ref['book']]) for parsed_ref in parse_references(references, whole_books)]
 
-            if parsed_ref['start_verse'] <= verse_number <= parsed_ref['end_verse']:
-                verse_text_parts = []
-                for part in item.get('content', []):
-                    if isinstance(part, str):
-                        verse_text_parts.append(part)
-                    elif isinstance(part, dict) and part.get('text'):
-                        verse_text_parts.append(part['text'])
-
-                raw_text = " ".join(verse_text_parts).strip()
+def build_verses(parsed_ref, book_id, chapter_verses):
+    """Selects the referenced verses from a chapter and formats them for OBS."""
+    verses_to_process = []
 
+    with profiler.span('bible.format'):
+        for verse_number, raw_text in chapter_verses:
+            if parsed_ref['start_verse'] <= verse_number <= parsed_ref['end_verse']:
                 # Combine verse number and text first
                 combined_text = f"[{verse_number}] {raw_text}"
                 # Then, format the combined string for OBS
@@ -117,4 +264,109 @@ def get_verses_from_api(reference):
                     'scene_name': f"Scripture-{book_id}-{parsed_ref['chapter']}:{verse_number}"
                 })
 
-    return verses_to_process
\ No newline at end of file
+    return verses_to_process
+
+def load_chapter_verses(parsed_ref, book_id, cache=None, offline=False, index=None):
+    """
+    Returns the verse pairs needed for a reference.
+
+    An offline BibleIndex that holds the chapter is used first and only the referenced
+    verses are sliced out of it; otherwise the chapter comes from the cache or the API.
+    """
+    if index is not None and index.has_chapter(book_id, parsed_ref['chapter']):
+        return index.verse_range(book_id, parsed_ref['chapter'], parsed_ref['start_verse'], parsed_ref['end_verse'])
+    return fetch_chapter_verses(book_id, parsed_ref['chapter'], cache=cache, offline=offline)
+
+def get_verses_from_api(reference, cache=None, offline=False, index=None):
+    """Fetches verses from the API (or the local chapter cache or offline index) and formats them for OBS."""
+    verses = []
+    for parsed_ref, book_id in resolve_references([reference]):
+        chapter_verses = load_chapter_verses(parsed_ref, book_id, cache=cache, offline=offline, index=index)
+        verses.extend(build_verses(parsed_ref, book_id, chapter_verses))
+    return verses
+
+def get_verses_for_references(references, cache=None, offline=False, max_workers=FETCH_MAX_WORKERS, index=None,
+                               whole_books=False):
+    """
+    Fetches and formats the verses of many references at once.
+
+    All references are parsed up front so a bad one fails before any network traffic.
+    They are then collapsed to the set of unique chapters missing from the offline index,
+    which are fetched concurrently over the shared keep-alive session. Verses come back in reference order, and a verse
+    that appears in more than one reference is only included once. Whole books need
+    whole_books=True.
+    """
+    resolved = resolve_references(references, whole_books)
+    chapters = list(dict.fromkeys(
+        (book_id, parsed_ref['chapter']) for parsed_ref, book_id in resolved
+        if index is None or not index.has_chapter(book_id, parsed_ref['chapter'])
+    ))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chapters) or 1))) as executor:
+        fetched = executor.map(lambda key: fetch_chapter_verses(*key, cache=cache, offline=offline), chapters)
+        chapter_verses = dict(zip(chapters, fetched))
+
+    verses_to_process = []
+    seen_scenes = set()
+    for parsed_ref, book_id in resolved:
+        key = (book_id, parsed_ref['chapter'])
+        if key in chapter_verses:
+            source_verses = chapter_verses[key]
+        else:
+            source_verses = load_chapter_verses(parsed_ref, book_id, index=index)
+        for verse in build_verses(parsed_ref, book_id, source_verses):
+            if verse['scene_name'] not in seen_scenes:
+                seen_scenes.add(verse['scene_name'])
+                verses_to_process.append(verse)
+
+    return verses_to_process
+
+def stream_verses(references, cache=None, offline=False, index=None, max_workers=FETCH_MAX_WORKERS):
+    """
+    Starts fetching the chapters for many references right away and returns a generator
+    that yields formatted verses as soon as their chapter arrives.
+
+    Verses are yielded in scene creation order, i.e. the reverse of reading order, the same
+    order automate_scene_generation walks a verse list in. The last reference's chapter is
+    fetched first, so the first scene can be created after a single fetch. As in
+    get_verses_for_references, a verse covered by several references appears only once.
+    Closing the generator, even before the first verse was taken, cancels the fetches.
+    """
+    resolved = resolve_references(references)
+    chapters = list(dict.fromkeys(
+        (book_id, parsed_ref['chapter']) for parsed_ref, book_id in reversed(resolved)
+        if index is None or not index.has_chapter(book_id, parsed_ref['chapter'])
+    ))
+
+    def covered_earlier(position, book_id, chapter, verse_number):
+        return any(
+            other_book == book_id and other_ref['chapter'] == chapter
+            and other_ref['start_verse'] <= verse_number <= other_ref['end_verse']
+            for other_ref, other_book in resolved[:position]
+        )
+
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chapters) or 1)))
+        try:
+            futures = {
+                key: executor.submit(fetch_chapter_verses, *key, cache=cache, offline=offline)
+                for key in chapters
+            }
+            yield None  # The fetches are running; stream_verses consumes this before returning.
+            for position in range(len(resolved) - 1, -1, -1):
+                parsed_ref, book_id = resolved[position]
+                key = (book_id, parsed_ref['chapter'])
+                if key in futures:
+                    source_verses = futures[key].result()
+                else:
+                    source_verses = load_chapter_verses(parsed_ref, book_id, index=index)
+                for verse in reversed(build_verses(parsed_ref, book_id, source_verses)):
+                    verse_number = int(verse['scene_name'].rsplit(':', 1)[1])
+                    if not covered_earlier(position, book_id, parsed_ref['chapter'], verse_number):
+                        yield verse
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    verse_stream = generate()
+    next(verse_stream)
+    return verse_stream
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+
+from config import CHAPTER_CACHE_DIR, CHAPTER_CACHE_MAX_ENTRIES, CHAPTER_CACHE_TTL
+
+
+class LruFiles:
+    """
+    Least-recently-used bookkeeping for the files of an on-disk cache.
+
+    File modification times track recency. Eviction runs under a lock, and files that
+    another thread or process removed in the meantime are skipped, so concurrent writers
+    sharing a cache directory never trip over each other's evictions.
+    """
+
+    def __init__(self, cache_dir, suffix=''):
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.lock = threading.Lock()
+
+    def entries(self):
+        """Lists (modification time, size, path) for every cached file, oldest first, skipping temporary files."""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(self.suffix) and not name.endswith('.tmp'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, stat.st_size, path))
+        found.sort()
+        return found
+
+    def evict(self, max_entries=None, max_bytes=None, keep=None):
+        """Removes the least recently used files, except `keep`, until both caps are met."""
+        if max_entries is None and max_bytes is None:
+            return
+        with self.lock:
+            entries = self.entries()
+            count = len(entries)
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if (max_entries is None or count <= max_entries) and (max_bytes is None or total <= max_bytes):
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+                count -= 1
+                total -= size
+
+
+class ChapterCache:
+    """
+    On-disk cache of already-extracted chapters.
+
+    Each chapter is stored as a small JSON file holding the verse list (number and raw text)
+    rather than the API's full chapter JSON, plus the ETag and fetch time used for
+    revalidation. File modification times track recency, so the least recently used
+    chapters are evicted once the cache holds more than max_entries.
+    """
+
+    def __init__(self, cache_dir=CHAPTER_CACHE_DIR, max_entries=CHAPTER_CACHE_MAX_ENTRIES, ttl=CHAPTER_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.files = LruFiles(cache_dir, '.json')
+
+    def path_for(self, translation, book_id, chapter):
+        return os.path.join(self.cache_dir, translation, f"{book_id}-{chapter}.json")
+
+    def get(self, translation, book_id, chapter):
+        """Returns the cached entry for a chapter, or None if it is not cached."""
+        path = self.path_for(translation, book_id, chapter)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            # Reading a chapter counts as a use for LRU purposes.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """Returns True if an entry can be used without revalidating it with the API."""
+        if self.ttl is None:
+            return True
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def put(self, translation, book_id, chapter, verses, etag=None):
+        """Stores the extracted verse list for a chapter and evicts old entries if needed."""
+        entry = {'verses': verses, 'etag': etag, 'fetched_at': time.time()}
+        path = self.path_for(translation, book_id, chapter)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a truncated entry behind.
+        # The name is unique per writer, as prefetch and generation may store the same chapter at once.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return entry
+
+    def touch(self, translation, book_id, chapter, entry):
+        """Marks a revalidated entry as freshly fetched without changing its verses."""
+        return self.put(translation, book_id, chapter, entry['verses'], entry.get('etag'))
+
+    def entries(self):
+        """Lists (modification time, size, path) for every cached chapter, oldest first."""
+        return self.files.entries()
+
+    def evict(self, keep=None):
+        """Removes the least recently used chapters beyond max_entries."""
+        self.files.evict(max_entries=self.max_entries, keep=keep)
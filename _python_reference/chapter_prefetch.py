@@ -0,0 +1,183 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    BIBLE_BOOK_IDS, BIBLE_CHAPTER_COUNTS, FETCH_MAX_WORKERS, CHAPTER_CACHE_TTL, GENERATION_LOG_PATH, DAEMON_SOCKET_PATH,
+)
+from bible_utils import (
+    CHAPTER_END_VERSE, get_translation, fetch_chapter_verses, resolve_references, build_verses,
+)
+from chapter_cache import ChapterCache
+from obs_scene_generator import read_references
+from scene_client import send_request, format_reply
+from scene_gc import load_generations
+
+# --- PREFETCH OF UPCOMING PASSAGES ---
+#
+# Fills the chapter cache ahead of a service, from a reading plan or from the chapters
+# after the last passage generated, so scene generation at show time is served from disk
+# and never waits on the network. Prefetching through the warm daemon (--background)
+# also runs the text layout in the daemon, where its caches live.
+
+BOOK_ORDER = list(BIBLE_BOOK_IDS.values())
+BOOK_NAMES = {book_id: name for name, book_id in BIBLE_BOOK_IDS.items()}
+
+
+def next_chapters(book_id, chapter, count):
+    """Returns the `count` chapters after book_id chapter, running on into the following books."""
+    chapters = []
+    position = BOOK_ORDER.index(book_id)
+    while len(chapters) < count:
+        chapter += 1
+        if chapter > BIBLE_CHAPTER_COUNTS[book_id]:
+            position += 1
+            if position == len(BOOK_ORDER):
+                break
+            book_id, chapter = BOOK_ORDER[position], 1
+        chapters.append((book_id, chapter))
+    return chapters
+
+
+def plan_chapters(references):
+    """Returns the unique (book ID, chapter) pairs the references touch, in reading order."""
+    return list(dict.fromkeys((book_id, parsed_ref['chapter']) for parsed_ref, book_id in resolve_references(references, whole_books=True)))
+
+
+def chapters_after_last_generated(count, log_path=GENERATION_LOG_PATH):
+    """
+    Returns the `count` chapters after the last chapter of the most recently generated
+    passage, in any scene collection. Raises ValueError if nothing has been generated yet.
+    """
+    generations = load_generations(None, log_path)
+    if not generations:
+        raise ValueError(f"No generated passages are logged in {log_path}; give a plan or a starting reference.")
+    book_id, chapter = plan_chapters(generations[-1]['references'])[-1]
+    return next_chapters(book_id, chapter, count)
+
+
+def prefetch_chapters(chapters, cache, index=None, max_workers=FETCH_MAX_WORKERS, layout=None):
+    """
+    Makes sure every chapter is in the cache, fetching at most max_workers at a time.
+    Chapters that are cached and fresh, or held by the offline index, cost nothing. With a
+    TextLayout, every verse of each chapter is also laid out, which warms the layout caches
+    of this process.
+
+    Returns {'cached': [...], 'fetched': [...], 'failed': [(chapter, error)], 'complete': bool},
+    where chapters are 'BOOK C' labels. 'complete' re-checks the cache at the end, so a
+    chapter evicted again by a plan larger than the cache counts as missing.
+    """
+    translation = get_translation()
+
+    def prefetch(key):
+        book_id, chapter = key
+        if index is not None and index.has_chapter(book_id, chapter):
+            return 'cached', index.verse_range(book_id, chapter, 1, CHAPTER_END_VERSE)
+        entry = cache.get(translation, book_id, chapter)
+        if entry and cache.is_fresh(entry):
+            return 'cached', entry['verses']
+        return 'fetched', fetch_chapter_verses(book_id, chapter, cache=cache)
+
+    report = {'cached': [], 'fetched': [], 'failed': []}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chapters) or 1))) as executor:
+        futures = [executor.submit(prefetch, key) for key in chapters]
+        for (book_id, chapter), future in zip(chapters, futures):
+            label = f"{book_id} {chapter}"
+            try:
+                outcome, chapter_verses = future.result()
+            except Exception as e:
+                report['failed'].append((label, str(e)))
+                continue
+            report[outcome].append(label)
+            if layout is not None:
+                parsed_ref = {'book': BOOK_NAMES[book_id], 'chapter': chapter,
+                              'start_verse': 1, 'end_verse': CHAPTER_END_VERSE}
+                for verse in build_verses(parsed_ref, book_id, chapter_verses):
+                    layout.wrap(' '.join(verse['obs_text'].split()))
+
+    report['complete'] = not report['failed'] and all(
+        (index is not None and index.has_chapter(book_id, chapter)) or cache.get(translation, book_id, chapter)
+        for book_id, chapter in chapters
+    )
+    return report
+
+
+def format_prefetch_report(report):
+    """Formats a prefetch report: one line per failed chapter, then the totals."""
+    lines = [f"  Failed on {label}: {message}" for label, message in report['failed']]
+    total = len(report['cached']) + len(report['fetched']) + len(report['failed'])
+    status = "complete" if report['complete'] else "INCOMPLETE"
+    lines.append(f"Prefetch {status}: {total} chapters, {len(report['fetched'])} fetched, "
+                 f"{len(report['cached'])} already local, {len(report['failed'])} failed.")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch the chapters of upcoming passages into the local chapter cache before the service.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--plan',
+        type=str,
+        help="Reading plan file with one reference per line ('-' for stdin), e.g. the next weeks' passages."
+    )
+    parser.add_argument(
+        '--next',
+        type=int,
+        help="Prefetch the N chapters after the last generated passage (or after --after)."
+    )
+    parser.add_argument('--after', type=str, help="With --next, count from this reference instead.")
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=FETCH_MAX_WORKERS,
+        help=f"Maximum chapters fetched at once (default: {FETCH_MAX_WORKERS})."
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=CHAPTER_CACHE_TTL,
+        help="Seconds before a cached chapter is fetched again (default: never)."
+    )
+    parser.add_argument(
+        '--background',
+        action='store_true',
+        help="Hand the prefetch to the running warm daemon, which also lays the text out, and return at once\n"
+             "(check on it with 'python scene_client.py --ping')."
+    )
+    parser.add_argument('--socket', type=str, default=DAEMON_SOCKET_PATH, help="Daemon socket, with --background.")
+    args = parser.parse_args()
+
+    try:
+        chapters = plan_chapters(read_references(args.plan)) if args.plan else []
+        if args.next:
+            if args.after:
+                chapters += next_chapters(*plan_chapters([args.after])[-1], args.next)
+            else:
+                chapters += chapters_after_last_generated(args.next)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 2
+    chapters = list(dict.fromkeys(chapters))
+    if not chapters:
+        parser.error("give a --plan file, or --next N")
+
+    if args.background:
+        message = {'command': 'prefetch', 'chapters': [list(key) for key in chapters], 'workers': args.workers}
+        try:
+            reply = send_request(message, socket_path=args.socket)
+        except (OSError, ValueError) as e:
+            print(f"Could not reach the daemon at {args.socket}: {e}")
+            return 2
+        print(format_reply(reply))
+        return 0 if reply.get('ok') else 1
+
+    print(f"Prefetching {len(chapters)} chapters: {', '.join(f'{book} {chapter}' for book, chapter in chapters)}")
+    report = prefetch_chapters(chapters, ChapterCache(ttl=args.cache_ttl), max_workers=args.workers)
+    print(format_prefetch_report(report))
+    return 0 if report['complete'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
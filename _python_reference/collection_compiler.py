@@ -0,0 +1,224 @@
+import copy
+import json
+import os
+import re
+import uuid
+
+from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME
+from obs_automator import unique_source_name
+from obs_batch import batch_request, send_batch, result_ok, result_error
+from template_snapshot import TemplateSnapshot, TemplateError
+
+# --- OFFLINE SCENE-COLLECTION COMPILER ---
+#
+# Writes the generated scenes straight into a scene-collection JSON file that OBS loads
+# once (Scene Collection > Import), instead of building them live over the websocket.
+# The template comes from an exported collection file, or from one snapshot taken over
+# the websocket. Every verse scene is a copy of the template scene whose text item points
+# at the verse's own sTextScrolling_* input; the other items reuse the template's sources,
+# as DuplicateSceneItem does. UUIDs are derived from the collection and source names, so
+# compiling the same passage twice gives the same file.
+
+# obs_bounds_type values, in enum order, as the websocket names them
+BOUNDS_TYPES = [
+    'OBS_BOUNDS_NONE', 'OBS_BOUNDS_SCALE_INNER', 'OBS_BOUNDS_SCALE_OUTER', 'OBS_BOUNDS_STRETCH',
+    'OBS_BOUNDS_SCALE_TO_WIDTH', 'OBS_BOUNDS_SCALE_TO_HEIGHT', 'OBS_BOUNDS_MAX_ONLY',
+]
+UUID_NAMESPACE = uuid.UUID('5b6d1c3e-8f0a-4e57-9a43-0f2c6e1d7b92')
+
+
+def stable_uuid(collection_name, source_name):
+    """Returns the same UUID for the same source name in the same collection, every time."""
+    return str(uuid.uuid5(UUID_NAMESPACE, f"{collection_name}\n{source_name}"))
+
+
+def unversioned_kind(kind):
+    """'text_ft2_source_v2' -> 'text_ft2_source', as the collection file's 'id' field wants it."""
+    return re.sub(r'_v\d+$', '', kind)
+
+
+def load_collection(path):
+    """Reads an exported OBS scene-collection JSON file."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_collection(collection, path):
+    """Writes a scene-collection file atomically, so OBS never sees a half-written one."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(collection, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+def find_source(collection, name):
+    return next((source for source in collection.get('sources', []) if source['name'] == name), None)
+
+
+def template_sources(collection):
+    """Returns the template scene and its text source from a collection, or raises TemplateError."""
+    scene = find_source(collection, TEMPLATE_SCENE_NAME)
+    if scene is None or scene.get('id') != 'scene':
+        raise TemplateError(f"Template scene '{TEMPLATE_SCENE_NAME}' not found in the scene collection file.")
+    items = scene.get('settings', {}).get('items', [])
+    text_source = find_source(collection, SCROLLING_TEXT_SOURCE_NAME)
+    if text_source is None or not any(item['name'] == SCROLLING_TEXT_SOURCE_NAME for item in items):
+        raise TemplateError(f"Text source '{SCROLLING_TEXT_SOURCE_NAME}' not found in the '{TEMPLATE_SCENE_NAME}' scene.")
+    return scene, text_source
+
+
+# --- Scene item transforms: websocket shape <-> collection file shape ---
+
+def item_to_file(item, source_uuid, transform=None):
+    """Converts a GetSceneItemList item (and its transform) to a collection file scene item."""
+    transform = transform or item['sceneItemTransform']
+    return {
+        'name': item['sourceName'],
+        'source_uuid': source_uuid,
+        'visible': item.get('sceneItemEnabled', True),
+        'locked': item.get('sceneItemLocked', False),
+        'rot': transform['rotation'],
+        'pos': {'x': transform['positionX'], 'y': transform['positionY']},
+        'scale': {'x': transform['scaleX'], 'y': transform['scaleY']},
+        'align': transform['alignment'],
+        'bounds_type': BOUNDS_TYPES.index(transform['boundsType']),
+        'bounds_align': transform['boundsAlignment'],
+        'bounds': {'x': transform['boundsWidth'], 'y': transform['boundsHeight']},
+        'crop_left': transform['cropLeft'],
+        'crop_top': transform['cropTop'],
+        'crop_right': transform['cropRight'],
+        'crop_bottom': transform['cropBottom'],
+        'id': item['sceneItemId'],
+        'group_item_backup': False,
+        'private_settings': {},
+    }
+
+
+def transform_from_file(item):
+    """Converts a collection file scene item's placement to a websocket sceneItemTransform."""
+    return {
+        'positionX': item['pos']['x'], 'positionY': item['pos']['y'], 'rotation': item.get('rot', 0.0),
+        'scaleX': item['scale']['x'], 'scaleY': item['scale']['y'], 'alignment': item.get('align', 5),
+        'boundsType': BOUNDS_TYPES[item.get('bounds_type', 0)], 'boundsAlignment': item.get('bounds_align', 0),
+        'boundsWidth': item.get('bounds', {}).get('x', 0.0), 'boundsHeight': item.get('bounds', {}).get('y', 0.0),
+        'cropLeft': item.get('crop_left', 0), 'cropTop': item.get('crop_top', 0),
+        'cropRight': item.get('crop_right', 0), 'cropBottom': item.get('crop_bottom', 0),
+    }
+
+
+def snapshot_from_collection(collection):
+    """Builds a TemplateSnapshot from a collection file, e.g. for TextLayout.from_template."""
+    scene, text_source = template_sources(collection)
+    items = [{'sourceName': item['name'], 'sceneItemId': item['id'], 'sceneItemEnabled': item.get('visible', True),
+              'sceneItemTransform': transform_from_file(item)} for item in scene['settings']['items']]
+    text_item = next(item for item in items if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME)
+    return TemplateSnapshot(collection.get('name'), items, text_source.get('versioned_id', text_source['id']),
+                            text_source.get('settings', {}), text_item['sceneItemTransform'])
+
+
+def input_source(collection_name, name, kind, settings):
+    return {
+        'id': unversioned_kind(kind),
+        'versioned_id': kind,
+        'name': name,
+        'uuid': stable_uuid(collection_name, name),
+        'settings': settings,
+        'enabled': True,
+        'flags': 0,
+        'mixers': 0,
+        'volume': 1.0,
+        'muted': False,
+        'private_settings': {},
+    }
+
+
+def scene_source(collection_name, name, items):
+    return {
+        'id': 'scene',
+        'versioned_id': 'scene',
+        'name': name,
+        'uuid': stable_uuid(collection_name, name),
+        'settings': {'custom_size': False, 'id_counter': max((item['id'] for item in items), default=0), 'items': items},
+        'enabled': True,
+        'flags': 0,
+        'mixers': 0,
+        'private_settings': {},
+    }
+
+
+def collection_from_obs(client, template):
+    """
+    Builds a minimal scene collection holding just the template, from a TemplateSnapshot
+    plus one RequestBatch reading the settings of the template's other inputs. Template
+    items that are not inputs (nested scenes, groups) are left out, with a warning:
+    export the collection file to keep them.
+    """
+    name = template.collection_name
+    inputs = [item for item in template.items
+              if item['sourceName'] != SCROLLING_TEXT_SOURCE_NAME and item.get('sourceType', 'OBS_SOURCE_TYPE_INPUT') == 'OBS_SOURCE_TYPE_INPUT']
+    skipped = [item['sourceName'] for item in template.items
+               if item['sourceName'] != SCROLLING_TEXT_SOURCE_NAME and item not in inputs]
+    if skipped:
+        print(f"Warning: leaving out template items that are not inputs: {', '.join(skipped)} "
+              "(compile from an exported collection file to keep them).")
+
+    sources = [input_source(name, SCROLLING_TEXT_SOURCE_NAME, template.kind, template.settings)]
+    results = send_batch(client, [batch_request('GetInputSettings', {'inputName': item['sourceName']}) for item in inputs])
+    for item, result in zip(inputs, results):
+        if not result_ok(result):
+            raise TemplateError(f"Could not read template input '{item['sourceName']}': {result_error(result)}")
+        data = result['responseData']
+        sources.append(input_source(name, item['sourceName'], data['inputKind'], data['inputSettings']))
+
+    items = []
+    for item in template.items:
+        if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME:
+            items.append(item_to_file(item, stable_uuid(name, item['sourceName']), template.transform))
+        elif item in inputs:
+            items.append(item_to_file(item, stable_uuid(name, item['sourceName'])))
+    sources.insert(0, scene_source(name, TEMPLATE_SCENE_NAME, items))
+    return {
+        'name': name,
+        'current_scene': TEMPLATE_SCENE_NAME,
+        'current_program_scene': TEMPLATE_SCENE_NAME,
+        'scene_order': [{'name': TEMPLATE_SCENE_NAME}],
+        'sources': sources,
+        'groups': [],
+        'transitions': [],
+    }
+
+
+def compile_collection(collection, verses):
+    """
+    Returns a copy of a scene collection with one scene per verse, built from its template.
+
+    Each verse scene copies the template scene, items, IDs and placement included, with the
+    text item pointed at a new input: a copy of the template text source holding the verse
+    text. Verse scenes and inputs already in the collection are replaced, so compiling
+    again is idempotent. New scenes are listed after the existing ones, in reading order.
+    """
+    scene, text_source = template_sources(collection)
+    collection_name = collection.get('name', '')
+    names = {verse['scene_name'] for verse in verses} | {unique_source_name(verse) for verse in verses}
+
+    compiled = {key: value for key, value in collection.items() if key not in ('sources', 'scene_order')}
+    compiled['sources'] = [source for source in collection.get('sources', []) if source['name'] not in names]
+    compiled['scene_order'] = [entry for entry in collection.get('scene_order', []) if entry['name'] not in names]
+
+    for verse in verses:
+        input_name = unique_source_name(verse)
+        verse_input = copy.deepcopy(text_source)
+        verse_input.update(name=input_name, uuid=stable_uuid(collection_name, input_name))
+        verse_input['settings'] = {**text_source.get('settings', {}), 'text': verse['obs_text']}
+
+        verse_scene = copy.deepcopy(scene)
+        verse_scene.update(name=verse['scene_name'], uuid=stable_uuid(collection_name, verse['scene_name']))
+        for item in verse_scene['settings']['items']:
+            if item['name'] == SCROLLING_TEXT_SOURCE_NAME:
+                item.update(name=input_name, source_uuid=verse_input['uuid'])
+
+        compiled['sources'] += [verse_scene, verse_input]
+        compiled['scene_order'].append({'name': verse['scene_name']})
+    return compiled
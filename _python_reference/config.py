@@ -1,17 +1,83 @@
+import os
+
 # --- CONFIGURATION & BIBLE DATA ---
 
 # Your API base URL (Free Bible API used in the Apps Script logic)
-API_BASE_URL = "https://bible.helloao.org/api/BSB"
+# BIBLE_API_BASE_URL overrides it, e.g. to point at the local stand-in in bench/
+API_BASE_URL = os.environ.get("BIBLE_API_BASE_URL", "https://bible.helloao.org/api/BSB")
+
+# Local cache of already-extracted chapters, keyed by translation, book and chapter
+CHAPTER_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "obs-scene-generator", "chapters")
+CHAPTER_CACHE_MAX_ENTRIES = 500 # Least recently used chapters are evicted beyond this
+CHAPTER_CACHE_TTL = None # Seconds before a cached chapter is revalidated with the API (None = never)
+
+# Memory-mapped offline verse index built with 'python bible_index.py <dump dir>'
+BIBLE_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "obs-scene-generator", "BSB.idx")
+
+# Number of parsed reference strings memoized, so large reading plans parse each line once
+REFERENCE_CACHE_SIZE = 16384
+
+# Number of chapters fetched concurrently when several references are processed together
+FETCH_MAX_WORKERS = 8
 
 # Max characters per line for your 1080x1920 vertical format
 # This should be adjusted based on your chosen font size (e.g., 40-55 characters)
 MAX_CHARS_PER_LINE = 20
 
+# Font-metric text layout: where to look for the template's font file, line height as a
+# multiple of the font size, and how many wrapped texts to memoize
+LAYOUT_FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts", "~/.fonts", "~/.local/share/fonts",
+                    "/Library/Fonts", "~/Library/Fonts", "C:/Windows/Fonts"]
+LAYOUT_LINE_SPACING = 1.2
+LAYOUT_CACHE_SIZE = 4096
+
 # ID of the scene you have already created in OBS that will be duplicated.
 # This scene MUST contain a Text (FreeType 2) source named 'SCROLLING_TEXT_SOURCE_NAME'.
 TEMPLATE_SCENE_NAME = "Scripture-Template"
 SCROLLING_TEXT_SOURCE_NAME = "sTextScrolling" # Use the name you gave the scrolling text source
 
+# Nested mode: the template's other items are copied once into these shared scenes, and each
+# verse scene nests them as single sources (the overlay only if items sit above the text)
+CHROME_SCENE_NAME = "Scripture-Template-Chrome"
+CHROME_OVERLAY_SCENE_NAME = "Scripture-Template-Chrome-Overlay"
+
+# Append-only journals of scene generation progress, used to resume interrupted runs
+JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".cache", "obs-scene-generator", "journals")
+
+# Connecting to OBS: attempts, exponential backoff between them (seconds, doubling up to
+# the cap) and the timeout of the TCP probe that checks the WebSocket port is listening
+CONNECT_MAX_RETRIES = 8
+CONNECT_BACKOFF_BASE = 0.5
+CONNECT_BACKOFF_MAX = 16
+CONNECT_PROBE_TIMEOUT = 1.0
+
+# Log of which passages produced which generated scenes, and when; read by --gc to apply
+# its retention policy
+GENERATION_LOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "obs-scene-generator", "generated.jsonl")
+
+# Image scenes: generated images are cached by prompt hash, least recently used first out
+# beyond IMAGE_CACHE_MAX_BYTES. OBS reads the images from this cache, so keep it larger than
+# the images the scenes in use show. IMAGE_BACKEND is the generator backend as
+# 'module:attribute' (e.g. 'bench.image_backend_standin:ImageBackendStandIn' for local runs).
+IMAGE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "obs-scene-generator", "images")
+IMAGE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+IMAGE_BACKEND = os.environ.get("IMAGE_BACKEND")
+IMAGE_MAX_WORKERS = 4 # Images generated at once; match the backend's parallelism
+IMAGE_WIDTH = 1920
+IMAGE_HEIGHT = 1080
+
+# Warm daemon: Unix socket it listens on for references, and how long the thin client
+# waits for a reply
+DAEMON_SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp", "obs-scene-generator.sock")
+DAEMON_REQUEST_TIMEOUT = 120
+
+# Pipelined (asyncio) mode: requests kept in flight at once, and seconds before one times out
+PIPELINE_MAX_IN_FLIGHT = 16
+PIPELINE_REQUEST_TIMEOUT = 10
+
+# Number of verse scenes sent to OBS in a single RequestBatch when running in batch mode
+BATCH_CHUNK_SIZE = 10
+
 # Your BIBLE_BOOK_IDS map (taken from your Apps Script)
 BIBLE_BOOK_IDS = {
     "Genesis": "GEN", "Exodus": "EXO", "Leviticus": "LEV", "Numbers": "NUM", "Deuteronomy": "DEU",
@@ -30,6 +96,17 @@ BIBLE_BOOK_IDS = {
     "1 John": "1JN", "2 John": "2JN", "3 John": "3JN", "Jude": "JUD", "Revelation": "REV"
 }
 
+# Number of chapters in each book, by book ID; a bare book name ('Psalms') means all of them
+BIBLE_CHAPTER_COUNTS = {
+    "GEN": 50, "EXO": 40, "LEV": 27, "NUM": 36, "DEU": 34, "JOS": 24, "JDG": 21, "RUT": 4, "1SA": 31, "2SA": 24,
+    "1KI": 22, "2KI": 25, "1CH": 29, "2CH": 36, "EZR": 10, "NEH": 13, "EST": 10, "JOB": 42, "PSA": 150, "PRO": 31,
+    "ECC": 12, "SNG": 8, "ISA": 66, "JER": 52, "LAM": 5, "EZK": 48, "DAN": 12, "HOS": 14, "JOL": 3, "AMO": 9,
+    "OBA": 1, "JON": 4, "MIC": 7, "NAM": 3, "HAB": 3, "ZEP": 3, "HAG": 2, "ZEC": 14, "MAL": 4,
+    "MAT": 28, "MRK": 16, "LUK": 24, "JHN": 21, "ACT": 28, "ROM": 16, "1CO": 16, "2CO": 13, "GAL": 6, "EPH": 6,
+    "PHP": 4, "COL": 4, "1TH": 5, "2TH": 3, "1TI": 6, "2TI": 4, "TIT": 3, "PHM": 1, "HEB": 13, "JAS": 5,
+    "1PE": 5, "2PE": 3, "1JN": 5, "2JN": 1, "3JN": 1, "JUD": 1, "REV": 22
+}
+
 # Maps common abbreviations to the canonical book name used in BIBLE_BOOK_IDS
 BOOK_ABBREVIATIONS = {
     "gen": "Genesis", "ex": "Exodus", "lev": "Leviticus", "num": "Numbers", "deut": "Deuteronomy",
@@ -46,5 +123,6 @@ BOOK_ABBREVIATIONS = {
     "1 thess": "1 Thessalonians", "2 thess": "2 Thessalonians", "1 tim": "1 Timothy",
     "2 tim": "2 Timothy", "titus": "Titus", "philem": "Philemon", "heb": "Hebrews",
     "james": "James", "1 pet": "1 Peter", "2 pet": "2 Peter", "1 jn": "1 John", "2 jn": "2 John",
-    "3 jn": "3 John", "jude": "Jude", "rev": "Revelation"
+    "3 jn": "3 John", "jude": "Jude", "rev": "Revelation",
+    "mt": "Matthew", "mk": "Mark", "lk": "Luke", "jn": "John", "song of solomon": "Song of Songs"
 }
\ No newline at end of file
@@ -0,0 +1,230 @@
+import hashlib
+import importlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import (
+    IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_MAX_WORKERS, IMAGE_WIDTH, IMAGE_HEIGHT, TEMPLATE_SCENE_NAME,
+)
+from bible_utils import resolve_references
+from chapter_cache import LruFiles
+from obs_automator import scene_item_requests
+from obs_batch import batch_request, send_batch, result_ok, result_error
+
+# --- IMAGE SCENES ---
+#
+# Builds one image scene per (reference, prompt) pair next to the text scenes. Images come
+# from a pluggable generator backend: any object with a `name` (part of the cache key, so
+# two models never share images), a file `extension`, and generate(prompt, width, height)
+# returning the image bytes. Calls run on a bounded worker pool, and every image is kept in
+# a content-addressed disk cache keyed by the prompt hash, so a rerun costs no calls.
+# Each scene is built from the template as soon as its image is ready, with the image in
+# place of the text source.
+
+IMAGE_SCENE_PREFIX = "Scripture-Image"
+IMAGE_SOURCE_PREFIX = "sImage"
+IMAGE_INPUT_KIND = 'image_source'
+
+
+def load_image_backend(spec):
+    """Instantiates a backend from 'module:attribute' (a class or factory taking no arguments)."""
+    if not spec or ':' not in spec:
+        raise ValueError("No image backend configured: set IMAGE_BACKEND or --image-backend to 'module:attribute'.")
+    module_name, attribute = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+class ImageCache:
+    """
+    On-disk, content-addressed store of generated images.
+
+    Each image lives at {key[:2]}/{key}.{extension}, where the key is the hash of the
+    backend, prompt and size. Once the images take more than max_bytes, the least recently
+    used ones are evicted (see chapter_cache.LruFiles).
+    """
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.files = LruFiles(cache_dir)
+
+    @staticmethod
+    def key_for(backend, prompt, width, height):
+        return hashlib.sha256(json.dumps([backend.name, prompt, width, height]).encode('utf-8')).hexdigest()
+
+    def path_for(self, key, extension):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{extension}")
+
+    def get(self, key, extension):
+        """Returns the path of a cached image, or None if it is not cached."""
+        path = self.path_for(key, extension)
+        try:
+            # Reading an image counts as a use for LRU purposes.
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, extension, data):
+        """Stores an image and evicts old ones if needed. Returns its path."""
+        path = self.path_for(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a truncated image behind.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def entries(self):
+        """Lists (modification time, size, path) for every cached image, oldest first."""
+        return self.files.entries()
+
+    def evict(self, keep=None):
+        """Removes the least recently used images until the rest fit in max_bytes."""
+        self.files.evict(max_bytes=self.max_bytes, keep=keep)
+
+
+def read_image_jobs(path):
+    """
+    Reads 'reference | prompt' lines (blank lines and # comments skipped) into jobs:
+    dicts with the reference, the prompt and the image scene name. Raises ValueError for a
+    line without a prompt or with a bad reference.
+    """
+    jobs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            reference, _, prompt = (part.strip() for part in line.partition('|'))
+            if not prompt:
+                raise ValueError(f"Image line needs 'reference | prompt': '{line}'")
+            jobs.append({'reference': reference, 'prompt': prompt, 'scene_name': image_scene_name(reference)})
+    return jobs
+
+
+def image_scene_name(reference):
+    """'John 3:16-18' -> 'Scripture-Image-JHN-3:16-18' (kept apart from the verse scene names)."""
+    _, book_id = resolve_references([reference], whole_books=True)[0]
+    numbers = re.search(r"\d[\d\s:,;\-–]*$", reference.strip())
+    return f"{IMAGE_SCENE_PREFIX}-{book_id}-{''.join(numbers.group(0).split()) if numbers else 'all'}"
+
+
+def image_input_name(job):
+    return f"{IMAGE_SOURCE_PREFIX}_{job['scene_name'][len(IMAGE_SCENE_PREFIX) + 1:].replace(':', '-')}"
+
+
+def generate_images(jobs, backend, cache, max_workers=IMAGE_MAX_WORKERS, width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """
+    Yields (job, image path or None, error or None, cached) as each job's image becomes
+    ready: cached images first, without calling the backend, then the others as the worker
+    pool finishes them. Jobs with the same prompt share a single backend call.
+    """
+    missing = []
+    for job in jobs:
+        key = cache.key_for(backend, job['prompt'], width, height)
+        path = cache.get(key, backend.extension)
+        if path:
+            yield job, path, None, True
+        else:
+            missing.append((job, key))
+    if not missing:
+        return
+
+    def generate(key, prompt):
+        return cache.put(key, backend.extension, backend.generate(prompt, width, height))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {}
+        for job, key in missing:
+            if key not in futures:
+                futures[key] = executor.submit(generate, key, job['prompt'])
+        waiting = {}
+        for job, key in missing:
+            waiting.setdefault(futures[key], []).append(job)
+        for future in as_completed(waiting):
+            try:
+                path, error = future.result(), None
+            except Exception as e:
+                path, error = None, f"{type(e).__name__}: {e}"
+            for job in waiting[future]:
+                yield job, path, error, False
+
+
+def build_image_scene(client, job, image_path, template, existing_scenes, layers=None):
+    """
+    Builds an image scene from the template, with the image where the text source is:
+    one batch for the scene and its items, one for the image's placement. An existing
+    scene just gets its image file swapped. Returns a list of error messages.
+    """
+    input_name = image_input_name(job)
+    settings = {'file': os.path.abspath(image_path)}
+    if job['scene_name'] in existing_scenes:
+        results = send_batch(client, [batch_request('SetInputSettings', {
+            'inputName': input_name, 'inputSettings': settings, 'overlay': True,
+        })])
+        return [result_error(result) for result in results if not result_ok(result)]
+
+    requests = [batch_request('CreateScene', {'sceneName': job['scene_name']})]
+    requests += scene_item_requests(job, template, layers, content_input={
+        'inputName': input_name, 'inputKind': IMAGE_INPUT_KIND, 'inputSettings': settings,
+    })
+    errors = []
+    transform_requests = []
+    for result in send_batch(client, requests, halt_on_failure=True):
+        if not result_ok(result):
+            errors.append(result_error(result))
+        elif result['requestType'] == 'CreateInput':
+            transform_requests.append(batch_request('SetSceneItemTransform', {
+                'sceneName': job['scene_name'],
+                'sceneItemId': result['responseData']['sceneItemId'],
+                'sceneItemTransform': template.transform,
+            }))
+    errors += [result_error(result) for result in send_batch(client, transform_requests) if not result_ok(result)]
+    if not errors:
+        existing_scenes.add(job['scene_name'])
+    return errors
+
+
+def run_image_stage(client, jobs, backend, template, cache=None, max_workers=IMAGE_MAX_WORKERS, layers=None,
+                    width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """
+    Generates (or reuses) every job's image and builds its scene as soon as it is ready.
+    Returns {'cached': n, 'generated': n, 'scenes': n, 'failures': [(reference, error)]},
+    where 'generated' counts backend calls and 'cached' the jobs served from the cache.
+    """
+    cache = cache or ImageCache()
+    print(f"\nStarting image stage: {len(jobs)} image scenes based on '{TEMPLATE_SCENE_NAME}'...")
+    existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+    report = {'cached': 0, 'generated': 0, 'scenes': 0, 'failures': []}
+    generated_paths = set()
+
+    for job, path, error, cached in generate_images(jobs, backend, cache, max_workers=max_workers, width=width,
+                                                    height=height):
+        if cached:
+            report['cached'] += 1
+        elif path:
+            generated_paths.add(path)
+            report['generated'] = len(generated_paths)
+        if error:
+            report['failures'].append((job['reference'], error))
+            continue
+        errors = build_image_scene(client, job, path, template, existing_scenes, layers=layers)
+        if errors:
+            report['failures'] += [(job['reference'], message) for message in errors]
+        else:
+            report['scenes'] += 1
+            print(f"Generated image scene for {job['reference']}")
+    return report
+
+
+def format_image_report(report):
+    lines = [f"  Failed on {reference}: {message}" for reference, message in report['failures']]
+    lines.append(f"Image stage: {report['scenes']} scenes, {report['generated']} images generated, "
+                 f"{report['cached']} reused from cache, {len(report['failures'])} failures.")
+    return "\n".join(lines)
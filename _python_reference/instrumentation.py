@@ -0,0 +1,164 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from websocket import ABNF
+
+# --- HOT-PATH INSTRUMENTATION ---
+#
+# A process-wide profiler that records timing spans (per phase and per OBS request type)
+# and counters (round trips, bytes). It is off by default: span() then hands back a shared
+# no-op context manager, so instrumented code pays one attribute check per call.
+
+METRIC_PREFIX = "obs_scene_generator"
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        with self.lock:
+            self.spans = {}
+            self.counters = {}
+
+    def span(self, name):
+        """Times the enclosed block under `name` when profiling is enabled."""
+        if not self.enabled:
+            return NULL_SPAN
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.spans.setdefault(name, []).append(seconds)
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """Returns {'spans': {name: stats}, 'counters': {name: value}} for the recorded data."""
+        with self.lock:
+            spans = {name: list(values) for name, values in self.spans.items()}
+            counters = dict(self.counters)
+        stats = {}
+        for name, values in sorted(spans.items()):
+            ordered = sorted(values)
+            stats[name] = {
+                'count': len(ordered),
+                'total_seconds': sum(ordered),
+                'p50_seconds': ordered[max(0, math.ceil(0.5 * len(ordered)) - 1)],
+                'p99_seconds': ordered[max(0, math.ceil(0.99 * len(ordered)) - 1)],
+                'max_seconds': ordered[-1],
+            }
+        return {'spans': stats, 'counters': dict(sorted(counters.items()))}
+
+    def format_table(self):
+        summary = self.summary()
+        lines = [f"{'span':<36} {'count':>7} {'total ms':>10} {'p50 ms':>9} {'p99 ms':>9}"]
+        for name, stats in summary['spans'].items():
+            lines.append(f"{name:<36} {stats['count']:>7} {stats['total_seconds'] * 1000:>10.1f} "
+                         f"{stats['p50_seconds'] * 1000:>9.2f} {stats['p99_seconds'] * 1000:>9.2f}")
+        for name, value in summary['counters'].items():
+            lines.append(f"{name:<36} {value:>7}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def format_prometheus(self):
+        """Renders the summary in the Prometheus text exposition format (for textfile collectors)."""
+        summary = self.summary()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_span_seconds Time spent per phase or OBS request type.",
+            f"# TYPE {METRIC_PREFIX}_span_seconds summary",
+        ]
+        for name, stats in summary['spans'].items():
+            label = f'span="{name}"'
+            lines.append(f'{METRIC_PREFIX}_span_seconds{{{label},quantile="0.5"}} {stats["p50_seconds"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds{{{label},quantile="0.99"}} {stats["p99_seconds"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_sum{{{label}}} {stats["total_seconds"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_count{{{label}}} {stats["count"]}')
+        for name, value in summary['counters'].items():
+            metric = f"{METRIC_PREFIX}_{name.replace('.', '_')}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Write then rename, so a textfile collector never reads a half-written file.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.format_prometheus())
+        os.replace(tmp_path, path)
+
+
+profiler = Profiler()
+
+
+def instrument_obs_client(client):
+    """
+    Wraps an obsws_python ReqClient so every request is timed by type and every websocket
+    message is counted, along with its size. Batched and pipelined requests share the
+    same websocket, so their round trips and bytes are counted too.
+    """
+    if not profiler.enabled:
+        return client
+    base_client = client.base_client
+    ws = base_client.ws
+    original_req, original_send, original_recv_data = base_client.req, ws.send, ws.recv_data
+
+    def timed_req(req_type, req_data=None):
+        with profiler.span(f"obs.{req_type}"):
+            return original_req(req_type, req_data)
+
+    def counted_send(payload, opcode=ABNF.OPCODE_TEXT):
+        # Control frames (ping, close) are not requests.
+        if opcode == ABNF.OPCODE_TEXT:
+            profiler.count('obs.messages_sent')
+            profiler.count('obs.bytes_sent', len(payload))
+        return original_send(payload, opcode)
+
+    def counted_recv_data(control_frame=False):
+        # recv() reads through recv_data(), and the pipelined reader calls it directly.
+        opcode, payload = original_recv_data(control_frame)
+        if opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY):
+            profiler.count('obs.messages_received')
+            profiler.count('obs.bytes_received', len(payload))
+        return opcode, payload
+
+    base_client.req = timed_req
+    ws.send = counted_send
+    ws.recv_data = counted_recv_data
+    return client
@@ -0,0 +1,144 @@
+from config import (
+    TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME, CHROME_SCENE_NAME, CHROME_OVERLAY_SCENE_NAME, BATCH_CHUNK_SIZE,
+)
+from obs_batch import batch_request, send_batch, result_ok, result_error
+from obs_reconcile import GENERATED_SCENE_PATTERN
+
+# --- NESTED-SCENE MODE ---
+#
+# Instead of copying every template item into every verse scene, the template's items
+# other than the text source are copied once into a shared "chrome" scene. Each verse
+# scene then holds two items: the chrome scene, nested as a scene source, and its own
+# text input. Template items stacked above the text source go into a second, overlay
+# chrome scene, so the template's layering is kept.
+
+
+def split_template_items(template):
+    """Returns (items below the text source, items above it), bottom first."""
+    text_index = next(index for index, item in enumerate(template.items)
+                      if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME)
+    return template.items[:text_index], template.items[text_index + 1:]
+
+
+def chrome_layers(template):
+    """
+    Returns the layers of a nested verse scene, bottom first, in the shape of template
+    items: chrome scenes are marked 'nested', and the text source is the template's own
+    text item. A chrome scene is only used if the template has items for it.
+    """
+    below, above = split_template_items(template)
+    layers = []
+    if below:
+        layers.append({'sourceName': CHROME_SCENE_NAME, 'nested': True})
+    layers.append(template.text_item)
+    if above:
+        layers.append({'sourceName': CHROME_OVERLAY_SCENE_NAME, 'nested': True})
+    return layers
+
+
+def ensure_chrome_scenes(client, template, existing_scenes=None):
+    """
+    Creates the chrome scenes that do not exist yet, copying the template items into them
+    in one RequestBatch, and returns the nested layers. Existing chrome scenes are left
+    alone, so edits made to them in OBS carry over to every verse scene.
+    """
+    if existing_scenes is None:
+        existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+    requests = []
+    for scene_name, items in zip((CHROME_SCENE_NAME, CHROME_OVERLAY_SCENE_NAME), split_template_items(template)):
+        if not items or scene_name in existing_scenes:
+            continue
+        requests.append(batch_request('CreateScene', {'sceneName': scene_name}))
+        requests += [batch_request('DuplicateSceneItem', {
+            'sceneName': TEMPLATE_SCENE_NAME,
+            'sceneItemId': item['sceneItemId'],
+            'destinationSceneName': scene_name,
+        }) for item in items]
+        print(f"Created shared chrome scene '{scene_name}' from {len(items)} template items.")
+
+    for result in send_batch(client, requests, halt_on_failure=True):
+        if not result_ok(result):
+            raise RuntimeError(f"Could not build the chrome scenes: {result_error(result)}")
+    existing_scenes.update(request['requestData']['sceneName'] for request in requests
+                           if request['requestType'] == 'CreateScene')
+    return chrome_layers(template)
+
+
+def plan_migration(scene_items, layers):
+    """
+    Picks the generated scenes that still hold copies of the template items.
+
+    scene_items maps scene name -> item list (as returned by GetSceneItemList). Returns a
+    list of (scene name, item IDs to remove) for every scene with exactly one verse text
+    input whose other items are not already the nested layers.
+    """
+    prefix = f"{SCROLLING_TEXT_SOURCE_NAME}_"
+    wanted = [layer['sourceName'] for layer in layers]
+    plan = []
+    for scene_name, items in scene_items.items():
+        texts = [item for item in items if item['sourceName'].startswith(prefix)]
+        if len(texts) != 1:
+            continue
+        sources = [SCROLLING_TEXT_SOURCE_NAME if item is texts[0] else item['sourceName'] for item in items]
+        if sources != wanted:
+            plan.append((scene_name, [item['sceneItemId'] for item in items if item is not texts[0]]))
+    return plan
+
+
+def migrate_to_nested(client, template, chunk_size=BATCH_CHUNK_SIZE, dry_run=False):
+    """
+    Converts generated scenes built by copying every template item into nested scenes.
+
+    Each scene keeps its text input (text, transform and all). Its other items are removed
+    and replaced by the chrome scenes, with the lower chrome moved under the text. Scenes
+    are changed in place, so their order in OBS does not change. Costs one read batch and
+    two write batches per chunk_size scenes. Returns (number of scenes planned, failures).
+    """
+    print("\nMigrating generated scenes to nested chrome scenes...")
+    existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+    generated = sorted(name for name in existing_scenes if GENERATED_SCENE_PATTERN.match(name))
+    layers = chrome_layers(template) if dry_run else ensure_chrome_scenes(client, template, existing_scenes)
+
+    failures = []
+    items_before = items_after = planned = 0
+    for start in range(0, len(generated), chunk_size):
+        chunk = generated[start:start + chunk_size]
+        results = send_batch(client, [batch_request('GetSceneItemList', {'sceneName': name}) for name in chunk])
+        scene_items = {name: result['responseData']['sceneItems']
+                       for name, result in zip(chunk, results) if result_ok(result)}
+        plan = plan_migration(scene_items, layers)
+        planned += len(plan)
+        items_before += sum(len(scene_items[name]) for name, _ in plan)
+        items_after += len(plan) * len(layers)
+        if dry_run or not plan:
+            continue
+
+        # Swap the copied items for the chrome scenes (added on top), then move the lower chrome under the text.
+        requests = []
+        owners = []
+        for scene_name, item_ids in plan:
+            requests += [batch_request('RemoveSceneItem', {'sceneName': scene_name, 'sceneItemId': item_id})
+                         for item_id in item_ids]
+            requests += [batch_request('CreateSceneItem', {'sceneName': scene_name, 'sourceName': layer['sourceName']})
+                         for layer in layers if layer.get('nested')]
+            owners += [scene_name] * (len(item_ids) + len(layers) - 1)
+
+        index_requests = []
+        for scene_name, request, result in zip(owners, requests, send_batch(client, requests)):
+            if not result_ok(result):
+                failures.append((scene_name, result_error(result)))
+            elif request['requestType'] == 'CreateSceneItem' and request['requestData']['sourceName'] == CHROME_SCENE_NAME:
+                index_requests.append(batch_request('SetSceneItemIndex', {
+                    'sceneName': scene_name,
+                    'sceneItemId': result['responseData']['sceneItemId'],
+                    'sceneItemIndex': 0,
+                }))
+        for request, result in zip(index_requests, send_batch(client, index_requests)):
+            if not result_ok(result):
+                failures.append((request['requestData']['sceneName'], result_error(result)))
+
+    action = "Would migrate" if dry_run else "Migrated"
+    print(f"{action} {planned} scenes: {items_before} scene items -> {items_after}.")
+    for scene_name, message in failures:
+        print(f"Failed on {scene_name}: {message}")
+    return planned, failures
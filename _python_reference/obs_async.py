@@ -0,0 +1,226 @@
+import asyncio
+import itertools
+import json
+import threading
+
+from obsws_python.error import OBSSDKRequestError, OBSSDKTimeoutError
+from websocket import ABNF, WebSocketTimeoutException
+
+from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME, PIPELINE_MAX_IN_FLIGHT, PIPELINE_REQUEST_TIMEOUT
+from instrumentation import profiler
+from obs_automator import unique_source_name, resume_pending, resume_hint
+from template_snapshot import TemplateSnapshot
+
+REQUEST_OP = 6
+REQUEST_RESPONSE_OP = 7
+READER_POLL_SECONDS = 0.2
+CLOSE_PING = b'obs-async-close'
+
+
+class AsyncObsClient:
+    """
+    Pipelined obs-websocket v5 client that keeps several requests in flight at once.
+
+    It borrows the already authenticated websocket of an obsws_python ReqClient. A reader
+    thread matches responses to waiting futures by request ID, a semaphore bounds how many
+    requests are outstanding (backpressure), and every request has its own timeout. The
+    ReqClient must not be used while this client is open.
+    """
+
+    def __init__(self, ws, max_in_flight=PIPELINE_MAX_IN_FLIGHT, timeout=PIPELINE_REQUEST_TIMEOUT):
+        self.ws = ws
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._closed = False
+        self._reader = None
+        self._saved_timeout = None
+        self.loop = None
+        self.window = None
+
+    @classmethod
+    def from_req_client(cls, client, **kwargs):
+        return cls(client.base_client.ws, **kwargs)
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.window = asyncio.Semaphore(self.max_in_flight)
+        # Short receive timeouts let the reader thread notice when the client is closed.
+        self._saved_timeout = self.ws.gettimeout()
+        self.ws.settimeout(READER_POLL_SECONDS)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        loop = asyncio.get_running_loop()
+        # A ping wakes the reader at once: it stops at the matching pong, which also leaves
+        # no reply of ours behind on the socket for the ReqClient. If the ping cannot be sent
+        # or is not answered in time, the reader stops at its next poll timeout instead.
+        try:
+            self.ws.ping(CLOSE_PING)
+        except Exception:
+            self._closed = True
+        await loop.run_in_executor(None, self._reader.join, self.timeout)
+        self._closed = True
+        await loop.run_in_executor(None, self._reader.join)
+        self.ws.settimeout(self._saved_timeout)
+
+    def _read_loop(self):
+        while True:
+            try:
+                opcode, raw = self.ws.recv_data(control_frame=True)
+            except WebSocketTimeoutException:
+                if self._closed:
+                    return
+                continue
+            except Exception as e:
+                self.loop.call_soon_threadsafe(self._fail_all, e)
+                return
+            if opcode == ABNF.OPCODE_PONG and raw == CLOSE_PING:
+                return
+            if opcode == ABNF.OPCODE_CLOSE:
+                self.loop.call_soon_threadsafe(self._fail_all, ConnectionError("closed by OBS"))
+                return
+            if opcode != ABNF.OPCODE_TEXT:
+                continue
+            message = json.loads(raw)
+            if message.get('op') == REQUEST_RESPONSE_OP:
+                self.loop.call_soon_threadsafe(self._resolve, message['d'])
+
+    def _resolve(self, response):
+        future = self._pending.pop(response.get('requestId'), None)
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def _fail_all(self, error):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"OBS connection lost: {error}"))
+        self._pending.clear()
+
+    async def request(self, request_type, request_data=None):
+        """Sends one request and waits for its response data, raising on failure or timeout."""
+        async with self.window:
+            request_id = str(next(self._ids))
+            future = self.loop.create_future()
+            self._pending[request_id] = future
+            payload = {'op': REQUEST_OP, 'd': {'requestType': request_type, 'requestId': request_id}}
+            if request_data:
+                payload['d']['requestData'] = request_data
+            try:
+                with profiler.span(f"obs.{request_type}"):
+                    self.ws.send(json.dumps(payload))
+                    response = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError as e:
+                raise OBSSDKTimeoutError(f"{request_type} timed out after {self.timeout} seconds") from e
+            finally:
+                self._pending.pop(request_id, None)
+
+        status = response['requestStatus']
+        if not status['result']:
+            raise OBSSDKRequestError(request_type, status['code'], status.get('comment'))
+        return response.get('responseData', {})
+
+
+async def build_verse_scene(obs, verse, template, existing_scenes, previous_created, created, journal=None):
+    """
+    Builds or updates one verse scene, respecting the dependencies between its requests.
+
+    Scenes are created strictly in order (each waits for the previous CreateScene) so OBS
+    lists them in reading order; everything after that overlaps with the other scenes.
+    Items within a scene are still added one after another to keep the template's layering.
+    With a SceneJournal, the scene is recorded as started before its CreateScene and as
+    done once its last request succeeded.
+    """
+    new_scene_name = verse['scene_name']
+    source_name = unique_source_name(verse)
+
+    if new_scene_name in existing_scenes:
+        created.set()
+        await obs.request('SetInputSettings', {
+            'inputName': source_name,
+            'inputSettings': {'text': verse['obs_text']},
+            'overlay': True,
+        })
+        if journal is not None:
+            journal.record(new_scene_name, 'done')
+        return
+
+    try:
+        await previous_created.wait()
+        if journal is not None:
+            journal.record(new_scene_name, 'started')
+        await obs.request('CreateScene', {'sceneName': new_scene_name})
+    finally:
+        created.set()
+
+    for item in template.items:
+        if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME:
+            response = await obs.request('CreateInput', {
+                'sceneName': new_scene_name,
+                'inputName': source_name,
+                'inputKind': template.kind,
+                'inputSettings': template.text_settings(verse['obs_text']),
+                'sceneItemEnabled': True,
+            })
+            new_item_id = response.get('sceneItemId')
+            if new_item_id is None:
+                new_item_id = (await obs.request('GetSceneItemId', {
+                    'sceneName': new_scene_name, 'sourceName': source_name,
+                }))['sceneItemId']
+            await obs.request('SetSceneItemTransform', {
+                'sceneName': new_scene_name,
+                'sceneItemId': new_item_id,
+                'sceneItemTransform': template.transform,
+            })
+        else:
+            await obs.request('DuplicateSceneItem', {
+                'sceneName': TEMPLATE_SCENE_NAME,
+                'sceneItemId': item['sceneItemId'],
+                'destinationSceneName': new_scene_name,
+            })
+    if journal is not None:
+        journal.record(new_scene_name, 'done')
+
+
+async def automate_scene_generation_async(client, verses, template=None, max_in_flight=PIPELINE_MAX_IN_FLIGHT,
+                                          timeout=PIPELINE_REQUEST_TIMEOUT, journal=None):
+    """
+    Asyncio counterpart of automate_scene_generation that keeps up to max_in_flight
+    requests outstanding, so independent scenes are built in parallel. Returns a list of
+    (reference, error message) tuples for the verses that failed.
+    """
+    print("\nStarting pipelined scene generation process...")
+    failures = []
+    try:
+        template = template or TemplateSnapshot.capture(client)
+        existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+        print(f"Attempting to create scenes based on '{TEMPLATE_SCENE_NAME}' with up to {max_in_flight} requests in flight...")
+
+        ordered_verses = list(reversed(resume_pending(client, verses, existing_scenes, journal)))
+        async with AsyncObsClient.from_req_client(client, max_in_flight=max_in_flight, timeout=timeout) as obs:
+            previous = asyncio.Event()
+            previous.set()
+            tasks = []
+            for verse in ordered_verses:
+                created = asyncio.Event()
+                tasks.append(build_verse_scene(obs, verse, template, existing_scenes, previous, created, journal=journal))
+                previous = created
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        for verse, result in zip(ordered_verses, results):
+            if isinstance(result, Exception):
+                failures.append((verse['reference'], str(result)))
+            else:
+                print(f"Generated scene for {verse['reference']}")
+    except Exception as e:
+        print(f"OBS Automation Error: {e}")
+        failures.append((TEMPLATE_SCENE_NAME, str(e)))
+
+    for reference, message in failures:
+        print(f"Failed on {reference}: {message}")
+    if failures:
+        resume_hint(journal)
+    return failures
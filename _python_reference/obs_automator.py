@@ -1,96 +1,321 @@
 from obsws_python import ReqClient
-from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME
+from obsws_python.error import OBSSDKRequestError
+from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME, BATCH_CHUNK_SIZE
+from obs_batch import batch_request, send_batch, result_ok, result_error
+from template_snapshot import TemplateSnapshot
 
-def automate_scene_generation(client, verses):
+
+def unique_source_name(verse):
+    """Builds the name of the text source that belongs to a single verse scene."""
+    return f"{SCROLLING_TEXT_SOURCE_NAME}_{verse['reference'].replace(' ', '_').replace(':', '-')}"
+
+def repair_partial_scene(client, verse, existing_scenes):
+    """
+    Removes whatever an interrupted run left of a verse scene (its text input and the
+    scene itself), so it can be generated again from scratch with the template's layering.
+    """
+    for remove, name in ((client.remove_input, unique_source_name(verse)), (client.remove_scene, verse['scene_name'])):
+        try:
+            remove(name)
+        except OBSSDKRequestError:
+            pass  # The interrupted run never got that far
+    existing_scenes.discard(verse['scene_name'])
+    print(f"Repaired partially built scene: {verse['scene_name']}")
+
+def resume_pending(client, verses, existing_scenes, journal):
+    """
+    Returns the verses a resumed run still has to generate, in the order given, skipping
+    the ones the journal records as done and repairing the ones it records as started.
+    """
+    if journal is None:
+        return verses
+    pending = []
+    for verse in verses:
+        if journal.is_done(verse['scene_name']):
+            continue
+        if journal.is_partial(verse['scene_name']):
+            repair_partial_scene(client, verse, existing_scenes)
+        pending.append(verse)
+    skipped = len(verses) - len(pending)
+    if skipped:
+        print(f"Resuming: {skipped} scenes already done, {len(pending)} to go.")
+    return pending
+
+def resume_hint(journal):
+    if journal is not None:
+        print(f"Progress is saved in {journal.path}; run again with --resume to continue from here.")
+
+def generate_verse_scene(client, verse, template, existing_scenes, journal=None):
+    """
+    Creates the scene for one verse from the template, or updates its text if it already exists.
+    With a SceneJournal, each completed step is recorded as it happens.
+    """
+    record = journal.record if journal is not None else (lambda *args, **kwargs: None)
+    new_scene_name = verse['scene_name']
+    # Create a unique source name for each verse's text source
+    source_name = unique_source_name(verse)
+
+    # Check if scene already exists
+    if new_scene_name in existing_scenes:
+        print(f"Scene '{new_scene_name}' already exists. Skipping creation and updating text.")
+        # Update the text content of the unique source associated with this existing scene
+        client.set_input_settings(
+            name=source_name,
+            settings={'text': verse['obs_text']},
+            overlay=True
+        )
+        print(f"Updated text in existing scene: {new_scene_name}")
+        record(new_scene_name, 'done')
+        return
+
+    # 1. Create a new, empty scene.
+    record(new_scene_name, 'started')
+    client.create_scene(new_scene_name)
+    record(new_scene_name, 'scene')
+    print(f"Created new scene: {new_scene_name}")
+
+    # 2. Duplicate all items from the template scene, handling the text source specially.
+    for item in template.items:
+        if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME:
+            # This is our special text source. Create a new unique one and apply its transform.
+            print(f"Handling special source: {SCROLLING_TEXT_SOURCE_NAME}")
+
+            # a. Create the new unique input (source).
+            client.create_input(
+                sceneName=new_scene_name,
+                inputName=source_name,
+                inputKind=template.kind,
+                inputSettings=template.settings,
+                sceneItemEnabled=True
+            )
+            record(new_scene_name, 'input', source=source_name)
+            print(f"Created unique source '{source_name}' for new scene.")
+
+            # b. Get the ID of the newly created scene item.
+            new_item_id_response = client.get_scene_item_id(new_scene_name, source_name)
+            new_item_id = new_item_id_response.scene_item_id
+
+            # c. Apply the template transform to the new scene item.
+            client.set_scene_item_transform(new_scene_name, new_item_id, template.transform_copy())
+            record(new_scene_name, 'transform')
+            print(f"Applied transform from template to '{source_name}'.")
+        else:
+            # This is a regular item (like 'Base Layer'), just duplicate it.
+            client.duplicate_scene_item(scene_name=TEMPLATE_SCENE_NAME, item_id=item['sceneItemId'], dest_scene_name=new_scene_name)
+            record(new_scene_name, 'item', source=item['sourceName'])
+            print(f"Duplicated item '{item['sourceName']}' to '{new_scene_name}'.")
+
+    # 3. Set the text content on the unique source.
+    client.set_input_settings(
+        name=source_name,
+        settings={'text': verse['obs_text']},
+        overlay=True
+    )
+    record(new_scene_name, 'done')
+    print(f"Copied source and injected scripture text for {verse['reference']}")
+
+def automate_scene_generation(client, verses, template=None, journal=None):
     """
     Automates scene creation and modification in the currently active scene collection.
+    With a SceneJournal opened for resuming, finished scenes are skipped and half-built
+    ones are repaired first. Stops at the first error; returns [(reference, error)] for
+    it, or [] if every scene was built.
     """
     print("\nStarting scene generation process...")
+    verse = None
     try:
-        # Get settings of the template scrolling text source
-        template_source_settings_response = client.get_input_settings(SCROLLING_TEXT_SOURCE_NAME)
-        template_source_settings = template_source_settings_response.input_settings
-        template_source_kind = template_source_settings_response.input_kind
-
-        # Get all items from the template scene to duplicate them
-        template_scene_items_response = client.get_scene_item_list(TEMPLATE_SCENE_NAME)
-        template_scene_items = template_scene_items_response.scene_items
+        # Settings, items and text transform of the template, read once for the whole run
+        template = template or TemplateSnapshot.capture(client)
 
         scenes_response = client.get_scene_list()
-        all_scenes = scenes_response.scenes
+        existing_scenes = {scene['sceneName'] for scene in scenes_response.scenes}
         print(f"Attempting to create scenes and inject text based on '{TEMPLATE_SCENE_NAME}'...")
 
-        for verse in reversed(verses):
+        for verse in reversed(resume_pending(client, verses, existing_scenes, journal)):
+            generate_verse_scene(client, verse, template, existing_scenes, journal=journal)
+    except Exception as e:
+        print(f"OBS Automation Error: {e}")
+        resume_hint(journal)
+        return [(verse['reference'] if verse else TEMPLATE_SCENE_NAME, str(e))]
+    return []
+
+def stream_scene_generation(client, verse_stream, template=None, journal=None):
+    """
+    Creates scenes from an iterator of verses (in creation order, as produced by
+    bible_utils.stream_verses) as soon as each verse arrives. Stops at the first OBS error,
+    like automate_scene_generation, and returns (verses handled, [(reference, error)]).
+    Errors fetching the verses are raised to the caller rather than reported as OBS ones.
+    """
+    print("\nStarting streaming scene generation process...")
+    generated = 0
+
+    def failed(reference, error):
+        print(f"OBS Automation Error: {error}")
+        resume_hint(journal)
+        return generated, [(reference, str(error))]
+
+    try:
+        try:
+            template = template or TemplateSnapshot.capture(client)
+            existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+        except Exception as e:
+            return failed(TEMPLATE_SCENE_NAME, e)
+        for verse in verse_stream:
+            try:
+                for pending in resume_pending(client, [verse], existing_scenes, journal):
+                    generate_verse_scene(client, pending, template, existing_scenes, journal=journal)
+            except Exception as e:
+                return failed(verse['reference'], e)
+            generated += 1
+    finally:
+        close = getattr(verse_stream, 'close', None)
+        if close:
+            close()
+    return generated, []
+
+def scene_item_requests(verse, template, layers=None, content_input=None):
+    """
+    Builds the requests that fill a new verse scene, bottom layer first: the verse's own
+    text input, and a copy of every other template item. With layers (see
+    nested_scenes.chrome_layers), the other items come from shared chrome scenes instead,
+    each added as a single nested scene source. content_input (inputName, inputKind and
+    inputSettings) replaces the text input, e.g. with an image.
+    """
+    new_scene_name = verse['scene_name']
+    requests = []
+    for item in layers or template.items:
+        if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME:
+            requests.append(batch_request('CreateInput', {
+                'sceneName': new_scene_name,
+                **(content_input or {
+                    'inputName': unique_source_name(verse),
+                    'inputKind': template.kind,
+                    'inputSettings': template.text_settings(verse['obs_text']),
+                }),
+                'sceneItemEnabled': True,
+            }))
+        elif item.get('nested'):
+            requests.append(batch_request('CreateSceneItem', {
+                'sceneName': new_scene_name,
+                'sourceName': item['sourceName'],
+                'sceneItemEnabled': True,
+            }))
+        else:
+            requests.append(batch_request('DuplicateSceneItem', {
+                'sceneName': TEMPLATE_SCENE_NAME,
+                'sceneItemId': item['sceneItemId'],
+                'destinationSceneName': new_scene_name,
+            }))
+    return requests
+
+def apply_scene_batches(client, verses, existing_scenes, template, chunk_size=BATCH_CHUNK_SIZE, journal=None,
+                        layers=None, failures=None):
+    """
+    Creates the scenes of verses not in existing_scenes from a TemplateSnapshot and updates
+    the text of the others, chunk_size verses per RequestBatch. Verses are processed in reverse, like
+    automate_scene_generation, so OBS lists them in reading order. Returns a list of
+    (reference, error message) tuples for every request that failed. With a SceneJournal,
+    new scenes are recorded as started before their batch is sent and as done once both
+    of their batches succeeded. layers is passed on to scene_item_requests.
+
+    Failures are appended to failures, if given. When a batch cannot be sent at all (the
+    connection dropped), every verse of its chunk is recorded with the error before it is
+    raised, so the caller still has the complete list.
+    """
+    failures = [] if failures is None else failures
+    ordered_verses = list(reversed(verses))
+    for start in range(0, len(ordered_verses), chunk_size):
+        chunk = ordered_verses[start:start + chunk_size]
+        requests = []
+        owners = []
+        for verse in chunk:
             new_scene_name = verse['scene_name']
-            # Create a unique source name for each verse's text source
-            unique_source_name = f"{SCROLLING_TEXT_SOURCE_NAME}_{verse['reference'].replace(' ', '_').replace(':', '-')}"
-
-            # Check if scene already exists
-            scene_exists = False
-            for scene in all_scenes:
-                if scene['sceneName'] == new_scene_name:
-                    scene_exists = True
-                    break
-
-            if scene_exists:
-                print(f"Scene '{new_scene_name}' already exists. Skipping creation and updating text.")
-                # Update the text content of the unique source associated with this existing scene
-                client.set_input_settings(
-                    name=unique_source_name,
-                    settings={'text': verse['obs_text']},
-                    overlay=True
-                )
-                print(f"Updated text in existing scene: {new_scene_name}")
+            source_name = unique_source_name(verse)
+
+            if new_scene_name in existing_scenes:
+                requests.append(batch_request('SetInputSettings', {
+                    'inputName': source_name,
+                    'inputSettings': {'text': verse['obs_text']},
+                    'overlay': True,
+                }))
+                owners.append(verse)
                 continue
 
-            # 1. Create a new, empty scene.
-            client.create_scene(new_scene_name)
-            print(f"Created new scene: {new_scene_name}")
-
-            # 2. Duplicate all items from the template scene, handling the text source specially.
-            for item in template_scene_items:
-                if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME:
-                    # This is our special text source. Create a new unique one and apply its transform.
-                    print(f"Handling special source: {SCROLLING_TEXT_SOURCE_NAME}")
-
-                    # a. Get the transform of the template text item.
-                    transform_response = client.get_scene_item_transform(TEMPLATE_SCENE_NAME, item['sceneItemId'])
-                    template_transform = transform_response.scene_item_transform
-
-                    # Ensure boundsWidth and boundsHeight are at least 1.0 to prevent OBS errors
-                    if template_transform['boundsWidth'] < 1.0:
-                        template_transform['boundsWidth'] = 1.0
-                    if template_transform['boundsHeight'] < 1.0:
-                        template_transform['boundsHeight'] = 1.0
-
-                    # b. Create the new unique input (source).
-                    client.create_input(
-                        sceneName=new_scene_name,
-                        inputName=unique_source_name,
-                        inputKind=template_source_kind,
-                        inputSettings=template_source_settings,
-                        sceneItemEnabled=True
-                    )
-                    print(f"Created unique source '{unique_source_name}' for new scene.")
-
-                    # c. Get the ID of the newly created scene item.
-                    new_item_id_response = client.get_scene_item_id(new_scene_name, unique_source_name)
-                    new_item_id = new_item_id_response.scene_item_id
-
-                    # d. Apply the saved transform to the new scene item.
-                    client.set_scene_item_transform(new_scene_name, new_item_id, template_transform)
-                    print(f"Applied transform from template to '{unique_source_name}'.")
-                else:
-                    # This is a regular item (like 'Base Layer'), just duplicate it.
-                    client.duplicate_scene_item(scene_name=TEMPLATE_SCENE_NAME, item_id=item['sceneItemId'], dest_scene_name=new_scene_name)
-                    print(f"Duplicated item '{item['sourceName']}' to '{new_scene_name}'.")
-
-            # 3. Set the text content on the unique source.
-            client.set_input_settings(
-                name=unique_source_name,
-                settings={'text': verse['obs_text']},
-                overlay=True
-            )
-            print(f"Copied source and injected scripture text for {verse['reference']}")
+            if journal is not None:
+                journal.record(new_scene_name, 'started')
+            requests.append(batch_request('CreateScene', {'sceneName': new_scene_name}))
+            owners.append(verse)
+            item_requests = scene_item_requests(verse, template, layers)
+            requests += item_requests
+            owners += [verse] * len(item_requests)
+
+        failed_references = set()
+        try:
+            # Resolve the new text item IDs from the CreateInput responses, then send the transforms.
+            transform_requests = []
+            transform_owners = []
+            for verse, result in zip(owners, send_batch(client, requests)):
+                if not result_ok(result):
+                    failures.append((verse['reference'], result_error(result)))
+                    failed_references.add(verse['reference'])
+                    continue
+                if result['requestType'] == 'CreateInput':
+                    new_item_id = result.get('responseData', {}).get('sceneItemId')
+                    if new_item_id is None:
+                        new_item_id = client.get_scene_item_id(verse['scene_name'], unique_source_name(verse)).scene_item_id
+                    transform_requests.append(batch_request('SetSceneItemTransform', {
+                        'sceneName': verse['scene_name'],
+                        'sceneItemId': new_item_id,
+                        'sceneItemTransform': template.transform,
+                    }))
+                    transform_owners.append(verse)
+
+            for verse, result in zip(transform_owners, send_batch(client, transform_requests)):
+                if not result_ok(result):
+                    failures.append((verse['reference'], result_error(result)))
+                    failed_references.add(verse['reference'])
+        except Exception as e:
+            failures += [(verse['reference'], str(e)) for verse in chunk if verse['reference'] not in failed_references]
+            raise
+
+        for verse in chunk:
+            if verse['reference'] not in failed_references:
+                if journal is not None:
+                    journal.record(verse['scene_name'], 'done')
+                print(f"Generated scene for {verse['reference']}")
+
+    return failures
+
+def automate_scene_generation_batched(client, verses, chunk_size=BATCH_CHUNK_SIZE, template=None, journal=None,
+                                      layers=None):
+    """
+    Same result as automate_scene_generation, but sends the work to OBS as RequestBatches.
+
+    After the template snapshot and scene list, each chunk of verses costs two round trips: one batch that creates the scenes, their
+    unique text inputs (with the verse text already set) and the duplicated template items,
+    and one batch that applies the template transform to the new text items. Returns a list
+    of (reference, error message) tuples for every request that failed. With layers (see
+    nested_scenes.chrome_layers), each scene nests the shared chrome scenes instead.
+    """
+    print("\nStarting batched scene generation process...")
+    failures = []
+    try:
+        template = template or TemplateSnapshot.capture(client)
+        existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+        print(f"Attempting to create scenes and inject text based on '{TEMPLATE_SCENE_NAME}' in batches of {chunk_size}...")
+        verses = resume_pending(client, verses, existing_scenes, journal)
     except Exception as e:
-        print(f"OBS Automation Error: {e}")
\ No newline at end of file
+        print(f"OBS Automation Error: {e}")
+        failures.append((TEMPLATE_SCENE_NAME, str(e)))
+    else:
+        try:
+            apply_scene_batches(client, verses, existing_scenes, template, chunk_size=chunk_size, journal=journal,
+                                layers=layers, failures=failures)
+        except Exception as e:
+            print(f"OBS Automation Error: {e}")
+
+    for reference, message in failures:
+        print(f"Failed on {reference}: {message}")
+    if failures:
+        resume_hint(journal)
+    return failures
@@ -0,0 +1,73 @@
+import json
+from random import randint
+
+from obsws_python.error import OBSSDKError, OBSSDKTimeoutError
+from websocket import WebSocketTimeoutException
+
+from instrumentation import profiler
+
+# obs-websocket v5 op codes and execution types for request batches
+REQUEST_BATCH_OP = 8
+REQUEST_BATCH_RESPONSE_OP = 9
+EXECUTION_SERIAL_REALTIME = 0
+
+
+def batch_request(request_type, request_data=None):
+    """Builds a single request entry for a RequestBatch."""
+    request = {'requestType': request_type}
+    if request_data:
+        request['requestData'] = request_data
+    return request
+
+
+def send_batch(client, requests, halt_on_failure=False, execution_type=EXECUTION_SERIAL_REALTIME):
+    """
+    Sends a list of requests to OBS as one RequestBatch and returns the list of results.
+
+    obsws_python's ReqClient only sends single requests, so the batch is written straight
+    to its underlying websocket. Each result carries its own 'requestStatus', so a failed
+    request does not raise here; callers decide how to report it.
+    """
+    if not requests:
+        return []
+
+    for index, request in enumerate(requests):
+        request.setdefault('requestId', str(index))
+
+    payload = {
+        'op': REQUEST_BATCH_OP,
+        'd': {
+            'requestId': str(randint(1, 1000000)),
+            'haltOnFailure': halt_on_failure,
+            'executionType': execution_type,
+            'requests': requests,
+        },
+    }
+
+    ws = client.base_client.ws
+    try:
+        with profiler.span('obs.RequestBatch'):
+            ws.send(json.dumps(payload))
+            response = json.loads(ws.recv())
+    except WebSocketTimeoutException as e:
+        raise OBSSDKTimeoutError("Timeout while waiting for the request batch response") from e
+
+    profiler.count('obs.batched_requests', len(requests))
+    if response.get('op') != REQUEST_BATCH_RESPONSE_OP:
+        raise OBSSDKError(f"Expected a RequestBatchResponse, got op {response.get('op')}")
+
+    return response['d'].get('results', [])
+
+
+def result_ok(result):
+    """Returns True if a batch result reports success."""
+    return result.get('requestStatus', {}).get('result', False)
+
+
+def result_error(result):
+    """Formats a failed batch result as a readable error message."""
+    status = result.get('requestStatus', {})
+    message = f"{result.get('requestType')} failed (code {status.get('code')})"
+    if status.get('comment'):
+        message += f": {status['comment']}"
+    return message
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config import TEMPLATE_SCENE_NAME, BATCH_CHUNK_SIZE, FETCH_MAX_WORKERS
+from bible_utils import resolve_references, load_chapter_verses, build_verses
+from obs_automator import apply_scene_batches, resume_pending, resume_hint
+
+# --- BULK GENERATION ---
+#
+# For whole books and long reading plans. Chapters are walked last first (scenes are
+# created in reverse reading order, so OBS lists them in reading order) and fetched a
+# bounded number ahead of OBS: a new chapter is only requested when OBS has taken one.
+# Verses go to OBS in fixed-size RequestBatch chunks. Only the prefetched chapters and the
+# current chunk hold verse text, so memory stays flat however long the range is.
+
+
+class BulkProgress:
+    """Counts chapters and scenes done and prints a progress line with a rate and an ETA."""
+
+    def __init__(self, total_chapters, clock=time.monotonic):
+        self.total_chapters = total_chapters
+        self.chapters = 0
+        self.scenes = 0
+        self.clock = clock
+        self.started = clock()
+
+    def eta(self):
+        """Seconds left at the chapter rate so far, or None before the first chapter is done."""
+        if not self.chapters:
+            return None
+        elapsed = self.clock() - self.started
+        return elapsed / self.chapters * (self.total_chapters - self.chapters)
+
+    def format(self):
+        elapsed = self.clock() - self.started
+        rate = self.scenes / elapsed if elapsed > 0 else 0.0
+        eta = self.eta()
+        eta_text = "--:--" if eta is None else f"{int(eta // 60)}:{int(eta % 60):02d}"
+        percent = 100 * self.chapters / self.total_chapters if self.total_chapters else 100
+        return (f"[{self.chapters}/{self.total_chapters} chapters, {percent:.0f}%] {self.scenes} scenes, "
+                f"{rate:.1f} scenes/s, ETA {eta_text}")
+
+    def report(self):
+        print(self.format(), flush=True)
+
+
+def iter_bulk_verses(references, cache=None, offline=False, index=None, prefetch=FETCH_MAX_WORKERS, progress=None):
+    """
+    Yields the verses of references (whole books included) in scene creation order, one
+    chapter passage at a time, fetching at most `prefetch` chapter passages ahead of the
+    consumer. As in get_verses_for_references, a verse covered by more than one reference
+    is only used for the first. With a BulkProgress, each finished chapter passage is
+    counted on it.
+    """
+    passages = resolve_references(references, whole_books=True)
+    remaining = reversed(list(enumerate(passages)))
+    # Which passages cover each chapter: the passage list is small, unlike the verses.
+    coverage = {}
+    for position, (parsed_ref, book_id) in enumerate(passages):
+        coverage.setdefault((book_id, parsed_ref['chapter']), []).append(
+            (position, parsed_ref['start_verse'], parsed_ref['end_verse']))
+
+    def covered_earlier(position, book_id, chapter, verse_number):
+        return any(other < position and start <= verse_number <= end
+                   for other, start, end in coverage[(book_id, chapter)])
+
+    def load(numbered_passage):
+        position, (parsed_ref, book_id) = numbered_passage
+        chapter_verses = load_chapter_verses(parsed_ref, book_id, cache=cache, offline=offline, index=index)
+        return position, parsed_ref, book_id, chapter_verses
+
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as executor:
+        window = deque()
+        try:
+            for passage in remaining:
+                window.append(executor.submit(load, passage))
+                if len(window) >= prefetch:
+                    break
+            while window:
+                position, parsed_ref, book_id, chapter_verses = window.popleft().result()
+                next_passage = next(remaining, None)
+                if next_passage is not None:
+                    window.append(executor.submit(load, next_passage))
+                for verse in reversed(build_verses(parsed_ref, book_id, chapter_verses)):
+                    verse_number = int(verse['scene_name'].rsplit(':', 1)[1])
+                    if not covered_earlier(position, book_id, parsed_ref['chapter'], verse_number):
+                        yield verse
+                if progress is not None:
+                    progress.chapters += 1
+        finally:
+            for future in window:
+                future.cancel()
+
+
+def bulk_scene_generation(client, verse_stream, template, chunk_size=BATCH_CHUNK_SIZE, journal=None, layers=None,
+                          progress=None):
+    """
+    Creates scenes from a verse stream in scene creation order (see iter_bulk_verses),
+    chunk_size verses per RequestBatch, pulling the next chunk only once the previous one
+    is in OBS. A failed chunk does not stop the run: failures are collected and returned as
+    (reference, error message) tuples, and a journal lets --resume redo just those.
+    """
+    print(f"\nStarting bulk scene generation based on '{TEMPLATE_SCENE_NAME}' in batches of {chunk_size}...")
+    existing_scenes = {scene['sceneName'] for scene in client.get_scene_list().scenes}
+    failures = []
+
+    def flush(chunk):
+        # apply_scene_batches takes verses in reading order and creates them last first.
+        pending = resume_pending(client, chunk[::-1], existing_scenes, journal)
+        failures.extend(apply_scene_batches(client, pending, existing_scenes, template, chunk_size=chunk_size,
+                                            journal=journal, layers=layers))
+        if progress is not None:
+            progress.scenes += len(chunk)
+            progress.report()
+
+    chunk = []
+    try:
+        for verse in verse_stream:
+            chunk.append(verse)
+            if len(chunk) == chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    finally:
+        close = getattr(verse_stream, 'close', None)
+        if close:
+            close()
+
+    for reference, message in failures:
+        print(f"Failed on {reference}: {message}")
+    if failures:
+        resume_hint(journal)
+    return failures
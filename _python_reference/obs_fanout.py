@@ -0,0 +1,94 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- FAN-OUT TO SEVERAL OBS INSTANCES ---
+#
+# The verses are fetched and formatted once; then every OBS instance in a targets file is
+# driven from its own thread, with its own connection and template snapshot. A target
+# that cannot be reached, has no template or fails half-way only fails itself, and the
+# whole run takes about as long as the slowest target.
+
+DEFAULT_OBS_PORT = 4455
+
+
+def load_targets(path):
+    """
+    Reads OBS targets from a JSON file: a list (or {"targets": [...]}) of objects with a
+    host and optionally name, port and password. "password_env" names an environment
+    variable to read the password from instead, so the file need not hold secrets.
+    Raises ValueError for a malformed file.
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('targets') if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must hold a non-empty list of OBS targets.")
+
+    targets = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get('host'):
+            raise ValueError(f"Target {number} in {path} needs at least a 'host'.")
+        port = int(entry.get('port', DEFAULT_OBS_PORT))
+        password = entry.get('password', '')
+        if entry.get('password_env'):
+            password = os.environ.get(entry['password_env'], '')
+        targets.append({
+            'name': entry.get('name') or f"{entry['host']}:{port}",
+            'host': entry['host'],
+            'port': port,
+            'password': password,
+        })
+    names = [target['name'] for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Target names in {path} must be unique.")
+    return targets
+
+
+def run_target(target, open_session, generate):
+    """
+    Opens a session on one target and runs generate(client, template, target) on it.
+    Never raises: returns {'name', 'ok', 'failures', 'error', 'elapsed'}.
+    """
+    started = time.perf_counter()
+    result = {'name': target['name'], 'ok': False, 'failures': [], 'error': None}
+    try:
+        client, template = open_session(target)
+        with client:
+            result['failures'] = list(generate(client, template, target) or [])
+        result['ok'] = not result['failures']
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+
+def fan_out(targets, open_session, generate, max_workers=None):
+    """
+    Runs generate on every target at once, one thread per target (or max_workers), and
+    returns the per-target results in the order of `targets`.
+
+    open_session(target) returns (client, template) for a target; generate(client,
+    template, target) builds the scenes and returns its failures, if any.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or len(targets)) as pool:
+        futures = [pool.submit(run_target, target, open_session, generate) for target in targets]
+        return [future.result() for future in futures]
+
+
+def format_fanout_summary(results):
+    """Formats one line per target plus a total, for printing after a fan-out run."""
+    lines = []
+    for result in results:
+        if result['error']:
+            status = f"ERROR {result['error']}"
+        elif result['failures']:
+            status = f"FAILED on {len(result['failures'])} scenes"
+        else:
+            status = "OK"
+        lines.append(f"  {result['name']}: {status} ({result['elapsed']:.1f} s)")
+        lines += [f"    Failed on {target}: {message}" for target, message in result['failures']]
+    succeeded = sum(result['ok'] for result in results)
+    lines.append(f"{succeeded}/{len(results)} targets succeeded.")
+    return "\n".join(lines)
@@ -0,0 +1,173 @@
+import re
+
+from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME, BATCH_CHUNK_SIZE
+from obs_batch import batch_request, send_batch, result_ok, result_error
+from obs_automator import unique_source_name, apply_scene_batches
+from template_snapshot import TemplateSnapshot
+
+# Generated scenes are named 'Scripture-{book_id}-{chapter}:{verse}', plus '-part{n}' for
+# the extra pages of a paginated verse
+GENERATED_SCENE_PATTERN = re.compile(r"^Scripture-([0-9A-Z]{3})-(\d+):(\d+)(?:-part\d+)?$")
+
+
+def scene_chapter(scene_name):
+    """Returns (book_id, chapter) for a generated scene name, or None for any other scene."""
+    match = GENERATED_SCENE_PATTERN.match(scene_name)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+def snapshot_obs_state(client, verses):
+    """
+    Takes one snapshot of the OBS state relevant to a set of verses, in two round trips.
+
+    Returns a dict with the set of 'scenes', 'inputs' (name -> kind), 'scene_sources'
+    (generated scene -> set of source names) and 'texts' (verse input -> current text).
+    Only generated scenes in the same chapters as the verses are looked at in detail.
+    """
+    scene_list, input_list = send_batch(client, [
+        batch_request('GetSceneList'),
+        batch_request('GetInputList'),
+    ])
+    for result in (scene_list, input_list):
+        if not result_ok(result):
+            raise RuntimeError(result_error(result))
+
+    state = {
+        'scenes': {scene['sceneName'] for scene in scene_list['responseData']['scenes']},
+        'inputs': {i['inputName']: i['inputKind'] for i in input_list['responseData']['inputs']},
+        'scene_sources': {},
+        'texts': {},
+    }
+
+    chapters = {scene_chapter(verse['scene_name']) for verse in verses}
+    scenes_in_scope = sorted(name for name in state['scenes'] if scene_chapter(name) in chapters)
+    inputs_in_scope = [unique_source_name(verse) for verse in verses if unique_source_name(verse) in state['inputs']]
+
+    requests = [batch_request('GetSceneItemList', {'sceneName': name}) for name in scenes_in_scope]
+    requests += [batch_request('GetInputSettings', {'inputName': name}) for name in inputs_in_scope]
+    results = send_batch(client, requests)
+
+    for name, result in zip(scenes_in_scope, results[:len(scenes_in_scope)]):
+        if result_ok(result):
+            state['scene_sources'][name] = {item['sourceName'] for item in result['responseData']['sceneItems']}
+    for name, result in zip(inputs_in_scope, results[len(scenes_in_scope):]):
+        if result_ok(result):
+            state['texts'][name] = result['responseData']['inputSettings'].get('text')
+
+    return state
+
+
+def plan_reconcile(state, verses, prune=False):
+    """
+    Diffs the desired verse scenes against an OBS snapshot.
+
+    Returns a list of actions, each a dict with 'action' ('create', 'repair', 'update' or
+    'delete') and 'scene_name', plus 'verse' for everything except deletes. Verses whose
+    scene is complete and already shows the right text produce no action. With prune,
+    generated scenes in the same chapters that are no longer wanted are deleted.
+    """
+    plan = []
+    for verse in verses:
+        scene_name = verse['scene_name']
+        source_name = unique_source_name(verse)
+        if scene_name not in state['scenes']:
+            plan.append({'action': 'create', 'scene_name': scene_name, 'verse': verse})
+        elif source_name not in state['scene_sources'].get(scene_name, set()):
+            # A half-built scene (e.g. created but never given its text input) is rebuilt.
+            plan.append({'action': 'repair', 'scene_name': scene_name, 'verse': verse})
+        elif state['texts'].get(source_name) != verse['obs_text']:
+            plan.append({'action': 'update', 'scene_name': scene_name, 'verse': verse})
+
+    if prune:
+        wanted = {verse['scene_name'] for verse in verses}
+        for scene_name in sorted(state['scene_sources']):
+            if scene_name not in wanted:
+                plan.append({'action': 'delete', 'scene_name': scene_name})
+
+    return plan
+
+
+def format_plan(plan):
+    """Formats a reconcile plan as a human-readable dry-run report."""
+    if not plan:
+        return "OBS already matches the requested verses. Nothing to do."
+    lines = [f"{action['action'].upper():<7} {action['scene_name']}" for action in plan]
+    counts = {}
+    for action in plan:
+        counts[action['action']] = counts.get(action['action'], 0) + 1
+    lines.append(", ".join(f"{count} {name}" for name, count in counts.items()))
+    return "\n".join(lines)
+
+
+def removal_requests(state, plan):
+    """Builds the RemoveScene/RemoveInput requests needed before scenes are (re)built."""
+    requests = []
+    for action in plan:
+        scene_name = action['scene_name']
+        if action['action'] in ('repair', 'delete'):
+            requests.append(batch_request('RemoveScene', {'sceneName': scene_name}))
+        if action['action'] == 'delete':
+            prefix = f"{SCROLLING_TEXT_SOURCE_NAME}_"
+            for source_name in sorted(state['scene_sources'].get(scene_name, set())):
+                if source_name.startswith(prefix):
+                    requests.append(batch_request('RemoveInput', {'inputName': source_name}))
+        elif action['action'] in ('create', 'repair'):
+            # An input left behind by an earlier, interrupted run would block CreateInput.
+            source_name = unique_source_name(action['verse'])
+            if source_name in state['inputs']:
+                requests.append(batch_request('RemoveInput', {'inputName': source_name}))
+    return requests
+
+
+def reconcile(client, verses, dry_run=False, prune=False, chunk_size=BATCH_CHUNK_SIZE, template=None, layers=None):
+    """
+    Snapshots, plans and applies a reconcile, letting connection errors propagate so a
+    caller holding a long-lived client can reconnect and simply run it again. Returns
+    (plan, failures) like reconcile_scene_generation.
+    """
+    failures = []
+    state = snapshot_obs_state(client, verses)
+    plan = plan_reconcile(state, verses, prune=prune)
+    print(format_plan(plan))
+    if dry_run or not plan:
+        return plan, failures
+
+    removals = removal_requests(state, plan)
+    for request, result in zip(removals, send_batch(client, removals)):
+        if not result_ok(result):
+            target = request['requestData'].get('sceneName') or request['requestData'].get('inputName')
+            failures.append((target, result_error(result)))
+
+    to_build = [action['verse'] for action in plan if action['action'] in ('create', 'repair', 'update')]
+    if to_build:
+        template = template or TemplateSnapshot.capture(client)
+        existing = {action['scene_name'] for action in plan if action['action'] == 'update'}
+        failures += apply_scene_batches(client, to_build, existing, template, chunk_size=chunk_size, layers=layers)
+    return plan, failures
+
+
+def reconcile_scene_generation(client, verses, dry_run=False, prune=False, chunk_size=BATCH_CHUNK_SIZE, template=None,
+                               layers=None):
+    """
+    Brings OBS in line with the desired verse scenes, sending only the writes that are needed.
+
+    Rerunning an already generated passage costs the snapshot reads and no writes at all.
+    New and repaired scenes are built with layers, if given (see nested_scenes).
+    With dry_run the plan is printed and nothing is changed. Returns (plan, failures), where
+    failures is a list of (scene or reference, error message) tuples.
+    """
+    print("\nReconciling OBS scenes with the requested verses...")
+    failures = []
+    plan = []
+    try:
+        plan, failures = reconcile(client, verses, dry_run=dry_run, prune=prune, chunk_size=chunk_size,
+                                   template=template, layers=layers)
+    except Exception as e:
+        print(f"OBS Automation Error: {e}")
+        failures.append((TEMPLATE_SCENE_NAME, str(e)))
+
+    for target, message in failures:
+        print(f"Failed on {target}: {message}")
+    return plan, failures
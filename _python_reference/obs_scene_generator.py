@@ -1,15 +1,149 @@
 import requests
+import asyncio
 import os
+import sys
 import time
 import argparse
+import socket
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from obsws_python import ReqClient
+from obsws_python.error import OBSSDKRequestError, OBSSDKTimeoutError
+from websocket import WebSocketException
 
-from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME
-from bible_utils import get_verses_from_api
-from obs_automator import automate_scene_generation
+from config import (
+    TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME, BATCH_CHUNK_SIZE, CHAPTER_CACHE_TTL, BIBLE_INDEX_PATH,
+    PIPELINE_MAX_IN_FLIGHT, CONNECT_MAX_RETRIES, CONNECT_BACKOFF_BASE, CONNECT_BACKOFF_MAX,
+    CONNECT_PROBE_TIMEOUT, IMAGE_BACKEND, IMAGE_MAX_WORKERS,
+)
+from bible_utils import get_verses_for_references, stream_verses, resolve_references
+from bible_index import BibleIndex
+from chapter_cache import ChapterCache
+from collection_compiler import (
+    load_collection, write_collection, collection_from_obs, snapshot_from_collection, compile_collection,
+)
+from image_stage import read_image_jobs, load_image_backend, run_image_stage, format_image_report
+from instrumentation import profiler, instrument_obs_client
+from obs_automator import automate_scene_generation, automate_scene_generation_batched, stream_scene_generation
+from obs_async import automate_scene_generation_async
+from obs_bulk import BulkProgress, iter_bulk_verses, bulk_scene_generation
+from obs_reconcile import reconcile_scene_generation
+from nested_scenes import ensure_chrome_scenes, migrate_to_nested
+from obs_fanout import load_targets, fan_out, format_fanout_summary
+from scene_gc import collect_garbage, record_generation
+from scene_journal import SceneJournal
+from template_snapshot import TemplateSnapshot, TemplateError
+from text_layout import TextLayout, layout_verses
 
 # --- MAIN EXECUTION ---
 
+# obs-websocket request status returned while OBS is still starting up
+OBS_NOT_READY = 207
+
+def obs_port_open(host, port, timeout=CONNECT_PROBE_TIMEOUT):
+    """Cheap readiness probe: True if something accepts TCP connections on the OBS WebSocket port."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def connect_to_obs(host, port, password, max_retries=CONNECT_MAX_RETRIES, backoff=CONNECT_BACKOFF_BASE,
+                   max_delay=CONNECT_BACKOFF_MAX):
+    """
+    Connects to OBS, retrying with exponential backoff while it is not ready yet.
+
+    Each attempt first probes the port, so a closed port costs no WebSocket handshake, then
+    connects and sends GetVersion: OBS answers requests with NotReady while it is still
+    starting up. Waits between attempts double from `backoff` up to `max_delay` seconds.
+    """
+    for attempt in range(max_retries):
+        delay = min(max_delay, backoff * 2 ** attempt)
+        if attempt:
+            print(f"OBS WebSocket is not ready. Retrying in {delay:g} seconds... ({attempt + 1}/{max_retries})")
+        else:
+            print("\nAttempting to connect to OBS...")
+        if obs_port_open(host, port):
+            client = None
+            try:
+                client = ReqClient(host=host, port=port, password=password, timeout=10)
+                client.get_version()
+                print("Successfully connected to OBS.")
+                return client
+            except OBSSDKRequestError as e:
+                if e.code != OBS_NOT_READY:
+                    raise
+            except (ConnectionError, TimeoutError, WebSocketException, OBSSDKTimeoutError):
+                pass
+            if client is not None:
+                client.disconnect()
+        if attempt < max_retries - 1:
+            time.sleep(delay)
+
+    print("\nConnection failed after multiple retries. Please ensure OBS is running and the WebSocket server is enabled.")
+    raise ConnectionRefusedError(f"OBS WebSocket at {host}:{port} did not become ready")
+
+def open_obs_session(host, port, password):
+    """
+    Connects to OBS and captures the template in one pass. Returns (client, template);
+    raises TemplateError (and disconnects) if the template scene or text source is missing.
+    """
+    with profiler.span('phase.connect'):
+        client = instrument_obs_client(connect_to_obs(host, port, password))
+    print(f"Validating template scene '{TEMPLATE_SCENE_NAME}' and text source '{SCROLLING_TEXT_SOURCE_NAME}'...")
+    try:
+        with profiler.span('phase.template'):
+            template = TemplateSnapshot.capture(client)
+    except TemplateError:
+        client.disconnect()
+        raise
+    print(f"Operating on current scene collection: '{template.collection_name}'")
+    print("Validation successful.")
+    return client, template
+
+def read_references(path):
+    """Reads one reference per line from a file ('-' for stdin), skipping blanks and # comments."""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def recording(verse_stream, scene_names):
+    """Passes a verse stream through, noting each verse's scene name on the way."""
+    for verse in verse_stream:
+        scene_names.append(verse['scene_name'])
+        yield verse
+
+def parse_since(value):
+    """argparse type for --keep-since: an ISO date or date-time, returned as a Unix timestamp."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date like 2026-01-31 or 2026-01-31T09:00, got '{value}'")
+
+def finish_image_stage(image_stage):
+    """Waits for the image stage running beside scene generation and prints its report."""
+    try:
+        print("\n" + format_image_report(image_stage.result()))
+    except TemplateError as e:
+        print(f"\nImage stage ERROR: {e}")
+    except Exception as e:
+        print(f"\nImage stage failed: {e}")
+
+def report_profile(args):
+    """Prints the profiling summary and writes the requested metrics files."""
+    if args.profile:
+        print("\n--- PROFILE ---")
+        print(profiler.format_table())
+    if args.metrics_json:
+        profiler.write_json(args.metrics_json)
+        print(f"Metrics written to {args.metrics_json}")
+    if args.metrics_prom:
+        profiler.write_prometheus(args.metrics_prom)
+        print(f"Metrics written to {args.metrics_prom}")
+
 def main():
     # 1. Setup Argument Parser
     parser = argparse.ArgumentParser(
@@ -19,30 +153,235 @@ def main():
     parser.add_argument(
         '--ref',
         type=str,
-        help="The scripture reference range (e.g., '1 Samuel 22:20-23')."
+        nargs='+',
+        action='extend',
+        help="One or more scripture reference ranges (e.g., '1 Samuel 22:20-23' 'John 3:16')."
+    )
+    parser.add_argument(
+        '--ref-file',
+        type=str,
+        help="File with one reference per line ('-' reads stdin; set OBS_PASSWORD so no prompts are needed)."
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help="Send scene construction to OBS as request batches (far fewer round trips)."
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=BATCH_CHUNK_SIZE,
+        help=f"Number of verse scenes per request batch (default: {BATCH_CHUNK_SIZE})."
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Connect to OBS while scripture is fetched and create each scene as soon as its verse arrives."
+    )
+    parser.add_argument(
+        '--bulk',
+        action='store_true',
+        help="For whole books and long ranges (e.g. 'Psalms'): walk the chapters lazily, a few ahead of OBS,\n"
+             "create scenes in request batches of --batch-size and show progress, with flat memory use."
+    )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help="Keep several OBS requests in flight at once and build independent scenes in parallel."
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=PIPELINE_MAX_IN_FLIGHT,
+        help=f"With --pipeline, maximum number of outstanding OBS requests (default: {PIPELINE_MAX_IN_FLIGHT})."
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help="Use only the local chapter cache and never touch the network."
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help="Always fetch chapters from the API and do not store them locally."
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=CHAPTER_CACHE_TTL,
+        help="Seconds before a cached chapter is revalidated with the API (default: never)."
+    )
+    parser.add_argument(
+        '--index',
+        type=str,
+        nargs='?',
+        const=BIBLE_INDEX_PATH,
+        help=f"Read verses from an offline Bible index (default path: {BIBLE_INDEX_PATH})."
+    )
+    parser.add_argument(
+        '--reconcile',
+        action='store_true',
+        help="Diff OBS against the requested verses and only send the creates/updates that are needed."
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help="With --reconcile, print the planned changes without sending them."
+    )
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help="With --reconcile, delete generated scenes in the same chapters that were not requested."
+    )
+    parser.add_argument(
+        '--layout',
+        action='store_true',
+        help="Wrap text on the template font's measured glyph widths instead of a fixed character count."
+    )
+    parser.add_argument(
+        '--box-width',
+        type=float,
+        help="With --layout, text box width in source pixels (default: from the template's bounds)."
+    )
+    parser.add_argument(
+        '--paginate',
+        action='store_true',
+        help="With --layout, split verses that overflow the text box across several scenes."
+    )
+    parser.add_argument(
+        '--max-lines',
+        type=int,
+        help="With --paginate, lines per scene (default: as many as fit the template's bounds)."
+    )
+    parser.add_argument(
+        '--nested',
+        action='store_true',
+        help="Nest one shared chrome scene per verse scene instead of copying every template item (uses request batches)."
+    )
+    parser.add_argument(
+        '--migrate-nested',
+        action='store_true',
+        help="Convert existing generated scenes to nested chrome scenes and exit (with --dry-run, only report)."
+    )
+    parser.add_argument(
+        '--gc',
+        action='store_true',
+        help="Remove generated scenes outside the retention policy and unused generated text inputs, then exit\n"
+             "(with no --keep-* option only orphaned inputs are removed; with --dry-run, only report)."
+    )
+    parser.add_argument(
+        '--keep-last',
+        type=int,
+        help="With --gc, keep the scenes of the N most recently generated passages."
+    )
+    parser.add_argument(
+        '--keep-since',
+        type=parse_since,
+        help="With --gc, keep the scenes of passages generated on or after this date (e.g. 2026-01-31)."
+    )
+    parser.add_argument(
+        '--compile',
+        type=str,
+        metavar='OUT.json',
+        help="Write the scenes into a scene-collection file for OBS to import, instead of building them live.\n"
+             "The template is read once over the websocket, or from --from-collection without OBS at all."
+    )
+    parser.add_argument(
+        '--from-collection',
+        type=str,
+        metavar='FILE.json',
+        help="With --compile, an exported scene collection holding the template; the output adds the scenes to it."
+    )
+    parser.add_argument(
+        '--images',
+        type=str,
+        metavar='FILE',
+        help="Also build image scenes from 'reference | prompt' lines, on their own OBS connection, while the\n"
+             "text scenes are built. Images are cached by prompt, so reruns cost no generation calls."
+    )
+    parser.add_argument(
+        '--image-backend',
+        type=str,
+        default=IMAGE_BACKEND,
+        help="Image generator backend as 'module:attribute' (default: the IMAGE_BACKEND environment variable)."
+    )
+    parser.add_argument(
+        '--image-workers',
+        type=int,
+        default=IMAGE_MAX_WORKERS,
+        help=f"Images generated at once (default: {IMAGE_MAX_WORKERS})."
+    )
+    parser.add_argument(
+        '--targets',
+        type=str,
+        help="JSON file listing several OBS instances ({name, host, port, password or password_env}).\n"
+             "The verses are fetched once and every instance is updated at the same time."
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Continue an interrupted run of the same references: skip finished scenes and repair half-built ones."
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Time each phase and OBS request type and print a summary when done."
+    )
+    parser.add_argument(
+        '--metrics-json',
+        type=str,
+        help="Write the profiling summary to this JSON file (implies profiling)."
+    )
+    parser.add_argument(
+        '--metrics-prom',
+        type=str,
+        help="Write the profiling summary as a Prometheus textfile (implies profiling)."
     )
     args = parser.parse_args()
+    if args.profile or args.metrics_json or args.metrics_prom:
+        profiler.enable()
 
     print("--- OBS SCENE GENERATOR (BSB) ---")
     print(f"Template Scene: {TEMPLATE_SCENE_NAME}")
     print(f"Text Source Name: {SCROLLING_TEXT_SOURCE_NAME}")
     
-    # --- Get Scripture Reference (Required for both stages) ---
-    scripture_ref = args.ref
-    if not scripture_ref:
+    # --- Get Scripture References (Required for both stages) ---
+    scripture_refs = list(args.ref or [])
+    if args.ref_file:
+        scripture_refs.extend(read_references(args.ref_file))
+    needs_references = not (args.migrate_nested or args.gc)
+    if not scripture_refs and needs_references:
         scripture_ref = input("\nEnter scripture reference (e.g., 1 Samuel 22:20-23): ")
+        if scripture_ref:
+            scripture_refs.append(scripture_ref)
 
-    if not scripture_ref:
+    if not scripture_refs and needs_references:
         print("\nScripture reference is required. Exiting.")
         return
 
+    targets = None
+    if args.targets:
+        if args.stream or args.migrate_nested or args.gc:
+            print("\n--targets only applies to scene generation; it cannot be combined with --stream, "
+                  "--migrate-nested or --gc. Exiting.")
+            return
+        try:
+            targets = load_targets(args.targets)
+        except (OSError, ValueError) as e:
+            print(f"\nCould not read the targets file: {e}")
+            return
+
     # Get OBS Connection Details (Prefer Environment Variables)
     obs_host = os.environ.get('OBS_HOST', 'localhost')
     obs_port = int(os.environ.get('OBS_PORT', 4455))
     obs_password = os.environ.get('OBS_PASSWORD', '')
 
-    # If environment variables are set, skip prompts for OBS connection
-    if obs_password:
+    # If environment variables are set (or a targets file is given), skip prompts for OBS connection
+    if args.from_collection:
+        print(f"Compiling offline from '{args.from_collection}'; OBS is not needed.")
+    elif targets:
+        print(f"Updating {len(targets)} OBS instances: {', '.join(target['name'] for target in targets)}.")
+    elif obs_password:
         print(f"Using credentials from environment variables (Host: {obs_host}, Port: {obs_port}).")
     else:
         # Prompt for details if environment variables are missing
@@ -55,66 +394,227 @@ def main():
             obs_port = 4455
         obs_password = input("Enter OBS WebSocket Password (or leave blank): ")
     
+    if args.offline and args.no_cache:
+        print("\n--offline needs the chapter cache; it cannot be combined with --no-cache. Exiting.")
+        return
+    if args.images and (args.compile or args.targets or args.dry_run):
+        print("\n--images builds scenes live in one OBS; it cannot be combined with --compile, --targets or --dry-run. Exiting.")
+        return
+    if args.from_collection and not args.compile:
+        print("\n--from-collection only applies to --compile. Exiting.")
+        return
+    if args.compile and (args.stream or args.pipeline or args.bulk or args.reconcile or args.dry_run or args.nested
+                         or args.targets):
+        print("\n--compile writes a file instead of talking to OBS; it cannot be combined with --stream, --pipeline,\n"
+              "--bulk, --reconcile, --dry-run, --nested or --targets. Exiting.")
+        return
+    if args.bulk and (args.stream or args.pipeline or args.reconcile or args.dry_run or args.targets):
+        print("\n--bulk cannot be combined with --stream, --pipeline, --reconcile, --dry-run or --targets. Exiting.")
+        return
+    if args.stream and (args.batch or args.pipeline or args.reconcile or args.dry_run):
+        print("\n--stream creates each scene as its verse arrives; it cannot be combined with --batch, --pipeline,\n"
+              "--reconcile or --dry-run. Exiting.")
+        return
+    if args.nested and (args.stream or args.pipeline):
+        print("\n--nested builds scenes with request batches; it cannot be combined with --stream or --pipeline. Exiting.")
+        return
+    cache = None if args.no_cache else ChapterCache(ttl=args.cache_ttl)
+
+    image_stage = None
+    index = None
     try:
-        verses = get_verses_from_api(scripture_ref)
-        
-        if not verses:
-            print("No verses found or API fetch failed.")
-            return
+        index = BibleIndex(args.index) if args.index else None
+        fetch_options = {'cache': cache, 'offline': args.offline, 'index': index}
+
+        def open_session():
+            return open_obs_session(obs_host, obs_port, obs_password)
 
-        print(f"\nFound {len(verses)} verses to process from {scripture_ref}.")
+        def open_journal(template, target=None):
+            # The same references, layout and scene collection (on the same instance) make the same run.
+            run_key = [template.collection_name, scripture_refs, args.layout, args.box_width, args.paginate,
+                       args.max_lines]
+            if target is not None:
+                run_key.append([target['host'], target['port']])
+            return SceneJournal.for_run(run_key, resume=args.resume)
 
-        # --- Connection and Scene Generation with Retries ---
-        max_retries = 5
-        retry_delay = 5 # seconds
-        for attempt in range(max_retries):
+        def generate_scenes(client, template, verses, target=None):
+            """Lays out the verses for this template and builds their scenes in the chosen mode."""
+            if args.layout:
+                with profiler.span('phase.layout'):
+                    layout = TextLayout.from_template(template, box_width=args.box_width)
+                    verses = list(layout_verses(verses, layout, paginate=args.paginate, max_lines=args.max_lines))
+            # Reconcile diffs against OBS itself, so it needs no journal to pick up where it left off.
+            journal = None if args.reconcile or args.dry_run else open_journal(template, target)
             try:
-                print(f"\nAttempting to connect to OBS... ({attempt + 1}/{max_retries})")
-                with ReqClient(host=obs_host, port=obs_port, password=obs_password, timeout=10) as client:
-                    print("Successfully connected to OBS.")
-                    current_collection = client.get_scene_collection_list().current_scene_collection_name
-                    print(f"Operating on current scene collection: '{current_collection}'")
-
-                    # 1. Validate that the template scene and source exist
-                    print(f"Validating template scene '{TEMPLATE_SCENE_NAME}'...")
-                    scenes = client.get_scene_list().scenes
-                    if not any(s['sceneName'] == TEMPLATE_SCENE_NAME for s in scenes):
-                        print(f"\nERROR: Template scene '{TEMPLATE_SCENE_NAME}' not found in the current scene collection.")
-                        print("Please make sure you are in the correct scene collection and the template scene exists.")
-                        return
-
-                    print(f"Validating text source '{SCROLLING_TEXT_SOURCE_NAME}' in template scene...")
-                    scene_items = client.get_scene_item_list(TEMPLATE_SCENE_NAME).scene_items
-                    if not any(item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME for item in scene_items):
-                        print(f"\nERROR: Text source '{SCROLLING_TEXT_SOURCE_NAME}' not found in the '{TEMPLATE_SCENE_NAME}' scene.")
-                        print("Please add a text source with this name to your template scene.")
-                        return
-                    print("Validation successful.")
-
-                    # 2. Automate OBS scene creation within the current collection.
-                    automate_scene_generation(client, verses)
-
-                # If we get here, everything was successful.
-                break
-
-            except ConnectionRefusedError as e:
-                if attempt < max_retries - 1:
-                    print(f"Connection refused. OBS WebSocket may not be ready. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                with profiler.span('phase.generate'):
+                    layers = ensure_chrome_scenes(client, template) if args.nested and not args.dry_run else None
+                    # Automate OBS scene creation within the current collection.
+                    if args.reconcile or args.dry_run:
+                        failures = reconcile_scene_generation(client, verses, dry_run=args.dry_run, prune=args.prune,
+                                                              chunk_size=args.batch_size, template=template,
+                                                              layers=layers)[1]
+                    elif args.pipeline:
+                        failures = asyncio.run(automate_scene_generation_async(
+                            client, verses, template=template, max_in_flight=args.max_in_flight, journal=journal
+                        ))
+                    elif args.batch or args.nested:
+                        failures = automate_scene_generation_batched(client, verses, chunk_size=args.batch_size,
+                                                                     template=template, journal=journal, layers=layers)
+                    else:
+                        failures = automate_scene_generation(client, verses, template=template, journal=journal)
+            finally:
+                if journal is not None:
+                    journal.close()
+            if not args.dry_run:
+                record_generation(template.collection_name, scripture_refs, [v['scene_name'] for v in verses])
+            return failures
+
+        if args.images:
+            jobs = read_image_jobs(args.images)
+            backend = load_image_backend(args.image_backend)
+
+            def build_images():
+                client, template = open_obs_session(obs_host, obs_port, obs_password)
+                with client:
+                    return run_image_stage(client, jobs, backend, template, max_workers=args.image_workers)
+
+            # Runs beside the text scenes; collected (and reported) on the way out.
+            image_pool = ThreadPoolExecutor(max_workers=1)
+            image_stage = image_pool.submit(build_images)
+            image_pool.shutdown(wait=False)
+
+        if args.migrate_nested:
+            client, template = open_session()
+            with client:
+                migrate_to_nested(client, template, chunk_size=args.batch_size, dry_run=args.dry_run)
+            return
+
+        if args.gc:
+            client, template = open_session()
+            with client:
+                collect_garbage(client, template.collection_name, keep_last=args.keep_last,
+                                keep_since=args.keep_since, dry_run=args.dry_run, chunk_size=args.batch_size)
+            return
+
+        if args.compile:
+            with profiler.span('phase.fetch'):
+                verses = get_verses_for_references(scripture_refs, **fetch_options)
+            if not verses:
+                print("No verses found or API fetch failed.")
+                return
+
+            with profiler.span('phase.template'):
+                if args.from_collection:
+                    collection = load_collection(args.from_collection)
+                    template = snapshot_from_collection(collection)
                 else:
-                    print("\nConnection failed after multiple retries. Please ensure OBS is running and the WebSocket server is enabled.")
-                    raise e
-        
+                    client, template = open_session()
+                    with client:
+                        collection = collection_from_obs(client, template)
+            if args.layout:
+                with profiler.span('phase.layout'):
+                    layout = TextLayout.from_template(template, box_width=args.box_width)
+                    verses = list(layout_verses(verses, layout, paginate=args.paginate, max_lines=args.max_lines))
+            with profiler.span('phase.generate'):
+                write_collection(compile_collection(collection, verses), args.compile)
+            record_generation(collection.get('name'), scripture_refs, [verse['scene_name'] for verse in verses])
+            print(f"\nWrote {len(verses)} scenes to '{args.compile}'.")
+            print("Import it in OBS with Scene Collection > Import, then switch to it.")
+            return
+
+        if args.bulk:
+            progress = BulkProgress(len(resolve_references(scripture_refs, whole_books=True)))
+            client, template = open_session()
+            verse_stream = iter_bulk_verses(scripture_refs, **fetch_options, progress=progress)
+            if args.layout:
+                layout = TextLayout.from_template(template, box_width=args.box_width)
+                verse_stream = layout_verses(verse_stream, layout, paginate=args.paginate,
+                                             max_lines=args.max_lines, reverse=True)
+            journal = open_journal(template)
+            scene_names = []
+            with client, journal, profiler.span('phase.generate'):
+                layers = ensure_chrome_scenes(client, template) if args.nested else None
+                failures = bulk_scene_generation(client, recording(verse_stream, scene_names), template,
+                                                 chunk_size=args.batch_size, journal=journal, layers=layers,
+                                                 progress=progress)
+            record_generation(template.collection_name, scripture_refs, scene_names)
+            if failures:
+                return
+        elif args.stream:
+            # Connect to OBS and fetch scripture at the same time, creating scenes as verses arrive.
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                session_future = pool.submit(open_session)
+                verse_stream = stream_verses(scripture_refs, **fetch_options)
+                try:
+                    client, template = session_future.result()
+                except Exception:
+                    verse_stream.close()
+                    raise
+            if args.layout:
+                layout = TextLayout.from_template(template, box_width=args.box_width)
+                verse_stream = layout_verses(verse_stream, layout, paginate=args.paginate,
+                                             max_lines=args.max_lines, reverse=True)
+            journal = open_journal(template)
+            scene_names = []
+            with client, journal, profiler.span('phase.stream'):
+                generated, failures = stream_scene_generation(client, recording(verse_stream, scene_names),
+                                                              template=template, journal=journal)
+            record_generation(template.collection_name, scripture_refs, scene_names)
+            if failures:
+                reference, message = failures[0]
+                print(f"\nOBS failed on {reference} after {generated} scenes: {message}")
+                return
+            if not generated:
+                print("No verses found or API fetch failed.")
+                return
+        else:
+            with profiler.span('phase.fetch'):
+                verses = get_verses_for_references(scripture_refs, **fetch_options)
+
+            if not verses:
+                print("No verses found or API fetch failed.")
+                return
+
+            print(f"\nFound {len(verses)} verses to process from {', '.join(scripture_refs)}.")
+
+            if targets:
+                def open_target_session(target):
+                    return open_obs_session(target['host'], target['port'], target['password'])
+
+                results = fan_out(targets, open_target_session,
+                                  lambda client, template, target: generate_scenes(client, template, verses, target))
+                print("\nResults per OBS instance:")
+                print(format_fanout_summary(results))
+                if not all(result['ok'] for result in results):
+                    return
+            else:
+                client, template = open_session()
+                with client:
+                    failures = generate_scenes(client, template, verses)
+                if failures:
+                    return
+
         print("\n*** Automation Complete! ***")
         print("Scripture scenes have been added to your current OBS scene collection.")
         print("If you modified a template, you may want to clean it up for the next run.")
 
+    except TemplateError as e:
+        print(f"\nERROR: {e}")
+        print("Please make sure you are in the correct scene collection and the template scene "
+              f"contains a text source named '{SCROLLING_TEXT_SOURCE_NAME}'.")
     except ValueError as e:
         print(f"\nInput Error: {e}")
     except requests.RequestException as e:
         print(f"\nAPI Request Error: Failed to fetch scripture. Check API URL or Internet connection. {e}")
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}")
+    finally:
+        if image_stage is not None:
+            finish_image_stage(image_stage)
+        if index is not None:
+            index.close()
+        if profiler.enabled:
+            report_profile(args)
 
 
 if __name__ == "__main__":
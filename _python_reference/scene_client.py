@@ -0,0 +1,89 @@
+import argparse
+import json
+import socket
+import sys
+
+from config import DAEMON_SOCKET_PATH, DAEMON_REQUEST_TIMEOUT
+
+# --- THIN CLIENT FOR THE WARM DAEMON ---
+#
+# Sends references to a running scene_daemon.py over its Unix socket. It only uses the
+# standard library, so it starts in milliseconds; all the heavy lifting stays in the daemon.
+
+
+def send_request(message, socket_path=DAEMON_SOCKET_PATH, timeout=DAEMON_REQUEST_TIMEOUT):
+    """Sends one JSON request to the daemon and returns its JSON reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+        reply = b''
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            reply += chunk
+    if not reply:
+        raise ConnectionError("The daemon closed the connection without replying.")
+    return json.loads(reply)
+
+
+def format_reply(reply):
+    """Renders a daemon reply as one human-readable line (plus one line per failure)."""
+    if not reply.get('ok') and 'error' in reply:
+        return f"ERROR: {reply['error']}"
+    if 'verses' not in reply:
+        status = "OK" if reply.get('ok') else "FAILED"
+        prefetch = reply.get('prefetch')
+        if prefetch is None:
+            return status
+        if prefetch['running']:
+            return f"{status}\nPrefetch of {prefetch['chapters']} chapters running."
+        return f"{status}\n{prefetch['summary']}"
+    status = "OK" if reply['ok'] else "FAILED"
+    lines = [f"{status}: {reply['verses']} verses, {reply['changes']} scene changes in {reply['elapsed_ms']:.0f} ms"]
+    lines += [f"  Failed on {target}: {message}" for target, message in reply.get('failures', [])]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send scripture references to a running OBS scene generator daemon.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        'references',
+        type=str,
+        nargs='*',
+        help="One or more scripture references (e.g., 'John 3:16-18' 'Rom 8:28')."
+    )
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=DAEMON_SOCKET_PATH,
+        help=f"Daemon socket path (default: {DAEMON_SOCKET_PATH})."
+    )
+    command = parser.add_mutually_exclusive_group()
+    command.add_argument('--ping', action='store_true', help="Check that the daemon is up and connected to OBS.")
+    command.add_argument('--refresh', action='store_true', help="Re-read the template from OBS (e.g. after editing it).")
+    command.add_argument('--stop', action='store_true', help="Shut the daemon down.")
+    args = parser.parse_args()
+
+    if args.ping or args.refresh or args.stop:
+        message = {'command': 'ping' if args.ping else 'refresh' if args.refresh else 'stop'}
+    elif args.references:
+        message = {'command': 'generate', 'references': args.references}
+    else:
+        parser.error("give at least one reference, or --ping, --refresh or --stop")
+
+    try:
+        reply = send_request(message, socket_path=args.socket)
+    except (OSError, ValueError) as e:
+        print(f"Could not reach the daemon at {args.socket}: {e}")
+        return 2
+    print(format_reply(reply))
+    return 0 if reply.get('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
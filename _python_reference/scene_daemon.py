@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+import requests
+from obsws_python.error import OBSSDKTimeoutError
+from websocket import WebSocketException
+
+from config import (
+    DAEMON_SOCKET_PATH, CHAPTER_CACHE_TTL, BIBLE_INDEX_PATH, GENERATION_LOG_PATH, FETCH_MAX_WORKERS,
+)
+from bible_utils import get_session, get_verses_for_references
+from bible_index import BibleIndex
+from chapter_cache import ChapterCache
+from chapter_prefetch import prefetch_chapters, format_prefetch_report
+from nested_scenes import ensure_chrome_scenes
+from obs_reconcile import reconcile
+from obs_scene_generator import open_obs_session
+from scene_client import format_reply
+from scene_gc import record_generation
+from text_layout import TextLayout, layout_verses
+
+# --- WARM DAEMON ---
+#
+# Keeps everything that is slow to set up alive between references: the imports, the
+# pooled HTTP session, the authenticated OBS connection, the template snapshot and the
+# chapter cache. Each reference then costs the chapter fetch (nothing for a cached
+# chapter) plus a reconcile against OBS: two batched reads and only the writes needed.
+
+# Errors that mean the OBS connection is gone, as opposed to OBS refusing a request
+CONNECTION_ERRORS = (ConnectionError, OSError, WebSocketException, OBSSDKTimeoutError)
+
+
+class SceneDaemon:
+    """
+    Generates scenes for references against one long-lived OBS connection.
+
+    Requests are handled one at a time. If OBS went away since the last request, the
+    daemon reconnects and reruns the reconcile, which also repairs anything the lost
+    connection left half-built.
+    """
+
+    def __init__(self, host, port, password, cache=None, offline=False, index=None, layout=False, paginate=False,
+                 nested=False, generation_log=GENERATION_LOG_PATH):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.fetch_options = {'cache': cache, 'offline': offline, 'index': index}
+        self.use_layout = layout
+        self.paginate = paginate
+        self.nested = nested
+        self.generation_log = generation_log
+        self.layers = None
+        self.client = None
+        self.template = None
+        self.text_layout = None
+        self.lock = threading.Lock()
+        self.prefetch_thread = None
+        self.prefetch_status = None
+
+    def connect(self):
+        self.client, self.template = open_obs_session(self.host, self.port, self.password)
+        if self.use_layout:
+            self.text_layout = TextLayout.from_template(self.template)
+        if self.nested:
+            self.layers = ensure_chrome_scenes(self.client, self.template)
+
+    def disconnect(self):
+        if self.client is not None:
+            try:
+                self.client.disconnect()
+            except CONNECTION_ERRORS:
+                pass
+        self.client = None
+
+    def warm_up(self):
+        """Opens the HTTP session and the OBS connection before the first reference arrives."""
+        get_session()
+        self.connect()
+
+    def generate(self, references):
+        started = time.perf_counter()
+        verses = get_verses_for_references(references, **self.fetch_options)
+        if not verses:
+            return {'ok': False, 'error': "No verses found."}
+
+        for attempt in range(2):
+            try:
+                if self.client is None:
+                    self.connect()
+                layout_ready = verses
+                if self.text_layout is not None:
+                    layout_ready = list(layout_verses(verses, self.text_layout, paginate=self.paginate))
+                plan, failures = reconcile(self.client, layout_ready, template=self.template, layers=self.layers)
+                break
+            except CONNECTION_ERRORS as e:
+                self.disconnect()
+                if attempt:
+                    raise
+                print(f"Lost the OBS connection ({e}); reconnecting...")
+
+        record_generation(self.template.collection_name, references, [verse['scene_name'] for verse in layout_ready],
+                          log_path=self.generation_log)
+        return {
+            'ok': not failures,
+            'verses': len(layout_ready),
+            'changes': len(plan),
+            'failures': [list(failure) for failure in failures],
+            'elapsed_ms': (time.perf_counter() - started) * 1000,
+        }
+
+    def start_prefetch(self, chapters, workers=FETCH_MAX_WORKERS):
+        """
+        Fills the chapter cache (and, with layout on, the layout caches) for upcoming
+        chapters on a background thread, so generate requests are not held up meanwhile.
+        """
+        if self.fetch_options['cache'] is None:
+            return {'ok': False, 'error': "The daemon has no chapter cache to prefetch into."}
+        if self.prefetch_thread is not None and self.prefetch_thread.is_alive():
+            return {'ok': False, 'error': "A prefetch is already running."}
+        chapters = [tuple(key) for key in chapters]
+        self.prefetch_status = {'running': True, 'chapters': len(chapters)}
+
+        def run():
+            try:
+                report = prefetch_chapters(chapters, self.fetch_options['cache'], index=self.fetch_options['index'],
+                                           max_workers=workers, layout=self.text_layout)
+                self.prefetch_status = {'running': False, 'chapters': len(chapters), 'complete': report['complete'],
+                                        'summary': format_prefetch_report(report)}
+            except Exception as e:
+                self.prefetch_status = {'running': False, 'chapters': len(chapters), 'complete': False,
+                                        'summary': f"Prefetch failed: {e}"}
+
+        self.prefetch_thread = threading.Thread(target=run, daemon=True)
+        self.prefetch_thread.start()
+        return {'ok': True}
+
+    def handle(self, message):
+        """Runs one request ({'command': ..., 'references': [...]}) and returns the reply dict."""
+        command = message.get('command', 'generate')
+        with self.lock:
+            try:
+                if command == 'generate':
+                    return self.generate(message.get('references') or [])
+                if command == 'refresh':
+                    self.disconnect()
+                    self.connect()
+                    return {'ok': True}
+                if command == 'ping':
+                    reply = {'ok': True, 'connected': self.client is not None}
+                    if self.prefetch_status is not None:
+                        reply['prefetch'] = self.prefetch_status
+                    return reply
+                if command == 'prefetch':
+                    return self.start_prefetch(message.get('chapters') or [],
+                                               message.get('workers') or FETCH_MAX_WORKERS)
+                return {'ok': False, 'error': f"Unknown command: {command}"}
+            except ValueError as e:
+                return {'ok': False, 'error': str(e)}
+            except requests.RequestException as e:
+                return {'ok': False, 'error': f"Failed to fetch scripture: {e}"}
+            except Exception as e:
+                self.disconnect()
+                return {'ok': False, 'error': f"Unexpected error: {e}"}
+
+
+def make_socket_server(daemon, socket_path):
+    """Returns a Unix socket server that answers JSON-line requests with daemon.handle."""
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)  # Left behind by a daemon that did not shut down cleanly
+            else:
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    reply = {'ok': False, 'error': "Requests must be one JSON object per line."}
+                else:
+                    if message.get('command') == 'stop':
+                        reply = {'ok': True}
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    else:
+                        reply = daemon.handle(message)
+                self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+                self.wfile.flush()
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    server.daemon_threads = True
+    os.chmod(socket_path, 0o600)
+    return server
+
+
+def serve_stdin(daemon, stream):
+    """Reads one reference per line (or '!ping', '!refresh', '!stop') and prints each reply."""
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line in ('!stop', '!quit'):
+            break
+        message = {'command': line[1:]} if line.startswith('!') else {'command': 'generate', 'references': [line]}
+        print(format_reply(daemon.handle(message)), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep OBS, the HTTP session, the template and the chapter cache warm, and generate scenes\n"
+                    "for references as they arrive on a Unix socket (see scene_client.py) or on stdin.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=DAEMON_SOCKET_PATH,
+        help=f"Unix socket to listen on (default: {DAEMON_SOCKET_PATH})."
+    )
+    parser.add_argument(
+        '--stdin',
+        action='store_true',
+        help="Read references from stdin, one per line, instead of listening on the socket."
+    )
+    parser.add_argument('--offline', action='store_true', help="Use only the local chapter cache.")
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=CHAPTER_CACHE_TTL,
+        help="Seconds before a cached chapter is revalidated with the API (default: never)."
+    )
+    parser.add_argument(
+        '--index',
+        type=str,
+        nargs='?',
+        const=BIBLE_INDEX_PATH,
+        help=f"Read verses from an offline Bible index (default path: {BIBLE_INDEX_PATH})."
+    )
+    parser.add_argument('--layout', action='store_true', help="Wrap text on the template font's glyph widths.")
+    parser.add_argument('--paginate', action='store_true', help="With --layout, split overflowing verses across scenes.")
+    parser.add_argument('--nested', action='store_true', help="Nest the shared chrome scene instead of copying template items.")
+    args = parser.parse_args()
+
+    try:
+        index = BibleIndex(args.index) if args.index else None
+    except ValueError as e:
+        print(f"Input Error: {e}")
+        return
+
+    # No prompts here: stdin may be carrying references.
+    daemon = SceneDaemon(
+        os.environ.get('OBS_HOST', 'localhost'), int(os.environ.get('OBS_PORT', 4455)),
+        os.environ.get('OBS_PASSWORD', ''),
+        cache=ChapterCache(ttl=args.cache_ttl), offline=args.offline, index=index,
+        layout=args.layout, paginate=args.paginate, nested=args.nested,
+    )
+    try:
+        daemon.warm_up()
+    except Exception as e:
+        print(f"Could not connect to OBS yet ({e}); will retry on the first reference.")
+        daemon.disconnect()
+
+    try:
+        if args.stdin:
+            serve_stdin(daemon, sys.stdin)
+        else:
+            with make_socket_server(daemon, args.socket) as server:
+                print(f"Listening on {args.socket}. Send references with 'python scene_client.py <reference>'.")
+                try:
+                    server.serve_forever()
+                finally:
+                    os.unlink(args.socket)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.disconnect()
+        if index is not None:
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import json
+import os
+import time
+
+from config import SCROLLING_TEXT_SOURCE_NAME, BATCH_CHUNK_SIZE, GENERATION_LOG_PATH
+from obs_batch import batch_request, send_batch, result_ok, result_error
+from obs_reconcile import GENERATED_SCENE_PATTERN
+
+# --- GARBAGE COLLECTION OF GENERATED SCENES ---
+#
+# Every run that generates scenes appends one line to a generation log: when it ran, in
+# which scene collection, for which references, and which scenes it produced. Cleanup
+# keeps the scenes of the passages the retention policy wants (the last N, or those
+# generated since a date) and removes every other generated scene, plus any generated
+# text input that no remaining scene uses.
+
+GENERATED_INPUT_PREFIX = f"{SCROLLING_TEXT_SOURCE_NAME}_"
+# obs-websocket request status for a resource that does not exist (already removed)
+RESOURCE_NOT_FOUND = 600
+
+
+def record_generation(collection_name, references, scene_names, log_path=GENERATION_LOG_PATH):
+    """Appends one passage (a run's references and the scenes it produced) to the generation log."""
+    if not scene_names:
+        return
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    entry = {'at': time.time(), 'collection': collection_name, 'references': list(references),
+             'scenes': list(dict.fromkeys(scene_names))}
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_generations(collection_name, log_path=GENERATION_LOG_PATH):
+    """Returns the logged passages of one scene collection (None: of all of them), oldest first."""
+    generations = []
+    try:
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if collection_name is None or entry.get('collection') == collection_name:
+                    generations.append(entry)
+    except OSError:
+        pass
+    return sorted(generations, key=lambda entry: entry['at'])
+
+
+def retained_scenes(generations, keep_last=None, keep_since=None):
+    """
+    Returns the set of scene names the retention policy keeps, or None to keep everything.
+
+    A scene is kept if any passage that produced it is among the keep_last most recent, or
+    was generated at or after keep_since (a Unix timestamp). Scenes that were never logged
+    count as older than every passage.
+    """
+    if keep_last is None and keep_since is None:
+        return None
+    kept = set()
+    for position, entry in enumerate(reversed(generations)):
+        if (keep_last is not None and position < keep_last) or (keep_since is not None and entry['at'] >= keep_since):
+            kept.update(entry['scenes'])
+    return kept
+
+
+def snapshot_generated(client, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Lists generated scenes and inputs by their naming scheme, and which scenes use each
+    generated input. Reads every scene's items, in batches, so inputs used by hand-made
+    scenes are seen too.
+    """
+    scene_list, input_list = send_batch(client, [batch_request('GetSceneList'), batch_request('GetInputList')])
+    for result in (scene_list, input_list):
+        if not result_ok(result):
+            raise RuntimeError(result_error(result))
+
+    scenes = [scene['sceneName'] for scene in scene_list['responseData']['scenes']]
+    used_by = {item['inputName']: set() for item in input_list['responseData']['inputs']
+               if item['inputName'].startswith(GENERATED_INPUT_PREFIX)}
+    for start in range(0, len(scenes), chunk_size):
+        chunk = scenes[start:start + chunk_size]
+        results = send_batch(client, [batch_request('GetSceneItemList', {'sceneName': name}) for name in chunk])
+        for scene_name, result in zip(chunk, results):
+            if not result_ok(result):
+                continue
+            for item in result['responseData']['sceneItems']:
+                if item['sourceName'] in used_by:
+                    used_by[item['sourceName']].add(scene_name)
+
+    data = scene_list['responseData']
+    return {
+        'scenes': [name for name in scenes if GENERATED_SCENE_PATTERN.match(name)],
+        'protected': {data.get('currentProgramSceneName'), data.get('currentPreviewSceneName')} - {None},
+        'used_by': used_by,
+    }
+
+
+def plan_gc(snapshot, kept=None):
+    """
+    Picks what to remove: generated scenes outside `kept` (None keeps all of them), except
+    the scenes live on program or preview, and generated inputs that no remaining scene
+    uses. Returns {'scenes': [...], 'inputs': [...], 'orphans': [...]}, where orphans are
+    the inputs that were already unused before this cleanup.
+    """
+    removed = set()
+    if kept is not None:
+        removed = {name for name in snapshot['scenes'] if name not in kept and name not in snapshot['protected']}
+    inputs = sorted(name for name, scenes in snapshot['used_by'].items() if not scenes - removed)
+    return {
+        'scenes': [name for name in snapshot['scenes'] if name in removed],
+        'inputs': inputs,
+        'orphans': [name for name in inputs if not snapshot['used_by'][name]],
+    }
+
+
+def format_gc_plan(plan):
+    """Formats a cleanup plan as a human-readable dry-run report."""
+    orphans = set(plan['orphans'])
+    lines = [f"REMOVE scene {name}" for name in plan['scenes']]
+    lines += [f"REMOVE input {name}" + (" (orphaned)" if name in orphans else "") for name in plan['inputs']]
+    lines.append(f"{len(plan['scenes'])} scenes, {len(plan['inputs'])} inputs ({len(orphans)} orphaned)")
+    return "\n".join(lines)
+
+
+def gc_requests(plan):
+    """Inputs go first, so no removal ever refers to an input that went away with its scene."""
+    return ([batch_request('RemoveInput', {'inputName': name}) for name in plan['inputs']]
+            + [batch_request('RemoveScene', {'sceneName': name}) for name in plan['scenes']])
+
+
+def collect_garbage(client, collection_name, keep_last=None, keep_since=None, dry_run=False,
+                    chunk_size=BATCH_CHUNK_SIZE, log_path=GENERATION_LOG_PATH):
+    """
+    Removes generated scenes the retention policy does not keep, and unused generated
+    inputs, chunk_size removals per RequestBatch. With no policy only orphaned inputs go.
+    With dry_run the plan is printed and nothing is changed. Returns (plan, failures).
+    """
+    print("\nCollecting stale generated scenes and orphaned text inputs...")
+    kept = retained_scenes(load_generations(collection_name, log_path), keep_last=keep_last, keep_since=keep_since)
+    plan = plan_gc(snapshot_generated(client, chunk_size=chunk_size), kept)
+    print(format_gc_plan(plan))
+
+    failures = []
+    if dry_run:
+        return plan, failures
+    requests = gc_requests(plan)
+    for start in range(0, len(requests), chunk_size):
+        chunk = requests[start:start + chunk_size]
+        for request, result in zip(chunk, send_batch(client, chunk)):
+            if not result_ok(result) and result.get('requestStatus', {}).get('code') != RESOURCE_NOT_FOUND:
+                target = request['requestData'].get('sceneName') or request['requestData'].get('inputName')
+                failures.append((target, result_error(result)))
+
+    for target, message in failures:
+        print(f"Failed on {target}: {message}")
+    return plan, failures
@@ -0,0 +1,64 @@
+import json
+import os
+import time
+
+from config import JOURNAL_DIR
+from template_snapshot import fingerprint
+
+
+class SceneJournal:
+    """
+    Append-only record of scene generation progress, one JSON line per completed step.
+
+    A scene's steps run from 'started' (written before its CreateScene is sent) to 'done'
+    (written once its text is set). After an interrupted run, a scene with a 'done' record
+    needs no more work, and a scene that was started but never finished may be half-built
+    in OBS and has to be repaired before it is generated again.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.steps = {}
+        if resume:
+            self.load()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    @classmethod
+    def for_run(cls, run_key, journal_dir=JOURNAL_DIR, resume=False):
+        """Opens the journal of a run identified by a JSON-like key (collection, references, options)."""
+        return cls(os.path.join(journal_dir, f"{fingerprint(run_key)[:16]}.jsonl"), resume=resume)
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # A torn last line from a crash mid-write
+                    self.steps.setdefault(record['scene'], []).append(record['step'])
+        except OSError:
+            pass
+
+    def record(self, scene_name, step, **details):
+        """Appends one completed step and flushes it, so it survives the process dying next."""
+        self.steps.setdefault(scene_name, []).append(step)
+        self.file.write(json.dumps({'scene': scene_name, 'step': step, 'at': time.time(), **details}) + "\n")
+        self.file.flush()
+
+    def is_done(self, scene_name):
+        return 'done' in self.steps.get(scene_name, ())
+
+    def is_partial(self, scene_name):
+        steps = self.steps.get(scene_name, ())
+        return 'started' in steps and 'done' not in steps
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
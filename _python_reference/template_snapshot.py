@@ -0,0 +1,83 @@
+import copy
+import hashlib
+import json
+
+from obsws_python.error import OBSSDKRequestError
+
+from config import TEMPLATE_SCENE_NAME, SCROLLING_TEXT_SOURCE_NAME
+
+
+class TemplateError(ValueError):
+    """Raised when the template scene or its text source cannot be found in OBS."""
+
+
+def clamp_bounds(transform):
+    """Ensures boundsWidth and boundsHeight are at least 1.0 to prevent OBS errors."""
+    if transform['boundsWidth'] < 1.0:
+        transform['boundsWidth'] = 1.0
+    if transform['boundsHeight'] < 1.0:
+        transform['boundsHeight'] = 1.0
+    return transform
+
+def fingerprint(value):
+    """Returns a stable hash of any JSON-like value."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class TemplateSnapshot:
+    """
+    Everything scene generation needs to know about the template, captured once per run.
+
+    Holds the template scene items, the text source's kind and settings, and the text
+    item's transform with the bounds fix-ups already applied. Validation and every
+    generation mode work from the same snapshot instead of querying the template again.
+    """
+
+    def __init__(self, collection_name, items, kind, settings, transform):
+        self.collection_name = collection_name
+        self.items = items
+        self.kind = kind
+        self.settings = settings
+        self.transform = transform
+
+    @property
+    def text_item(self):
+        for item in self.items:
+            if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME:
+                return item
+        return None
+
+    def text_settings(self, text):
+        """Returns the template text settings with the given text swapped in."""
+        return {**self.settings, 'text': text}
+
+    def transform_copy(self):
+        return copy.deepcopy(self.transform)
+
+    @classmethod
+    def capture(cls, client):
+        """
+        Captures and validates the template in the current scene collection.
+
+        Raises TemplateError if the template scene or its text source is missing.
+        """
+        collection_name = client.get_scene_collection_list().current_scene_collection_name
+
+        try:
+            items = client.get_scene_item_list(TEMPLATE_SCENE_NAME).scene_items
+        except OBSSDKRequestError as e:
+            raise TemplateError(f"Template scene '{TEMPLATE_SCENE_NAME}' not found in the current scene collection.") from e
+
+        text_item = next((item for item in items if item['sourceName'] == SCROLLING_TEXT_SOURCE_NAME), None)
+        if text_item is None:
+            raise TemplateError(f"Text source '{SCROLLING_TEXT_SOURCE_NAME}' not found in the '{TEMPLATE_SCENE_NAME}' scene.")
+
+        settings_response = client.get_input_settings(SCROLLING_TEXT_SOURCE_NAME)
+
+        # GetSceneItemList already carries each item's transform on obs-websocket 5.x.
+        transform = text_item.get('sceneItemTransform')
+        if transform is None:
+            transform = client.get_scene_item_transform(TEMPLATE_SCENE_NAME, text_item['sceneItemId']).scene_item_transform
+
+        return cls(collection_name, items, settings_response.input_kind, settings_response.input_settings,
+                   clamp_bounds(dict(transform)))
@@ -0,0 +1,25 @@
+# tests/conftest.py
+
+import pytest
+import bible_utils
+from bench.bible_api_standin import BibleApiStandIn
+
+@pytest.fixture
+def make_verses():
+    """Returns a factory for formatted John 3 verses with the given numbers, as get_verses_for_references returns them."""
+    def make(*numbers):
+        return [{'reference': f'John 3:{v}', 'obs_text': f'[{v}] Verse {v}', 'scene_name': f'Scripture-JHN-3:{v}'}
+                for v in numbers]
+    return make
+
+@pytest.fixture
+def verses(make_verses):
+    """Three formatted verses, in reading order."""
+    return make_verses(1, 2, 3)
+
+@pytest.fixture
+def bible_api(monkeypatch):
+    """Runs the Bible API stand-in, five verses per chapter, and points bible_utils at it."""
+    with BibleApiStandIn(verses_per_chapter=5) as api:
+        monkeypatch.setattr(bible_utils, 'API_BASE_URL', api.base_url)
+        yield api
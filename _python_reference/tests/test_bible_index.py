@@ -0,0 +1,52 @@
+# tests/test_bible_index.py
+
+import json
+import pytest
+import bible_utils
+from bible_index import BibleIndex, build_index
+from bible_utils import get_verses_from_api, format_text_for_obs
+
+def write_chapter(source_dir, book_id, chapter, verses):
+    """Writes one chapter JSON file in the same shape the API serves."""
+    book_dir = source_dir / book_id
+    book_dir.mkdir(parents=True, exist_ok=True)
+    content = [{"type": "heading", "content": ["A heading"]}]
+    content += [{"type": "verse", "number": n, "content": [text]} for n, text in verses]
+    (book_dir / f"{chapter}.json").write_text(json.dumps({"chapter": {"content": content}}))
+
+@pytest.fixture
+def index_path(tmp_path):
+    """Builds a small index from a fake translation dump."""
+    source_dir = tmp_path / "dump"
+    write_chapter(source_dir, "JHN", 3, [(16, "For God so loved the world..."), (17, "For God did not send his Son...")])
+    write_chapter(source_dir, "PSA", 119, [(1, "Blessed are they whose way is blameless,"), (3, "who do no wrong")])
+    path = tmp_path / "BSB.idx"
+    assert build_index(str(source_dir), str(path)) == 4
+    return str(path)
+
+def test_index_lookups(index_path):
+    """Tests single verse and range lookups, including a verse missing from the dump."""
+    with BibleIndex(index_path) as index:
+        assert index.translation == "BSB"
+        assert index.verse("JHN", 3, 17) == "For God did not send his Son..."
+        assert index.verse("PSA", 119, 2) is None
+        assert index.verse_range("PSA", 119, 1, 5) == [[1, "Blessed are they whose way is blameless,"], [3, "who do no wrong"]]
+        assert not index.has_chapter("JHN", 4)
+
+def test_get_verses_from_index_skips_the_network(requests_mock, index_path):
+    """Tests that an indexed chapter is served without any API request."""
+    with BibleIndex(index_path) as index:
+        verses = get_verses_from_api("John 3:16", index=index)
+
+    assert requests_mock.call_count == 0
+    assert verses == [{
+        'reference': "John 3:16",
+        'obs_text': format_text_for_obs("[16] For God so loved the world..."),
+        'scene_name': "Scripture-JHN-3:16",
+    }]
+
+def test_index_of_another_translation_is_rejected(index_path, monkeypatch):
+    """Tests that an index built for a different translation than the API serves is not used."""
+    monkeypatch.setattr(bible_utils, 'API_BASE_URL', "https://bible.helloao.org/api/KJV")
+    with pytest.raises(ValueError, match="holds the BSB translation, not KJV"):
+        BibleIndex(index_path)
@@ -2,7 +2,9 @@
 
 import pytest
 import textwrap
-from bible_utils import parse_reference, format_text_for_obs, get_verses_from_api
+from concurrent.futures import ThreadPoolExecutor
+import bible_utils
+from bible_utils import parse_reference, parse_references, lookup_book, CHAPTER_END_VERSE, format_text_for_obs, get_verses_from_api, get_verses_for_references, stream_verses
 from config import MAX_CHARS_PER_LINE
 # --- Test 1: A simple, pure function ---
 def test_parse_reference_single_verse():
@@ -28,6 +30,40 @@ def test_parse_reference_invalid():
     with pytest.raises(ValueError):
         parse_reference("Invalid Reference")
 
+def test_parse_references_cross_chapter_and_lists():
+    """Tests cross-chapter ranges, comma lists and whole chapters split into per-chapter passages."""
+    passages = parse_references(["Jn 3:16-4:2", "Rom 8:28, 31-32", "Psalm 23"])
+    assert [(p['book'], p['chapter'], p['start_verse'], p['end_verse']) for p in passages] == [
+        ('John', 3, 16, CHAPTER_END_VERSE),
+        ('John', 4, 1, 2),
+        ('Romans', 8, 28, 28),
+        ('Romans', 8, 31, 32),
+        ('Psalms', 23, 1, CHAPTER_END_VERSE),
+    ]
+
+def test_whole_books_need_bulk_mode():
+    """Tests that a bare book name is refused unless whole books are asked for."""
+    with pytest.raises(ValueError, match="whole book of John"):
+        parse_references(["John"])
+    passages = parse_references(["Ruth"], whole_books=True)
+    assert [(p['chapter'], p['start_verse']) for p in passages] == [(1, 1), (2, 1), (3, 1), (4, 1)]
+
+def test_lookup_book_prefixes():
+    """Tests that unambiguous prefixes resolve and ambiguous or unknown names are rejected."""
+    assert lookup_book("Philem") == "Philemon"
+    assert lookup_book("1 Thes.") == "1 Thessalonians"
+    assert lookup_book("Jon") == "Jonah"
+    with pytest.raises(ValueError, match="Ambiguous"):
+        lookup_book("Jo")
+    with pytest.raises(ValueError, match="Unknown"):
+        lookup_book("Hezekiah")
+
+@pytest.mark.parametrize("reference", ["John 3:18-16", "John 4:1-3:20", "John 0:1", "John 3:16-"])
+def test_parse_references_rejects_bad_ranges(reference):
+    """Tests that malformed and backwards ranges fail at parse time."""
+    with pytest.raises(ValueError):
+        parse_references([reference])
+
 # --- Test 2: Another pure function ---
 def test_format_text_for_obs():
     """Tests the text wrapping logic."""
@@ -69,3 +105,66 @@ def test_get_verses_from_api(requests_mock):
     assert verses[1]['reference'] == "John 3:17"
     expected_text_17 = format_text_for_obs("[17] For God did not send his Son...")
     assert verses[1]['obs_text'] == expected_text_17
+
+def chapter_payload(*numbers):
+    """Builds a Bible API chapter response holding the given verse numbers."""
+    return {"chapter": {"content": [
+        {"type": "verse", "number": n, "content": [f"Verse {n}"]} for n in numbers
+    ]}}
+
+def test_get_verses_for_references_fetches_each_chapter_once(requests_mock):
+    """
+    Tests that many references are collapsed to their unique chapters,
+    and that the combined verse list keeps reference order without duplicates.
+    """
+    requests_mock.get("https://bible.helloao.org/api/BSB/JHN/3.json", json=chapter_payload(16, 17, 18))
+    requests_mock.get("https://bible.helloao.org/api/BSB/ROM/8.json", json=chapter_payload(28))
+
+    verses = get_verses_for_references(["John 3:16-17", "Rom 8:28", "John 3:17-18"])
+
+    assert requests_mock.call_count == 2
+    assert [v['reference'] for v in verses] == ["John 3:16", "John 3:17", "Romans 8:28", "John 3:18"]
+
+def test_get_verses_from_api_cross_chapter(requests_mock):
+    """Tests that a range spanning two chapters fetches both and keeps reading order."""
+    requests_mock.get("https://bible.helloao.org/api/BSB/JHN/3.json", json=chapter_payload(35, 36))
+    requests_mock.get("https://bible.helloao.org/api/BSB/JHN/4.json", json=chapter_payload(1, 2, 3))
+
+    verses = get_verses_from_api("John 3:36-4:2")
+
+    assert [v['scene_name'] for v in verses] == ["Scripture-JHN-3:36", "Scripture-JHN-4:1", "Scripture-JHN-4:2"]
+
+def test_get_verses_for_references_rejects_bad_reference_before_fetching(requests_mock):
+    """Tests that a bad reference fails before any chapter is fetched."""
+    with pytest.raises(ValueError):
+        get_verses_for_references(["John 3:16", "Nonsense 1:1"])
+    assert requests_mock.call_count == 0
+
+def test_stream_verses_yields_in_creation_order(requests_mock):
+    """
+    Tests that streamed verses match the combined verse list, reversed into the order
+    scenes are created in.
+    """
+    requests_mock.get("https://bible.helloao.org/api/BSB/JHN/3.json", json=chapter_payload(16, 17, 18))
+    requests_mock.get("https://bible.helloao.org/api/BSB/ROM/8.json", json=chapter_payload(28))
+    references = ["John 3:16-17", "Rom 8:28", "John 3:17-18"]
+
+    streamed = list(stream_verses(references))
+
+    assert streamed == list(reversed(get_verses_for_references(references)))
+
+def test_closing_an_unread_stream_shuts_down_its_fetches(requests_mock, monkeypatch):
+    """Tests that a stream closed before its first verse (e.g. OBS was unreachable) frees its fetch threads."""
+    shutdowns = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def shutdown(self, *args, **kwargs):
+            shutdowns.append(kwargs)
+            super().shutdown(*args, **kwargs)
+
+    monkeypatch.setattr(bible_utils, 'ThreadPoolExecutor', RecordingExecutor)
+    requests_mock.get("https://bible.helloao.org/api/BSB/JHN/3.json", json=chapter_payload(16))
+
+    stream_verses(["John 3:16"]).close()
+
+    assert shutdowns == [{'wait': False, 'cancel_futures': True}]
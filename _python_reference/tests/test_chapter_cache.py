@@ -0,0 +1,81 @@
+# tests/test_chapter_cache.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from bible_utils import get_verses_from_api
+from chapter_cache import ChapterCache
+
+API_URL = "https://bible.helloao.org/api/BSB/JHN/3.json"
+FAKE_API_RESPONSE = {
+    "chapter": {
+        "content": [
+            {"type": "verse", "number": 16, "content": ["For God so loved the world..."]},
+            {"type": "verse", "number": 17, "content": ["For God did not send his Son..."]}
+        ]
+    }
+}
+
+def test_repeat_runs_hit_the_cache(requests_mock, tmp_path):
+    """Tests that a cached chapter is served without another network request."""
+    cache = ChapterCache(cache_dir=str(tmp_path))
+    requests_mock.get(API_URL, json=FAKE_API_RESPONSE)
+
+    first = get_verses_from_api("John 3:16-17", cache=cache)
+    second = get_verses_from_api("John 3:16", cache=cache)
+
+    assert requests_mock.call_count == 1
+    assert second == first[:1]
+    # The extracted verse list is stored, not the raw chapter JSON.
+    assert cache.get("BSB", "JHN", 3)['verses'][0] == [16, "For God so loved the world..."]
+
+def test_stale_entry_is_revalidated_with_etag(requests_mock, tmp_path):
+    """Tests that a stale entry sends If-None-Match and keeps its verses on a 304."""
+    cache = ChapterCache(cache_dir=str(tmp_path), ttl=0)
+    requests_mock.get(API_URL, json=FAKE_API_RESPONSE, headers={'ETag': '"v1"'})
+    get_verses_from_api("John 3:16", cache=cache)
+
+    requests_mock.get(API_URL, status_code=304)
+    verses = get_verses_from_api("John 3:17", cache=cache)
+
+    assert requests_mock.last_request.headers['If-None-Match'] == '"v1"'
+    assert verses[0]['reference'] == "John 3:17"
+
+def test_offline_never_touches_the_network(requests_mock, tmp_path):
+    """Tests that offline mode serves cached chapters and rejects uncached ones."""
+    cache = ChapterCache(cache_dir=str(tmp_path), ttl=0)
+    cache.put("BSB", "JHN", 3, [[16, "For God so loved the world..."]])
+
+    assert get_verses_from_api("John 3:16", cache=cache, offline=True)[0]['reference'] == "John 3:16"
+    with pytest.raises(ValueError):
+        get_verses_from_api("John 4:1", cache=cache, offline=True)
+    assert requests_mock.call_count == 0
+
+def test_least_recently_used_chapters_are_evicted(tmp_path):
+    """Tests that the cache size cap evicts the least recently used chapter."""
+    cache = ChapterCache(cache_dir=str(tmp_path), max_entries=2)
+    cache.put("BSB", "JHN", 1, [])
+    cache.put("BSB", "JHN", 2, [])
+    os.utime(cache.path_for("BSB", "JHN", 1), (1, 1))
+    os.utime(cache.path_for("BSB", "JHN", 2), (2, 2))
+    cache.get("BSB", "JHN", 1)
+
+    cache.put("BSB", "JHN", 3, [])
+
+    assert cache.get("BSB", "JHN", 2) is None
+    assert cache.get("BSB", "JHN", 1) is not None
+    assert cache.get("BSB", "JHN", 3) is not None
+
+def test_concurrent_puts_survive_each_others_evictions(tmp_path):
+    """Tests that threads storing chapters at once never fail on a file another one evicted."""
+    cache = ChapterCache(cache_dir=str(tmp_path), max_entries=5)
+
+    def store(worker):
+        for chapter in range(1, 26):
+            cache.put("BSB", f"B{worker}", chapter, [[1, "text"]])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(store, worker) for worker in range(8)]:
+            future.result()
+
+    assert len(cache.entries()) == 5
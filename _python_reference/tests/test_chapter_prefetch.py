@@ -0,0 +1,43 @@
+# tests/test_chapter_prefetch.py
+
+import pytest
+from bible_utils import get_verses_for_references
+from chapter_cache import ChapterCache
+from chapter_prefetch import next_chapters, chapters_after_last_generated, prefetch_chapters, format_prefetch_report
+from scene_gc import record_generation
+from text_layout import TextLayout, wrap_text
+
+def test_next_chapters_run_on_into_following_books():
+    """Tests chapter inference across a book boundary and at the end of the Bible."""
+    assert next_chapters('RUT', 3, 3) == [('RUT', 4), ('1SA', 1), ('1SA', 2)]
+    assert next_chapters('REV', 21, 5) == [('REV', 22)]
+
+def test_chapters_after_last_generated(tmp_path):
+    """Tests that --next counts from the last chapter of the most recently generated passage."""
+    log_path = str(tmp_path / 'generated.jsonl')
+    with pytest.raises(ValueError):
+        chapters_after_last_generated(2, log_path)
+    record_generation('Sunday', ['John 3:16'], ['Scripture-JHN-3:16'], log_path=log_path)
+    record_generation('Midweek', ['Romans 7:1-8:4'], ['Scripture-ROM-8:4'], log_path=log_path)
+
+    assert chapters_after_last_generated(2, log_path) == [('ROM', 9), ('ROM', 10)]
+
+def test_prefetch_fills_cache_for_offline_generation(bible_api, tmp_path):
+    """Tests fetching, the completeness report, a failed chapter, and that generation then needs no network."""
+    cache = ChapterCache(cache_dir=str(tmp_path))
+    layout = TextLayout(box_width=800)
+    wrap_text.cache_clear()
+
+    report = prefetch_chapters([('RUT', 1), ('RUT', 2)], cache, max_workers=2, layout=layout)
+    assert report == {'cached': [], 'fetched': ['RUT 1', 'RUT 2'], 'failed': [], 'complete': True}
+    assert wrap_text.cache_info().currsize == 10
+
+    report = prefetch_chapters([('RUT', 2), ('RUT', 3), ('bad', 1)], cache)
+    assert (report['cached'], report['fetched'], report['complete']) == (['RUT 2'], ['RUT 3'], False)
+    assert report['failed'][0][0] == 'bad 1'
+    assert format_prefetch_report(report).endswith("INCOMPLETE: 3 chapters, 1 fetched, 1 already local, 1 failed.")
+
+    requests_before = bible_api.stats['requests']
+    verses = get_verses_for_references(['Ruth 1-3'], cache=cache, offline=True)
+    assert len(verses) == 15
+    assert bible_api.stats['requests'] == requests_before
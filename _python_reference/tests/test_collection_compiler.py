@@ -0,0 +1,94 @@
+# tests/test_collection_compiler.py
+
+import json
+import pytest
+from obsws_python import ReqClient
+from collection_compiler import (
+    collection_from_obs, compile_collection, snapshot_from_collection, write_collection, load_collection,
+    item_to_file, transform_from_file,
+)
+from template_snapshot import TemplateSnapshot, TemplateError
+from bench.obs_standin import ObsStandIn, DEFAULT_TRANSFORM
+
+def exported_collection():
+    """A trimmed-down collection file as OBS exports it, with fields the compiler must carry over."""
+    def item(name, item_id, x):
+        return {'name': name, 'source_uuid': f'uuid-{name}', 'visible': True, 'locked': False, 'rot': 0.0,
+                'pos': {'x': x, 'y': 900.0}, 'scale': {'x': 1.0, 'y': 1.0}, 'align': 5, 'bounds_type': 2,
+                'bounds_align': 0, 'bounds': {'x': 1600.0, 'y': 200.0}, 'crop_left': 0, 'crop_top': 0,
+                'crop_right': 0, 'crop_bottom': 0, 'id': item_id, 'blend_type': 'normal'}
+    return {
+        'name': 'Sunday',
+        'current_scene': 'Camera',
+        'scene_order': [{'name': 'Camera'}, {'name': 'Scripture-Template'}],
+        'sources': [
+            {'id': 'scene', 'versioned_id': 'scene', 'name': 'Camera', 'uuid': 'uuid-Camera', 'settings': {'items': []}},
+            {'id': 'scene', 'versioned_id': 'scene', 'name': 'Scripture-Template', 'uuid': 'uuid-template',
+             'settings': {'id_counter': 4, 'items': [item('Lower Third', 3, 0.0), item('sTextScrolling', 4, 160.0)]}},
+            {'id': 'image_source', 'versioned_id': 'image_source', 'name': 'Lower Third', 'uuid': 'uuid-Lower Third',
+             'settings': {'file': 'lower-third.png'}},
+            {'id': 'text_ft2_source', 'versioned_id': 'text_ft2_source_v2', 'name': 'sTextScrolling',
+             'uuid': 'uuid-sTextScrolling', 'settings': {'text': 'Template', 'font': {'face': 'Arial', 'size': 64}},
+             'filters': [{'id': 'scroll_filter', 'name': 'Scroll', 'settings': {'speed_y': 30}}]},
+        ],
+    }
+
+def sources_by_name(collection):
+    return {source['name']: source for source in collection['sources']}
+
+def test_compile_from_exported_collection(tmp_path, verses):
+    """Tests verse scenes and inputs copied from the file template, deterministic and idempotent."""
+    collection = exported_collection()
+    compiled = compile_collection(collection, verses)
+
+    sources = sources_by_name(compiled)
+    scene = sources['Scripture-JHN-3:2']
+    text_input = sources['sTextScrolling_John_3-2']
+    assert [item['name'] for item in scene['settings']['items']] == ['Lower Third', 'sTextScrolling_John_3-2']
+    assert scene['settings']['items'][1]['source_uuid'] == text_input['uuid']
+    assert scene['settings']['items'][1]['pos'] == {'x': 160.0, 'y': 900.0}
+    assert scene['settings']['items'][0]['source_uuid'] == 'uuid-Lower Third'
+    assert text_input['settings'] == {'text': '[2] Verse 2', 'font': {'face': 'Arial', 'size': 64}}
+    assert text_input['filters'] == sources['sTextScrolling']['filters']
+    assert [entry['name'] for entry in compiled['scene_order']] == \
+        ['Camera', 'Scripture-Template', 'Scripture-JHN-3:1', 'Scripture-JHN-3:2', 'Scripture-JHN-3:3']
+    assert collection == exported_collection()
+
+    assert compile_collection(collection, verses) == compiled
+    assert compile_collection(compiled, verses) == compiled
+    path = str(tmp_path / 'Sunday.json')
+    write_collection(compiled, path)
+    assert load_collection(path) == compiled
+
+    template = snapshot_from_collection(collection)
+    assert template.settings['font']['size'] == 64
+    assert template.transform['boundsType'] == 'OBS_BOUNDS_SCALE_OUTER'
+    del collection['sources'][1]
+    with pytest.raises(TemplateError):
+        compile_collection(collection, verses)
+
+def test_compile_from_obs_snapshot_matches_live_generation(verses):
+    """Tests that a collection compiled from one websocket snapshot describes the scenes live generation builds."""
+    with ObsStandIn() as obs:
+        with ReqClient(host=obs.host, port=obs.port, password='', timeout=5) as client:
+            template = TemplateSnapshot.capture(client)
+            round_trips = obs.round_trips
+            collection = collection_from_obs(client, template)
+            assert obs.round_trips == round_trips + 1
+    compiled = compile_collection(collection, verses)
+
+    sources = sources_by_name(compiled)
+    assert sources['Base Layer']['settings'] == {'color': 4278190080}
+    assert sources['sTextScrolling_John_3-1']['versioned_id'] == 'text_ft2_source_v2'
+    assert sources['sTextScrolling_John_3-1']['id'] == 'text_ft2_source'
+    items = sources['Scripture-JHN-3:1']['settings']['items']
+    assert [item['name'] for item in items] == ['Base Layer', 'sTextScrolling_John_3-1']
+    assert transform_from_file(items[1]) == {key: DEFAULT_TRANSFORM[key] for key in transform_from_file(items[1])}
+    assert json.dumps(compile_collection(collection, verses)) == json.dumps(compiled)
+
+def test_transform_round_trip():
+    """Tests that websocket transforms survive the trip through the file format."""
+    item = {'sourceName': 'Logo', 'sceneItemId': 7, 'sceneItemEnabled': False, 'sceneItemTransform': DEFAULT_TRANSFORM}
+    converted = item_to_file(item, 'uuid-Logo')
+    assert converted['visible'] is False and converted['id'] == 7
+    assert transform_from_file(converted) == {key: DEFAULT_TRANSFORM[key] for key in transform_from_file(converted)}
@@ -0,0 +1,89 @@
+# tests/test_image_stage.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from obsws_python import ReqClient
+from image_stage import ImageCache, read_image_jobs, image_scene_name, run_image_stage
+from template_snapshot import TemplateSnapshot
+from bench.image_backend_standin import ImageBackendStandIn
+from bench.obs_standin import ObsStandIn
+
+PROMPTS = {
+    'John 3:16-18': "A lamp on a hill at dawn",
+    'Psalm 23': "Green pastures beside still waters",
+    'Ruth 1:16': "Two women on a dusty road",
+    'Genesis 1:1-3': "Light breaking over dark water",
+    'Mark 4:39': "A calm sea under a clearing sky",
+    'Luke 15:20': "A lamp on a hill at dawn",
+}
+
+@pytest.fixture
+def jobs(tmp_path):
+    path = tmp_path / 'images.txt'
+    path.write_text("# Sunday images\n\n" + "\n".join(f"{ref} | {prompt}" for ref, prompt in PROMPTS.items()))
+    return read_image_jobs(str(path))
+
+class FlakyBackend(ImageBackendStandIn):
+    def generate(self, prompt, width, height):
+        if 'calm sea' in prompt:
+            raise RuntimeError("quota exceeded")
+        return super().generate(prompt, width, height)
+
+def test_image_jobs_and_scene_names(jobs):
+    """Tests plan parsing and that image scene names stay apart from verse scene names."""
+    assert [job['scene_name'] for job in jobs][:2] == ['Scripture-Image-JHN-3:16-18', 'Scripture-Image-PSA-23']
+    assert image_scene_name('Ruth') == 'Scripture-Image-RUT-all'
+
+def test_image_cache_evicts_least_recently_used(tmp_path):
+    """Tests content addressing and size-based eviction."""
+    cache = ImageCache(cache_dir=str(tmp_path), max_bytes=250)
+    backend = ImageBackendStandIn()
+    keys = [cache.key_for(backend, prompt, 1920, 1080) for prompt in ('a', 'b', 'c')]
+    assert len(set(keys)) == 3 and keys[0] == cache.key_for(backend, 'a', 1920, 1080)
+
+    first = cache.put(keys[0], 'png', b'x' * 100)
+    cache.put(keys[1], 'png', b'x' * 100)
+    os.utime(first, (0, 0))
+    cache.put(keys[2], 'png', b'x' * 100)
+
+    assert cache.get(keys[0], 'png') is None
+    assert cache.get(keys[1], 'png') and cache.get(keys[2], 'png')
+
+def test_concurrent_puts_survive_each_others_evictions(tmp_path):
+    """Tests that workers storing images at once never fail on a file another one evicted."""
+    cache = ImageCache(cache_dir=str(tmp_path), max_bytes=500)
+
+    def store(worker):
+        for n in range(25):
+            cache.put(f"{worker:02d}{n:062d}", 'png', b'x' * 100)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(store, worker) for worker in range(8)]:
+            future.result()
+
+    assert sum(size for _, size, _ in cache.entries()) <= 500
+
+def test_image_stage_runs_in_parallel_and_reruns_for_free(jobs, tmp_path):
+    """Tests the worker bound on a cold run, shared prompts, isolated failures, and a rerun with no calls."""
+    cache = ImageCache(cache_dir=str(tmp_path / 'images'))
+    backend = FlakyBackend(latency=0.05)
+    with ObsStandIn() as obs:
+        with ReqClient(host=obs.host, port=obs.port, password='', timeout=5) as client:
+            template = TemplateSnapshot.capture(client)
+            cold = run_image_stage(client, jobs, backend, template, cache=cache, max_workers=3)
+            calls = backend.calls
+            warm = run_image_stage(client, jobs, backend, template, cache=cache, max_workers=3)
+
+        scene = obs.state.scenes['Scripture-Image-JHN-3:16-18']
+        image_input = obs.state.inputs['sImage_JHN-3-16-18']
+
+    assert calls == 4 and backend.max_in_flight == 3
+    assert (cold['generated'], cold['cached'], cold['scenes']) == (4, 0, 5)
+    assert cold['failures'] == [('Mark 4:39', "RuntimeError: quota exceeded")]
+    assert [item['sourceName'] for item in scene] == ['Base Layer', 'sImage_JHN-3-16-18']
+    assert image_input['inputKind'] == 'image_source' and os.path.isfile(image_input['inputSettings']['file'])
+    assert scene[1]['sceneItemTransform']['positionY'] == template.transform['positionY']
+
+    assert backend.calls == calls
+    assert (warm['generated'], warm['cached'], warm['scenes']) == (0, 5, 5)
@@ -0,0 +1,73 @@
+# tests/test_instrumentation.py
+
+import asyncio
+import json
+import pytest
+from obsws_python import ReqClient
+from instrumentation import Profiler, NULL_SPAN, profiler, instrument_obs_client
+from obs_async import automate_scene_generation_async
+from obs_automator import automate_scene_generation_batched
+from bench.obs_standin import ObsStandIn
+
+@pytest.fixture
+def enabled_profiler():
+    """Enables the shared profiler for one test and leaves it off and empty afterwards."""
+    profiler.reset()
+    profiler.enable()
+    yield profiler
+    profiler.enabled = False
+    profiler.reset()
+
+def test_disabled_profiler_records_nothing():
+    """Tests that a disabled profiler hands out the shared no-op span and ignores counters."""
+    disabled = Profiler()
+
+    with disabled.span('phase.fetch') as span:
+        pass
+    disabled.count('obs.bytes_sent', 100)
+
+    assert span is NULL_SPAN
+    assert disabled.summary() == {'spans': {}, 'counters': {}}
+
+def test_summary_and_exports(tmp_path):
+    """Tests span statistics and the JSON and Prometheus textfile outputs."""
+    recorder = Profiler()
+    recorder.enable()
+    for seconds in (0.01, 0.02, 0.03, 0.04):
+        recorder.record('obs.CreateScene', seconds)
+    recorder.count('obs.messages_sent', 4)
+
+    stats = recorder.summary()['spans']['obs.CreateScene']
+    assert stats['count'] == 4
+    assert stats['total_seconds'] == pytest.approx(0.1)
+    assert stats['p50_seconds'] == 0.02
+    assert stats['p99_seconds'] == 0.04
+
+    json_path = tmp_path / 'metrics.json'
+    recorder.write_json(str(json_path))
+    assert json.loads(json_path.read_text())['counters'] == {'obs.messages_sent': 4}
+
+    prom_path = tmp_path / 'metrics.prom'
+    recorder.write_prometheus(str(prom_path))
+    prom = prom_path.read_text()
+    assert 'obs_scene_generator_span_seconds_count{span="obs.CreateScene"} 4' in prom
+    assert 'obs_scene_generator_obs_messages_sent_total 4' in prom
+
+def test_instrumented_client_counts_round_trips(enabled_profiler):
+    """Tests that the wrapped client's message counts match the round trips OBS saw, pipelined ones included."""
+    verses = [{'reference': f'John 3:{v}', 'obs_text': f'[{v}] text', 'scene_name': f'Scripture-JHN-3:{v}'}
+              for v in (16, 17, 18)]
+
+    with ObsStandIn(password='secret') as obs:
+        with ReqClient(host=obs.host, port=obs.port, password='secret', timeout=5) as client:
+            instrument_obs_client(client)
+            automate_scene_generation_batched(client, verses[:2])
+            asyncio.run(automate_scene_generation_async(client, verses[2:]))
+        round_trips = obs.round_trips
+
+    summary = enabled_profiler.summary()
+    assert summary['counters']['obs.messages_sent'] == round_trips
+    assert summary['counters']['obs.messages_received'] == round_trips
+    assert summary['counters']['obs.bytes_sent'] > 0
+    assert summary['spans']['obs.RequestBatch']['count'] == 2
+    assert 'obs.GetSceneList' in summary['spans']
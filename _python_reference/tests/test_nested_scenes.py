@@ -0,0 +1,58 @@
+# tests/test_nested_scenes.py
+
+import pytest
+from obsws_python import ReqClient
+from config import CHROME_SCENE_NAME, CHROME_OVERLAY_SCENE_NAME
+from obs_automator import automate_scene_generation, automate_scene_generation_batched
+from nested_scenes import ensure_chrome_scenes, migrate_to_nested
+from template_snapshot import TemplateSnapshot
+from bench.obs_standin import ObsStandIn, ObsState, DEFAULT_TRANSFORM
+
+def template_state(with_overlay=False):
+    state = ObsState()
+    if with_overlay:
+        state.create_input('Scripture-Template', 'Logo', 'image_source', {'file': 'logo.png'})
+    return state
+
+def sources(obs, scene_name):
+    return [item['sourceName'] for item in obs.state.scenes[scene_name]]
+
+def nested_sources(verse_number, with_overlay):
+    overlay = [CHROME_OVERLAY_SCENE_NAME] if with_overlay else []
+    return [CHROME_SCENE_NAME, f'sTextScrolling_John_3-{verse_number}'] + overlay
+
+@pytest.mark.parametrize("with_overlay", [False, True])
+def test_nested_generation_uses_shared_chrome(with_overlay, verses):
+    """Tests that each verse scene holds only the chrome scene(s) and its own text input."""
+    with ObsStandIn(state=template_state(with_overlay)) as obs:
+        with ReqClient(host=obs.host, port=obs.port, password='', timeout=5) as client:
+            template = TemplateSnapshot.capture(client)
+            layers = ensure_chrome_scenes(client, template)
+            assert automate_scene_generation_batched(client, verses, template=template, layers=layers) == []
+            # A second run reuses the chrome scenes it finds.
+            assert ensure_chrome_scenes(client, template) == layers
+
+        assert sources(obs, 'Scripture-JHN-3:2') == nested_sources(2, with_overlay)
+        assert sources(obs, CHROME_SCENE_NAME) == ['Base Layer']
+        assert obs.state.inputs['sTextScrolling_John_3-2']['inputSettings']['text'] == '[2] Verse 2'
+        text_item = obs.state.scenes['Scripture-JHN-3:2'][1]
+        assert text_item['sceneItemTransform']['positionY'] == DEFAULT_TRANSFORM['positionY']
+
+@pytest.mark.parametrize("with_overlay", [False, True])
+def test_migrate_to_nested_converts_duplicated_scenes(with_overlay, verses):
+    """Tests that copied template items are swapped for chrome scenes in place, keeping the text input."""
+    with ObsStandIn(state=template_state(with_overlay)) as obs:
+        with ReqClient(host=obs.host, port=obs.port, password='', timeout=5) as client:
+            automate_scene_generation(client, verses)
+            scene_order = list(obs.state.scenes)
+            template = TemplateSnapshot.capture(client)
+
+            assert migrate_to_nested(client, template, dry_run=True) == (3, [])
+            assert sources(obs, 'Scripture-JHN-3:1')[0] == 'Base Layer'
+            assert migrate_to_nested(client, template) == (3, [])
+            assert migrate_to_nested(client, template) == (0, [])
+
+        for number in (1, 2, 3):
+            assert sources(obs, f'Scripture-JHN-3:{number}') == nested_sources(number, with_overlay)
+        assert [name for name in obs.state.scenes if name in scene_order] == scene_order
+        assert obs.state.inputs['sTextScrolling_John_3-3']['inputSettings']['text'] == '[3] Verse 3'
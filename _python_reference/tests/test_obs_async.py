@@ -0,0 +1,132 @@
+# tests/test_obs_async.py
+
+import json
+import queue
+import random
+import threading
+import time
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from websocket import ABNF, WebSocketTimeoutException
+from obs_async import AsyncObsClient, READER_POLL_SECONDS, automate_scene_generation_async
+from template_snapshot import TemplateSnapshot
+
+class FakeObsWebSocket:
+    """
+    Answers obs-websocket requests from a background thread after a random delay,
+    so responses come back out of order, and records the highest number in flight.
+    """
+
+    def __init__(self, hang_on=None):
+        self.hang_on = hang_on
+        self.sent = []
+        self.responses = queue.Queue()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.timeout = 10
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def send(self, raw):
+        request = json.loads(raw)['d']
+        self.sent.append(request)
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if request['requestType'] == self.hang_on:
+            return
+        threading.Timer(random.uniform(0, 0.01), self.respond, args=(request,)).start()
+
+    def respond(self, request):
+        data = {'sceneItemId': 101} if request['requestType'] == 'CreateInput' else {}
+        with self.lock:
+            self.in_flight -= 1
+        self.responses.put(json.dumps({'op': 7, 'd': {
+            'requestType': request['requestType'], 'requestId': request['requestId'],
+            'requestStatus': {'result': True, 'code': 100}, 'responseData': data,
+        }}))
+
+    def ping(self, payload):
+        self.responses.put((ABNF.OPCODE_PONG, payload))
+
+    def recv_data(self, control_frame=False):
+        try:
+            message = self.responses.get(timeout=self.timeout)
+        except queue.Empty:
+            raise WebSocketTimeoutException("timed out")
+        return message if isinstance(message, tuple) else (ABNF.OPCODE_TEXT, message.encode('utf-8'))
+
+@pytest.fixture
+def template():
+    return TemplateSnapshot(
+        'Sunday',
+        [{'sourceName': 'background', 'sceneItemId': 1}, {'sourceName': 'sTextScrolling', 'sceneItemId': 2}],
+        'text_ft2_source_v2', {'text': 'template text'}, {'boundsWidth': 1920.0, 'boundsHeight': 1080.0},
+    )
+
+def make_client(ws):
+    client = MagicMock()
+    client.base_client.ws = ws
+    client.get_scene_list.return_value.scenes = []
+    return client
+
+VERSES = [
+    {'scene_name': f'Scripture-PSA-119:{n}', 'reference': f'Psalms 119:{n}', 'obs_text': f'text {n}'}
+    for n in range(1, 21)
+]
+
+def test_pipelined_generation_keeps_scene_order_and_window(template):
+    """Tests that scenes are built concurrently within the window and still created in order."""
+    ws = FakeObsWebSocket()
+
+    failures = asyncio.run(automate_scene_generation_async(make_client(ws), VERSES, template=template, max_in_flight=4))
+
+    assert failures == []
+    assert 1 < ws.max_in_flight <= 4
+    created = [r['requestData']['sceneName'] for r in ws.sent if r['requestType'] == 'CreateScene']
+    assert created == [v['scene_name'] for v in reversed(VERSES)]
+    # Every transform goes to an item ID returned by its scene's CreateInput.
+    transforms = [r for r in ws.sent if r['requestType'] == 'SetSceneItemTransform']
+    assert len(transforms) == 20 and all(r['requestData']['sceneItemId'] == 101 for r in transforms)
+    # The websocket's original timeout is restored for the synchronous client.
+    assert ws.timeout == 10
+
+def test_timed_out_request_fails_only_its_verse(template):
+    """Tests that a request timeout is reported without blocking the other scenes."""
+    ws = FakeObsWebSocket(hang_on='SetInputSettings')
+    client = make_client(ws)
+    client.get_scene_list.return_value.scenes = [{'sceneName': 'Scripture-PSA-119:2'}]
+
+    failures = asyncio.run(automate_scene_generation_async(client, VERSES[:3], template=template, timeout=0.2))
+
+    assert [reference for reference, _ in failures] == ['Psalms 119:2']
+    assert len([r for r in ws.sent if r['requestType'] == 'CreateScene']) == 2
+
+def test_setup_failure_is_reported(template):
+    """Tests that an error before the pipeline starts is reported instead of returning no failures."""
+    client = make_client(FakeObsWebSocket())
+    client.get_scene_list.side_effect = ConnectionResetError("Connection reset by peer")
+
+    failures = asyncio.run(automate_scene_generation_async(client, VERSES[:3], template=template))
+
+    assert failures == [('Scripture-Template', 'Connection reset by peer')]
+
+def test_closing_wakes_the_reader_without_waiting_out_its_poll():
+    """Tests that leaving the client stops the reader at once and restores the socket timeout."""
+    ws = FakeObsWebSocket()
+
+    async def open_and_close():
+        async with AsyncObsClient(ws):
+            pass
+
+    started = time.monotonic()
+    asyncio.run(open_and_close())
+
+    assert time.monotonic() - started < READER_POLL_SECONDS / 2
+    assert ws.timeout == 10 and ws.responses.empty()
@@ -1,8 +1,9 @@
 # tests/test_obs_automator.py
 
+import json
 import pytest
 from unittest.mock import MagicMock, call
-from obs_automator import automate_scene_generation
+from obs_automator import automate_scene_generation, automate_scene_generation_batched, stream_scene_generation
 
 # A fixture to create a reusable mock client for our tests
 @pytest.fixture
@@ -92,3 +93,146 @@ def test_updates_existing_scene(mock_obs_client):
         settings={'text': 'NEW formatted text for John 3:16'},
         overlay=True
     )
+
+
+# --- Batched mode: the client's websocket answers RequestBatches directly ---
+def fake_batch_ws(fail_request_type=None, drop_after_batches=None):
+    """
+    Creates a mock websocket that answers each RequestBatch and records what was sent.
+    With drop_after_batches, the connection drops once that many batches were answered.
+    """
+    ws = MagicMock()
+    ws.sent_batches = []
+
+    def respond(request):
+        data = {}
+        if request['requestType'] == 'CreateInput':
+            data = {'sceneItemId': 101}
+        ok = request['requestType'] != fail_request_type
+        return {'requestType': request['requestType'], 'requestId': request['requestId'],
+                'requestStatus': {'result': ok, 'code': 100 if ok else 600, 'comment': None if ok else 'boom'},
+                'responseData': data}
+
+    def send(raw):
+        ws.sent_batches.append(json.loads(raw)['d']['requests'])
+
+    def recv():
+        if drop_after_batches is not None and len(ws.sent_batches) > drop_after_batches:
+            raise ConnectionResetError("Connection reset by peer")
+        requests = ws.sent_batches[-1]
+        return json.dumps({'op': 9, 'd': {'results': [respond(r) for r in requests]}})
+
+    ws.send.side_effect = send
+    ws.recv.side_effect = recv
+    return ws
+
+def test_batched_creates_scenes_in_few_round_trips(mock_obs_client):
+    """Tests that batched mode builds every scene with a constant number of batches."""
+    mock_obs_client.base_client.ws = fake_batch_ws()
+    mock_obs_client.get_scene_list.return_value.scenes = []
+    verses = [
+        {'scene_name': f'Scripture-JHN-3:{n}', 'reference': f'John 3:{n}', 'obs_text': f'text {n}'}
+        for n in (16, 17, 18)
+    ]
+
+    failures = automate_scene_generation_batched(mock_obs_client, verses, chunk_size=10)
+
+    assert failures == []
+    # One construction batch and one transform batch.
+    batches = mock_obs_client.base_client.ws.sent_batches
+    assert len(batches) == 2
+    construction = [r['requestType'] for r in batches[0]]
+    assert construction.count('CreateScene') == 3
+    assert construction.count('DuplicateSceneItem') == 3
+    # Scenes are created in reverse so OBS lists them in reading order.
+    assert batches[0][0]['requestData']['sceneName'] == 'Scripture-JHN-3:18'
+    create_input = next(r for r in batches[0] if r['requestType'] == 'CreateInput')
+    assert create_input['requestData']['inputSettings']['text'] == 'text 18'
+    assert [r['requestData']['sceneItemId'] for r in batches[1]] == [101, 101, 101]
+    # The template transform is read once per run, not once per verse.
+    mock_obs_client.get_scene_item_transform.assert_called_once()
+
+def test_batched_reports_failures_per_verse(mock_obs_client):
+    """Tests that a failed request is reported against the verse that caused it."""
+    mock_obs_client.base_client.ws = fake_batch_ws(fail_request_type='SetInputSettings')
+    mock_obs_client.get_scene_list.return_value.scenes = [{'sceneName': 'Scripture-JHN-3:16'}]
+    verses = [
+        {'scene_name': 'Scripture-JHN-3:16', 'reference': 'John 3:16', 'obs_text': 'text'},
+        {'scene_name': 'Scripture-JHN-3:17', 'reference': 'John 3:17', 'obs_text': 'text'},
+    ]
+
+    failures = automate_scene_generation_batched(mock_obs_client, verses)
+
+    assert failures == [('John 3:16', 'SetInputSettings failed (code 600): boom')]
+
+def test_batched_reports_a_connection_dropped_mid_run(mock_obs_client):
+    """Tests that a connection lost between chunks is reported, not returned as success."""
+    mock_obs_client.base_client.ws = fake_batch_ws(drop_after_batches=2)
+    mock_obs_client.get_scene_list.return_value.scenes = []
+    verses = [
+        {'scene_name': f'Scripture-JHN-3:{n}', 'reference': f'John 3:{n}', 'obs_text': f'text {n}'}
+        for n in (16, 17, 18)
+    ]
+
+    failures = automate_scene_generation_batched(mock_obs_client, verses, chunk_size=1)
+
+    # John 3:18 made it in before the drop, the chunk being sent is reported and the run stops.
+    assert failures == [('John 3:17', 'Connection reset by peer')]
+    assert len(mock_obs_client.base_client.ws.sent_batches) == 3
+
+def test_batched_reports_a_template_read_failure(mock_obs_client):
+    """Tests that an error before any batch is sent is reported against the template."""
+    mock_obs_client.get_scene_list.side_effect = ConnectionResetError("Connection reset by peer")
+
+    failures = automate_scene_generation_batched(mock_obs_client, [
+        {'scene_name': 'Scripture-JHN-3:16', 'reference': 'John 3:16', 'obs_text': 'text'},
+    ])
+
+    assert failures == [('Scripture-Template', 'Connection reset by peer')]
+
+def test_template_transform_is_read_once_per_run(mock_obs_client):
+    """Tests that the classic path reuses the template snapshot for every verse."""
+    mock_obs_client.get_scene_list.return_value.scenes = []
+    verses = [
+        {'scene_name': f'Scripture-JHN-3:{n}', 'reference': f'John 3:{n}', 'obs_text': f'text {n}'}
+        for n in (16, 17, 18)
+    ]
+
+    automate_scene_generation(mock_obs_client, verses)
+
+    assert mock_obs_client.create_scene.call_count == 3
+    mock_obs_client.get_scene_item_transform.assert_called_once()
+
+def test_stream_creates_scenes_as_verses_arrive(mock_obs_client):
+    """Tests that streamed verses are turned into scenes in the order they arrive."""
+    mock_obs_client.get_scene_list.return_value.scenes = []
+    arrived = []
+
+    def verse_stream():
+        for n in (18, 17, 16):
+            arrived.append(n)
+            yield {'scene_name': f'Scripture-JHN-3:{n}', 'reference': f'John 3:{n}', 'obs_text': f'text {n}'}
+
+    generated, failures = stream_scene_generation(mock_obs_client, verse_stream())
+
+    assert (generated, failures) == (3, [])
+    assert mock_obs_client.create_scene.call_args_list == [
+        call('Scripture-JHN-3:18'), call('Scripture-JHN-3:17'), call('Scripture-JHN-3:16')
+    ]
+
+def test_stream_reports_obs_failures_apart_from_fetch_errors(mock_obs_client):
+    """Tests that an OBS error is returned as a failure while a fetch error reaches the caller."""
+    mock_obs_client.get_scene_list.return_value.scenes = []
+    mock_obs_client.create_scene.side_effect = [None, RuntimeError('OBS went away')]
+    verses = [{'scene_name': f'Scripture-JHN-3:{n}', 'reference': f'John 3:{n}', 'obs_text': f'text {n}'}
+              for n in (17, 16)]
+
+    assert stream_scene_generation(mock_obs_client, iter(verses)) == (1, [('John 3:16', 'OBS went away')])
+
+    def failing_fetch():
+        yield verses[0]
+        raise ConnectionError('API unreachable')
+
+    mock_obs_client.create_scene.side_effect = None
+    with pytest.raises(ConnectionError, match='API unreachable'):
+        stream_scene_generation(mock_obs_client, failing_fetch())
@@ -0,0 +1,62 @@
+# tests/test_obs_bulk.py
+
+import pytest
+from obsws_python import ReqClient
+import obs_bulk
+from obs_automator import automate_scene_generation
+from obs_bulk import BulkProgress, iter_bulk_verses, bulk_scene_generation
+from bible_utils import get_verses_for_references
+from template_snapshot import TemplateSnapshot
+from bench.obs_standin import ObsStandIn
+
+def test_bulk_verses_walk_whole_book_lazily(bible_api, monkeypatch):
+    """Tests creation order over a whole book, de-duplication, and that fetching stays a bounded window ahead."""
+    loads = []
+    load_chapter_verses = obs_bulk.load_chapter_verses
+    def counting_load(parsed_ref, book_id, **kwargs):
+        loads.append(parsed_ref['chapter'])
+        return load_chapter_verses(parsed_ref, book_id, **kwargs)
+    monkeypatch.setattr(obs_bulk, 'load_chapter_verses', counting_load)
+
+    progress = BulkProgress(total_chapters=5)
+    stream = iter_bulk_verses(['Ruth', 'Ruth 4:2'], prefetch=2, progress=progress)
+    first = next(stream)
+    assert len(loads) <= 3
+    verses = [first] + list(stream)
+
+    expected = get_verses_for_references(['Ruth'], whole_books=True)
+    assert [verse['scene_name'] for verse in verses] == [verse['scene_name'] for verse in reversed(expected)]
+    assert verses[0]['scene_name'] == 'Scripture-RUT-4:5'
+    assert sorted(loads) == [1, 2, 3, 4, 4]
+    assert progress.chapters == 5
+
+def test_bulk_generation_matches_classic_order(bible_api):
+    """Tests that chunked bulk generation builds the same scenes, in the same order, as the classic mode."""
+    references = ['Ruth 1-3']
+    results = {}
+    for mode in ('classic', 'bulk'):
+        with ObsStandIn() as obs:
+            with ReqClient(host=obs.host, port=obs.port, password='', timeout=5) as client:
+                if mode == 'classic':
+                    automate_scene_generation(client, get_verses_for_references(references))
+                else:
+                    progress = BulkProgress(total_chapters=3)
+                    template = TemplateSnapshot.capture(client)
+                    failures = bulk_scene_generation(client, iter_bulk_verses(references, progress=progress),
+                                                     template, chunk_size=4, progress=progress)
+                    assert failures == []
+                    assert (progress.chapters, progress.scenes) == (3, 15)
+            results[mode] = {name: [item['sourceName'] for item in items] for name, items in obs.state.scenes.items()}
+
+    assert list(results['bulk']) == list(results['classic'])
+    assert results['bulk'] == results['classic']
+
+def test_bulk_progress_eta():
+    """Tests the chapter-rate ETA and the progress line."""
+    now = [100.0]
+    progress = BulkProgress(total_chapters=150, clock=lambda: now[0])
+    assert progress.eta() is None
+    now[0] += 30
+    progress.chapters, progress.scenes = 10, 200
+    assert progress.eta() == pytest.approx(420)
+    assert progress.format() == "[10/150 chapters, 7%] 200 scenes, 6.7 scenes/s, ETA 7:00"
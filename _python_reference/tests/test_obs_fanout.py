@@ -0,0 +1,98 @@
+# tests/test_obs_fanout.py
+
+import asyncio
+import json
+import socket
+import time
+import pytest
+from obs_async import automate_scene_generation_async
+from obs_automator import automate_scene_generation, automate_scene_generation_batched
+from obs_reconcile import reconcile_scene_generation
+from obs_fanout import load_targets, fan_out, format_fanout_summary
+from obs_scene_generator import connect_to_obs
+from template_snapshot import TemplateSnapshot
+from bench.obs_standin import ObsStandIn, ObsState
+
+def open_session(target):
+    client = connect_to_obs(target['host'], target['port'], target['password'], max_retries=1)
+    return client, TemplateSnapshot.capture(client)
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_load_targets(tmp_path, monkeypatch):
+    """Tests defaults, passwords from the environment, and rejection of a bad file."""
+    monkeypatch.setenv('OVERFLOW_PASSWORD', 'hunter2')
+    path = tmp_path / 'targets.json'
+    path.write_text(json.dumps({'targets': [
+        {'name': 'main', 'host': '10.0.0.2', 'port': 4456, 'password': 'a'},
+        {'host': 'overflow.local', 'password_env': 'OVERFLOW_PASSWORD'},
+    ]}))
+
+    assert load_targets(str(path)) == [
+        {'name': 'main', 'host': '10.0.0.2', 'port': 4456, 'password': 'a'},
+        {'name': 'overflow.local:4455', 'host': 'overflow.local', 'port': 4455, 'password': 'hunter2'},
+    ]
+    path.write_text(json.dumps([{'name': 'main'}]))
+    with pytest.raises(ValueError):
+        load_targets(str(path))
+
+def test_fan_out_runs_targets_concurrently_and_isolates_failures(verses):
+    """Tests that every live instance gets the scenes at once, and a dead or broken one only fails itself."""
+    broken_state = ObsState(with_template=False)
+    with ObsStandIn(password='a', latency=0.02) as main, ObsStandIn(password='b', latency=0.02) as monitor, \
+            ObsStandIn(state=broken_state) as broken:
+        targets = [
+            {'name': 'main', 'host': main.host, 'port': main.port, 'password': 'a'},
+            {'name': 'monitor', 'host': monitor.host, 'port': monitor.port, 'password': 'b'},
+            {'name': 'no-template', 'host': broken.host, 'port': broken.port, 'password': ''},
+            {'name': 'offline', 'host': '127.0.0.1', 'port': closed_port(), 'password': ''},
+        ]
+        started = time.perf_counter()
+        results = fan_out(targets, open_session,
+                          lambda client, template, target: automate_scene_generation(client, verses, template=template))
+        elapsed = time.perf_counter() - started
+
+    assert [result['name'] for result in results] == ['main', 'monitor', 'no-template', 'offline']
+    assert [result['ok'] for result in results] == [True, True, False, False]
+    assert 'TemplateError' in results[2]['error'] and 'ConnectionRefusedError' in results[3]['error']
+    for obs in (main, monitor):
+        assert {verse['scene_name'] for verse in verses} <= set(obs.state.scenes)
+    # Concurrent: the run takes about as long as the slower live instance, not their sum.
+    assert elapsed < results[0]['elapsed'] + results[1]['elapsed']
+
+    summary = format_fanout_summary(results)
+    assert "main: OK" in summary and "offline: ERROR" in summary
+    assert summary.endswith("2/4 targets succeeded.")
+
+# Each mode with the number of single requests it sends before its first scene write.
+GENERATORS = {
+    'batch': (lambda client, template, verses: automate_scene_generation_batched(client, verses, template=template), 1),
+    'pipeline': (lambda client, template, verses: asyncio.run(
+        automate_scene_generation_async(client, verses, template=template, timeout=1)), 1),
+    'reconcile': (lambda client, template, verses: reconcile_scene_generation(client, verses, template=template)[1], 0),
+}
+
+@pytest.mark.parametrize('mode', GENERATORS)
+def test_fan_out_reports_a_target_that_drops_mid_run(verses, mode):
+    """Tests that a target whose connection drops while its scenes are built is not reported OK."""
+    generate, reads = GENERATORS[mode]
+    with ObsStandIn() as live, ObsStandIn() as dropping:
+        def open_then_drop(target):
+            session = open_session(target)
+            if target['name'] == 'dropping':
+                dropping.drop_after_requests = dropping.stats['requests'] + reads
+            return session
+
+        targets = [
+            {'name': 'live', 'host': live.host, 'port': live.port, 'password': ''},
+            {'name': 'dropping', 'host': dropping.host, 'port': dropping.port, 'password': ''},
+        ]
+        results = fan_out(targets, open_then_drop, lambda client, template, target: generate(client, template, verses))
+
+    assert [result['ok'] for result in results] == [True, False]
+    assert results[1]['failures'] and results[1]['error'] is None
+    assert not any(scene['scene_name'] in dropping.state.scenes for scene in verses)
+    assert "dropping: FAILED" in format_fanout_summary(results)
@@ -0,0 +1,86 @@
+# tests/test_obs_reconcile.py
+
+from unittest.mock import MagicMock
+import obs_reconcile
+from obs_reconcile import plan_reconcile, reconcile_scene_generation
+
+VERSES = [
+    {'scene_name': 'Scripture-JHN-3:16', 'reference': 'John 3:16', 'obs_text': 'text 16'},
+    {'scene_name': 'Scripture-JHN-3:17', 'reference': 'John 3:17', 'obs_text': 'text 17'},
+]
+
+def make_state(texts, scene_sources=None):
+    """Builds an OBS snapshot where every verse input lives in its own scene."""
+    scene_sources = scene_sources if scene_sources is not None else {
+        'Scripture-JHN-3:16': {'background', 'sTextScrolling_John_3-16'},
+        'Scripture-JHN-3:17': {'background', 'sTextScrolling_John_3-17'},
+    }
+    return {
+        'scenes': {'Scripture-Template'} | set(scene_sources),
+        'inputs': {name: 'text_ft2_source_v2' for name in texts},
+        'scene_sources': scene_sources,
+        'texts': texts,
+    }
+
+def test_plan_is_empty_when_obs_already_matches():
+    """Tests that an already generated passage needs no changes."""
+    state = make_state({'sTextScrolling_John_3-16': 'text 16', 'sTextScrolling_John_3-17': 'text 17'})
+    assert plan_reconcile(state, VERSES) == []
+
+def test_plan_covers_create_update_repair_and_delete():
+    """Tests each kind of action the diff can produce."""
+    state = make_state(
+        {'sTextScrolling_John_3-16': 'old text'},
+        scene_sources={
+            'Scripture-JHN-3:16': {'background', 'sTextScrolling_John_3-16'},
+            'Scripture-JHN-3:18': {'background', 'sTextScrolling_John_3-18'},
+        },
+    )
+    verses = VERSES + [{'scene_name': 'Scripture-JHN-3:19', 'reference': 'John 3:19', 'obs_text': 'text 19'}]
+    state['scenes'].add('Scripture-JHN-3:19')
+    state['scene_sources']['Scripture-JHN-3:19'] = {'background'}
+
+    plan = plan_reconcile(state, verses, prune=True)
+
+    assert [(a['action'], a['scene_name']) for a in plan] == [
+        ('update', 'Scripture-JHN-3:16'),
+        ('create', 'Scripture-JHN-3:17'),
+        ('repair', 'Scripture-JHN-3:19'),
+        ('delete', 'Scripture-JHN-3:18'),
+    ]
+
+def test_rerun_sends_no_writes(monkeypatch):
+    """Tests that reconciling an up-to-date passage only reads from OBS."""
+    state = make_state({'sTextScrolling_John_3-16': 'text 16', 'sTextScrolling_John_3-17': 'text 17'})
+    monkeypatch.setattr(obs_reconcile, 'snapshot_obs_state', lambda client, verses: state)
+    send_batch = MagicMock()
+    monkeypatch.setattr(obs_reconcile, 'send_batch', send_batch)
+
+    plan, failures = reconcile_scene_generation(MagicMock(), VERSES)
+
+    assert plan == [] and failures == []
+    send_batch.assert_not_called()
+
+def test_dry_run_changes_nothing(monkeypatch, capsys):
+    """Tests that a dry run prints the plan without sending it."""
+    state = make_state({}, scene_sources={})
+    monkeypatch.setattr(obs_reconcile, 'snapshot_obs_state', lambda client, verses: state)
+    send_batch = MagicMock()
+    monkeypatch.setattr(obs_reconcile, 'send_batch', send_batch)
+
+    plan, _ = reconcile_scene_generation(MagicMock(), VERSES, dry_run=True)
+
+    assert len(plan) == 2
+    assert "CREATE  Scripture-JHN-3:16" in capsys.readouterr().out
+    send_batch.assert_not_called()
+
+def test_connection_error_is_reported(monkeypatch):
+    """Tests that an error that stops the reconcile is returned as a failure."""
+    def snapshot(client, verses):
+        raise ConnectionResetError("Connection reset by peer")
+    monkeypatch.setattr(obs_reconcile, 'snapshot_obs_state', snapshot)
+
+    plan, failures = reconcile_scene_generation(MagicMock(), VERSES)
+
+    assert plan == []
+    assert failures == [('Scripture-Template', 'Connection reset by peer')]
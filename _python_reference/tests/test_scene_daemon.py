@@ -0,0 +1,67 @@
+# tests/test_scene_daemon.py
+
+import io
+import threading
+import pytest
+from chapter_cache import ChapterCache
+from scene_client import send_request
+from scene_daemon import SceneDaemon, make_socket_server, serve_stdin
+from bench.obs_standin import ObsStandIn
+
+@pytest.fixture
+def daemon(bible_api, tmp_path):
+    """A warmed-up daemon wired to both stand-ins."""
+    with ObsStandIn(password='secret') as obs:
+        scene_daemon = SceneDaemon(obs.host, obs.port, 'secret', cache=ChapterCache(cache_dir=str(tmp_path / 'cache')),
+                                   generation_log=str(tmp_path / 'generated.jsonl'))
+        scene_daemon.warm_up()
+        yield scene_daemon, obs, bible_api
+        scene_daemon.disconnect()
+
+def test_daemon_serves_references_over_the_socket(daemon, tmp_path):
+    """Tests generate, ping and stop through the thin client, with the chapter fetched once."""
+    scene_daemon, obs, api = daemon
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = make_socket_server(scene_daemon, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        first = send_request({'command': 'generate', 'references': ['John 3:1-2']}, socket_path=socket_path)
+        second = send_request({'command': 'generate', 'references': ['John 3:3']}, socket_path=socket_path)
+        bad = send_request({'command': 'generate', 'references': ['Nonsense 1:1']}, socket_path=socket_path)
+        assert send_request({'command': 'ping'}, socket_path=socket_path) == {'ok': True, 'connected': True}
+        assert send_request({'command': 'stop'}, socket_path=socket_path) == {'ok': True}
+        thread.join(timeout=5)
+    finally:
+        server.server_close()
+
+    assert first['ok'] and first['verses'] == 2 and first['changes'] == 2
+    assert second['ok'] and second['changes'] == 1
+    assert not bad['ok'] and 'Unknown book' in bad['error']
+    assert api.stats['requests'] == 1
+    assert {'Scripture-JHN-3:1', 'Scripture-JHN-3:2', 'Scripture-JHN-3:3'} <= set(obs.state.scenes)
+
+def test_daemon_reconnects_after_losing_obs(daemon, capsys):
+    """Tests that a dropped OBS connection is reopened and the request still completes."""
+    scene_daemon, obs, _ = daemon
+    scene_daemon.client.base_client.ws.sock.close()
+
+    serve_stdin(scene_daemon, io.StringIO("John 3:4\n!ping\n!stop\nJohn 3:5\n"))
+
+    output = capsys.readouterr().out
+    assert "reconnecting" in output
+    assert "OK: 1 verses, 1 scene changes" in output
+    assert 'Scripture-JHN-3:4' in obs.state.scenes
+    assert 'Scripture-JHN-3:5' not in obs.state.scenes
+
+def test_daemon_prefetches_in_the_background(daemon):
+    """Tests that a prefetch runs on its own thread, reports through ping, and serves later references from cache."""
+    scene_daemon, _, api = daemon
+    assert scene_daemon.handle({'command': 'prefetch', 'chapters': [['JHN', 4], ['JHN', 5]]}) == {'ok': True}
+    scene_daemon.prefetch_thread.join(timeout=5)
+
+    status = scene_daemon.handle({'command': 'ping'})['prefetch']
+    assert status['complete'] and "2 fetched" in status['summary']
+    requests_before = api.stats['requests']
+    assert scene_daemon.handle({'command': 'generate', 'references': ['John 5:1-2']})['ok']
+    assert api.stats['requests'] == requests_before
@@ -0,0 +1,66 @@
+# tests/test_scene_gc.py
+
+import pytest
+from obsws_python import ReqClient
+from obs_automator import automate_scene_generation
+from scene_gc import record_generation, load_generations, retained_scenes, collect_garbage
+from bench.obs_standin import ObsStandIn
+
+@pytest.fixture
+def generated(tmp_path, make_verses):
+    """A stand-in with three passages generated, one after another, and their generation log."""
+    log_path = str(tmp_path / 'generated.jsonl')
+    with ObsStandIn() as obs:
+        with ReqClient(host=obs.host, port=obs.port, password='', timeout=5) as client:
+            for numbers in ((1, 2), (3,), (4, 5)):
+                verses = make_verses(*numbers)
+                automate_scene_generation(client, verses)
+                record_generation('Stand-in', [f'John 3:{numbers[0]}-{numbers[-1]}'],
+                                  [verse['scene_name'] for verse in verses], log_path=log_path)
+            yield obs, client, log_path
+
+def test_retention_policy():
+    """Tests keep_last and keep_since against logged passages, and that no policy keeps everything."""
+    generations = [{'at': 100, 'scenes': ['A', 'B']}, {'at': 200, 'scenes': ['B', 'C']}, {'at': 300, 'scenes': ['D']}]
+    assert retained_scenes(generations) is None
+    assert retained_scenes(generations, keep_last=1) == {'D'}
+    assert retained_scenes(generations, keep_last=2) == {'B', 'C', 'D'}
+    assert retained_scenes(generations, keep_since=150) == {'B', 'C', 'D'}
+    assert retained_scenes(generations, keep_last=1, keep_since=50) == {'A', 'B', 'C', 'D'}
+
+def test_gc_keeps_last_passage_and_shared_inputs(generated):
+    """Tests that older scenes go, and that an input still shown in a hand-made scene stays."""
+    obs, client, log_path = generated
+    assert [entry['scenes'] for entry in load_generations('Stand-in', log_path)][-1] == \
+        ['Scripture-JHN-3:4', 'Scripture-JHN-3:5']
+    obs.state.create_scene('Sermon')
+    obs.state.add_item('Sermon', 'sTextScrolling_John_3-1')
+
+    plan, failures = collect_garbage(client, 'Stand-in', keep_last=1, log_path=log_path)
+
+    assert failures == []
+    assert sorted(plan['scenes']) == ['Scripture-JHN-3:1', 'Scripture-JHN-3:2', 'Scripture-JHN-3:3']
+    generated_scenes = sorted(name for name in obs.state.scenes if name.startswith('Scripture-JHN'))
+    assert generated_scenes == ['Scripture-JHN-3:4', 'Scripture-JHN-3:5']
+    assert 'sTextScrolling_John_3-1' in obs.state.inputs
+    assert 'sTextScrolling_John_3-2' not in obs.state.inputs
+    assert 'Scripture-Template' in obs.state.scenes
+
+def test_gc_removes_orphans_and_spares_program_scene(generated):
+    """Tests orphan removal with no policy, the dry run, and that the live program scene is never removed."""
+    obs, client, log_path = generated
+    obs.state.create_input('Scripture-JHN-3:3', 'sTextScrolling_John_3-9', 'text_ft2_source_v2', {'text': 'stale'})
+    obs.state.scenes['Scripture-JHN-3:3'] = [item for item in obs.state.scenes['Scripture-JHN-3:3']
+                                             if item['sourceName'] != 'sTextScrolling_John_3-9']
+    obs.state.program_scene = 'Scripture-JHN-3:1'
+    before = obs.state.to_dict()
+
+    plan, _ = collect_garbage(client, 'Stand-in', dry_run=True, log_path=log_path)
+    assert plan == {'scenes': [], 'inputs': ['sTextScrolling_John_3-9'], 'orphans': ['sTextScrolling_John_3-9']}
+    assert obs.state.to_dict() == before
+
+    plan, failures = collect_garbage(client, 'Stand-in', keep_last=0, log_path=log_path)
+    assert failures == []
+    assert 'Scripture-JHN-3:1' not in plan['scenes']
+    assert [name for name in obs.state.scenes if name.startswith('Scripture-JHN')] == ['Scripture-JHN-3:1']
+    assert sorted(obs.state.inputs) == ['Base Layer', 'sTextScrolling', 'sTextScrolling_John_3-1']
@@ -0,0 +1,90 @@
+# tests/test_standins.py
+
+import asyncio
+import pytest
+from obsws_python import ReqClient
+from bible_utils import get_verses_from_api
+from chapter_cache import ChapterCache
+from obs_automator import automate_scene_generation, automate_scene_generation_batched
+from obs_async import automate_scene_generation_async
+from bench.obs_standin import ObsStandIn
+
+@pytest.fixture
+def obs():
+    with ObsStandIn(password='secret') as standin:
+        yield standin
+
+def generated_scenes(standin):
+    """Returns each generated scene's item sources and its verse text."""
+    scenes = {}
+    for name, items in standin.state.scenes.items():
+        if name != 'Scripture-Template':
+            text_inputs = [i['sourceName'] for i in items if i['sourceName'].startswith('sTextScrolling_')]
+            scenes[name] = ([i['sourceName'] for i in items],
+                            standin.state.inputs[text_inputs[0]]['inputSettings']['text'])
+    return scenes
+
+def test_bible_api_standin_serves_chapters_with_etags(bible_api, tmp_path):
+    """Tests that the stand-in serves chapters in the API's shape and answers revalidation."""
+    cache = ChapterCache(cache_dir=str(tmp_path), ttl=0)
+
+    verses = get_verses_from_api("John 3:2-4", cache=cache)
+    again = get_verses_from_api("John 3:2-4", cache=cache)
+
+    assert [v['reference'] for v in verses] == ["John 3:2", "John 3:3", "John 3:4"]
+    assert again == verses
+    assert bible_api.stats == {'requests': 2, 'not_modified': 1, 'bytes_out': bible_api.stats['bytes_out']}
+
+def test_all_generation_modes_build_the_same_scenes(bible_api, obs):
+    """Tests the classic, batched and pipelined modes end to end over a real websocket."""
+    verses = get_verses_from_api("John 3:1-5")
+    results = {}
+    round_trips = {}
+    for mode in ('classic', 'batch', 'pipeline'):
+        obs.reset()
+        with ReqClient(host=obs.host, port=obs.port, password='secret', timeout=5) as client:
+            if mode == 'classic':
+                automate_scene_generation(client, verses)
+            elif mode == 'batch':
+                assert automate_scene_generation_batched(client, verses) == []
+            else:
+                assert asyncio.run(automate_scene_generation_async(client, verses)) == []
+        results[mode] = generated_scenes(obs)
+        round_trips[mode] = obs.round_trips
+
+    assert list(results['classic']) == [v['scene_name'] for v in reversed(verses)]
+    assert results['classic']['Scripture-JHN-3:1'] == (['Base Layer', 'sTextScrolling_John_3-1'], verses[0]['obs_text'])
+    assert results['batch'] == results['classic']
+    assert results['pipeline'] == results['classic']
+    assert round_trips['batch'] < round_trips['pipeline'] < round_trips['classic']
+
+def test_connect_to_obs_waits_until_obs_is_ready(obs, monkeypatch):
+    """Tests that connecting backs off while OBS answers NotReady and succeeds once it is up."""
+    import obs_scene_generator
+    delays = []
+    def fake_sleep(seconds):
+        delays.append(seconds)
+        if len(delays) == 2:
+            obs.ready = True
+    monkeypatch.setattr(obs_scene_generator.time, 'sleep', fake_sleep)
+    obs.ready = False
+
+    client = obs_scene_generator.connect_to_obs(obs.host, obs.port, 'secret', backoff=0.5)
+    client.disconnect()
+
+    assert delays == [0.5, 1.0]
+
+def test_connect_to_obs_gives_up_on_a_closed_port(monkeypatch):
+    """Tests that a closed port is retried with doubling delays, then reported."""
+    import socket
+    import obs_scene_generator
+    delays = []
+    monkeypatch.setattr(obs_scene_generator.time, 'sleep', delays.append)
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(ConnectionRefusedError):
+        obs_scene_generator.connect_to_obs('127.0.0.1', port, '', max_retries=4, backoff=1, max_delay=3)
+
+    assert delays == [1, 2, 3]
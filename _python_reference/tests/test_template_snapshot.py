@@ -0,0 +1,55 @@
+# tests/test_template_snapshot.py
+
+import pytest
+from unittest.mock import MagicMock
+from obsws_python.error import OBSSDKRequestError
+from template_snapshot import TemplateSnapshot
+
+@pytest.fixture
+def mock_obs_client():
+    """Creates a mock OBS client with a valid template scene."""
+    client = MagicMock()
+    client.get_scene_collection_list.return_value.current_scene_collection_name = 'Sunday'
+    client.get_scene_item_list.return_value.scene_items = [
+        {'sourceName': 'background', 'sceneItemId': 1},
+        {'sourceName': 'sTextScrolling', 'sceneItemId': 2}
+    ]
+    client.get_input_settings.return_value.input_settings = {'text': 'template text', 'font': {'size': 48}}
+    client.get_input_settings.return_value.input_kind = 'text_ft2_source_v2'
+    client.get_scene_item_transform.return_value.scene_item_transform = {
+        'scaleX': 1.0, 'boundsWidth': 0.0, 'boundsHeight': 1080.0
+    }
+    return client
+
+def test_capture_applies_bounds_fix_ups(mock_obs_client):
+    """Tests that a snapshot holds the template in one pass with its bounds clamped."""
+    snapshot = TemplateSnapshot.capture(mock_obs_client)
+
+    assert snapshot.collection_name == 'Sunday'
+    assert snapshot.kind == 'text_ft2_source_v2'
+    assert snapshot.text_item['sceneItemId'] == 2
+    assert snapshot.transform['boundsWidth'] == 1.0
+    assert snapshot.text_settings('new')['text'] == 'new'
+
+def test_capture_rejects_missing_text_source(mock_obs_client):
+    """Tests validation of the template's text source."""
+    mock_obs_client.get_scene_item_list.return_value.scene_items = [{'sourceName': 'background', 'sceneItemId': 1}]
+    with pytest.raises(ValueError, match="Text source 'sTextScrolling' not found"):
+        TemplateSnapshot.capture(mock_obs_client)
+
+def test_capture_rejects_missing_template_scene(mock_obs_client):
+    """Tests validation of the template scene itself."""
+    mock_obs_client.get_scene_item_list.side_effect = OBSSDKRequestError('GetSceneItemList', 600, 'No source')
+    with pytest.raises(ValueError, match="Template scene 'Scripture-Template' not found"):
+        TemplateSnapshot.capture(mock_obs_client)
+
+def test_capture_uses_the_transform_from_the_item_list(mock_obs_client):
+    """Tests that no separate GetSceneItemTransform is sent when the item list carries the transform."""
+    mock_obs_client.get_scene_item_list.return_value.scene_items[1]['sceneItemTransform'] = {
+        'scaleX': 1.0, 'boundsWidth': 0.0, 'boundsHeight': 1080.0
+    }
+
+    snapshot = TemplateSnapshot.capture(mock_obs_client)
+
+    assert snapshot.transform['boundsWidth'] == 1.0
+    mock_obs_client.get_scene_item_transform.assert_not_called()
@@ -0,0 +1,58 @@
+# tests/test_text_layout.py
+
+from text_layout import TextLayout, glyph_width_table, layout_verses, wrap_text
+from template_snapshot import TemplateSnapshot
+
+FONT = ('No Such Font Face', 100, 'Regular')
+
+def test_wrap_fits_every_line_in_the_box():
+    """Tests that wrapping uses measured widths, so no line is wider than the box."""
+    widths = glyph_width_table(*FONT)
+    text = "[12] So David asked, “Will the citizens of Keilah surrender me and my men into the hand of Saul?”"
+
+    lines = wrap_text(text, FONT, 1000)
+
+    assert " ".join(lines) == text
+    assert all(widths.width(line) <= 1000 for line in lines)
+    # Narrow letters pack more characters per line than wide ones.
+    assert len(wrap_text("i " * 40, FONT, 1000)[0]) > len(wrap_text("W " * 40, FONT, 1000)[0])
+
+def test_wrap_is_memoized():
+    """Tests that repeated layouts of the same text come from the cache."""
+    wrap_text.cache_clear()
+    wrap_text("For God so loved the world", FONT, 800)
+    wrap_text("For God so loved the world", FONT, 800)
+    assert wrap_text.cache_info().hits == 1
+
+def test_long_word_is_broken_instead_of_overflowing():
+    """Tests that a single word wider than the box is split across lines."""
+    lines = wrap_text("Mahershalalhashbaz", FONT, 300)
+    assert "".join(lines) == "Mahershalalhashbaz"
+    assert len(lines) > 1
+
+def test_layout_from_template_bounds():
+    """Tests that the text box comes from the template's unscaled bounds and font."""
+    template = TemplateSnapshot(
+        'Sunday', [], 'text_ft2_source_v2', {'font': {'face': 'No Such Font Face', 'size': 50}},
+        {'boundsType': 'OBS_BOUNDS_SCALE_INNER', 'boundsWidth': 900.0, 'boundsHeight': 300.0,
+         'scaleX': 0.5, 'scaleY': 0.5},
+    )
+    layout = TextLayout.from_template(template)
+    assert layout.box_width == 1800.0
+    assert layout.max_lines == 10
+
+def test_paginated_verses_get_their_own_scenes():
+    """Tests that an overflowing verse is split across scenes, keeping the first scene name."""
+    layout = TextLayout(*FONT, box_width=1000)
+    verse = {'reference': 'John 3:16', 'scene_name': 'Scripture-JHN-3:16',
+             'obs_text': "[16] For God so loved\nthe world that he gave his one and only Son, that everyone who believes in him shall not perish but have eternal life."}
+
+    pages = list(layout_verses([verse], layout, paginate=True, max_lines=2))
+
+    assert len(pages) > 1
+    assert pages[0]['scene_name'] == 'Scripture-JHN-3:16'
+    assert pages[1]['scene_name'] == 'Scripture-JHN-3:16-part2'
+    assert pages[1]['reference'] == 'John 3:16 part 2'
+    assert all(len(page['obs_text'].split("\n")) <= 2 for page in pages)
+    reversed_pages = list(layout_verses([verse], layout, paginate=True, max_lines=2, reverse=True))
+    assert reversed_pages == list(reversed(pages))
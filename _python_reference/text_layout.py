@@ -0,0 +1,196 @@
+import glob
+import os
+from functools import lru_cache
+
+from config import LAYOUT_FONT_DIRS, LAYOUT_LINE_SPACING, LAYOUT_CACHE_SIZE, MAX_CHARS_PER_LINE
+
+# Advance widths of Helvetica (in 1/1000 em) for printable ASCII, used when the template's
+# font file cannot be measured directly. Close enough for most sans-serif fonts.
+HELVETICA_WIDTHS = dict(zip(
+    (chr(c) for c in range(32, 127)),
+    (278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+     556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+     1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+     667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+     333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+     556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584)
+))
+HELVETICA_WIDTHS.update({'‘': 222, '’': 222, '“': 333, '”': 333, '–': 556, '—': 1000})
+DEFAULT_EM_WIDTH = 556
+
+
+def find_font_file(face, style='Regular'):
+    """Looks for a TrueType/OpenType file matching an OBS font face in the usual font directories."""
+    wanted = face.lower().replace(' ', '')
+    styled = wanted + ('' if style.lower() in ('', 'regular', 'normal') else style.lower().replace(' ', ''))
+    candidates = []
+    for font_dir in LAYOUT_FONT_DIRS:
+        for ext in ('ttf', 'otf', 'ttc'):
+            candidates += glob.glob(os.path.join(os.path.expanduser(font_dir), '**', f'*.{ext}'), recursive=True)
+    by_stem = {os.path.splitext(os.path.basename(path))[0].lower().replace(' ', '').replace('-', ''): path
+               for path in candidates}
+    return by_stem.get(styled) or by_stem.get(wanted)
+
+
+class GlyphWidthTable:
+    """
+    Advance widths, in pixels, of the characters of one font at one size.
+
+    Widths are measured from the font file with Pillow when both are available, and
+    otherwise scaled from the built-in Helvetica metrics. Characters outside the prebuilt
+    table are measured on first use and remembered.
+    """
+
+    def __init__(self, face, size, style='Regular'):
+        self.face = face
+        self.size = size
+        self.style = style
+        self.font = None
+        try:
+            from PIL import ImageFont
+            path = find_font_file(face, style)
+            if path:
+                self.font = ImageFont.truetype(path, size)
+        except (ImportError, OSError):
+            self.font = None
+        self.widths = {ch: self.measure(ch) for ch in HELVETICA_WIDTHS}
+
+    @property
+    def measured(self):
+        """True when widths come from the real font file rather than the fallback metrics."""
+        return self.font is not None
+
+    def measure(self, ch):
+        if self.font is not None:
+            return self.font.getlength(ch)
+        return HELVETICA_WIDTHS.get(ch, DEFAULT_EM_WIDTH) * self.size / 1000
+
+    def width(self, text):
+        widths = self.widths
+        total = 0.0
+        for ch in text:
+            w = widths.get(ch)
+            if w is None:
+                w = widths[ch] = self.measure(ch)
+            total += w
+        return total
+
+
+@lru_cache(maxsize=None)
+def glyph_width_table(face, size, style='Regular'):
+    """Returns the width table for a font, building it only once per process."""
+    return GlyphWidthTable(face, size, style)
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def wrap_text(text, font_key, box_width):
+    """
+    Wraps text to box_width pixels in a single pass over its words and returns the lines
+    as a tuple. Results are memoized by (text, font, box width). A word wider than the box
+    is broken across lines rather than allowed to overflow.
+    """
+    widths = glyph_width_table(*font_key)
+    space = widths.width(' ')
+    lines = []
+    current = []
+    current_width = 0.0
+    for word in text.split():
+        word_width = widths.width(word)
+        while word_width > box_width and len(word) > 1:
+            # Flush the current line, then cut the longest prefix that fits.
+            if current:
+                lines.append(' '.join(current))
+                current, current_width = [], 0.0
+            cut = 1
+            while cut < len(word) and widths.width(word[:cut + 1]) <= box_width:
+                cut += 1
+            lines.append(word[:cut])
+            word = word[cut:]
+            word_width = widths.width(word)
+        if current and current_width + space + word_width > box_width:
+            lines.append(' '.join(current))
+            current, current_width = [word], word_width
+        elif current:
+            current.append(word)
+            current_width += space + word_width
+        else:
+            current, current_width = [word], word_width
+    if current:
+        lines.append(' '.join(current))
+    return tuple(lines)
+
+
+class TextLayout:
+    """Wraps and paginates verse text for one template text source."""
+
+    def __init__(self, face='Arial', size=72, style='Regular', box_width=None, box_height=None):
+        self.font_key = (face, size, style)
+        # Without a box, fall back to the width of MAX_CHARS_PER_LINE average characters.
+        self.box_width = box_width or glyph_width_table(*self.font_key).width('n' * MAX_CHARS_PER_LINE)
+        self.box_height = box_height
+
+    @classmethod
+    def from_template(cls, template, box_width=None):
+        """Builds a layout from a TemplateSnapshot's font settings and text bounds."""
+        font = template.settings.get('font', {})
+        transform = template.transform or {}
+        has_bounds = transform.get('boundsType', 'OBS_BOUNDS_NONE') != 'OBS_BOUNDS_NONE'
+        # Bounds are in canvas pixels; the text is laid out before the item is scaled.
+        if box_width is None and has_bounds and transform.get('boundsWidth', 0) > 1:
+            box_width = transform['boundsWidth'] / (transform.get('scaleX') or 1.0)
+        box_height = None
+        if has_bounds and transform.get('boundsHeight', 0) > 1:
+            box_height = transform['boundsHeight'] / (transform.get('scaleY') or 1.0)
+        return cls(font.get('face', 'Arial'), font.get('size', 72), font.get('style', 'Regular'),
+                   box_width=box_width, box_height=box_height)
+
+    @property
+    def line_height(self):
+        return self.font_key[1] * LAYOUT_LINE_SPACING
+
+    @property
+    def max_lines(self):
+        """Number of lines that fit in the text box, or None if its height is unknown."""
+        if not self.box_height:
+            return None
+        return max(1, int(self.box_height // self.line_height))
+
+    def wrap(self, text):
+        return list(wrap_text(text, self.font_key, self.box_width))
+
+    def pages(self, text, max_lines=None):
+        """Wraps text and splits it into pages of at most max_lines lines each."""
+        lines = self.wrap(text)
+        max_lines = max_lines or self.max_lines
+        if not max_lines:
+            return ["\n".join(lines)]
+        return ["\n".join(lines[start:start + max_lines]) for start in range(0, len(lines), max_lines)] or ['']
+
+
+def page_verse(verse, page):
+    """Returns the verse dict for one page of a verse that spans several scenes."""
+    if page == 1:
+        return verse
+    return {
+        **verse,
+        'reference': f"{verse['reference']} part {page}",
+        'scene_name': f"{verse['scene_name']}-part{page}",
+    }
+
+
+def layout_verses(verses, layout, paginate=False, max_lines=None, reverse=False):
+    """
+    Re-wraps formatted verses with a TextLayout and yields them in the order given.
+
+    The original text is recovered from each verse's obs_text, so this works on the output
+    of get_verses_from_api and friends. With paginate, a verse that does not fit in the
+    text box becomes several verse dicts, one scene per page; the first page keeps the
+    verse's own scene name. Pass reverse=True for a creation-order stream (reverse reading
+    order) so each verse's pages are reversed as well.
+    """
+    for verse in verses:
+        text = ' '.join(verse['obs_text'].split())
+        pages = layout.pages(text, max_lines=max_lines) if paginate else ["\n".join(layout.wrap(text))]
+        paged = [{**page_verse(verse, number), 'obs_text': page_text}
+                 for number, page_text in enumerate(pages, start=1)]
+        yield from reversed(paged) if reverse else paged